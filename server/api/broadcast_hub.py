@@ -0,0 +1,236 @@
+import time
+import asyncio
+import logging
+import numpy as np
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Dict, Any, Optional, Set
+
+from api.live_feed import LiveFeed, LiveRaceState
+from api.live_stream import HEARTBEAT_SECONDS, parse_cursor, encode_event, encode_events
+
+logger = logging.getLogger(__name__)
+
+# Messages buffered per subscriber before its backlog is coalesced
+DEFAULT_QUEUE_SIZE = 32
+
+# Fan-out timings kept for the latency percentiles
+TIMING_WINDOW = 1024
+
+# Queue markers: the subscriber catches up from the race's event log
+RESYNC = ('resync',)
+RESET = ('reset',)
+
+class Subscriber:
+    """
+    One SSE connection: a bounded queue of encoded batches and its cursor
+    """
+    
+    def __init__(self, race_id: int, queue_size: int):
+        self.race_id = race_id
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.epoch = None
+        self.sequence = 0
+    
+    def offer(self, message: tuple) -> int:
+        """
+        Queue a message, coalescing the backlog if the queue is full.
+        
+        The queued batches and the new one are replaced by a single
+        resync marker; the subscriber then reads what it missed from the
+        race's event log in one go. Returns the number of batches dropped.
+        """
+        try:
+            self.queue.put_nowait(message)
+            return 0
+        except asyncio.QueueFull:
+            dropped = 1
+            while not self.queue.empty():
+                if self.queue.get_nowait() is not RESET:
+                    dropped += 1
+            
+            # A pending reset must survive the coalescing
+            self.queue.put_nowait(RESET if message is RESET else RESYNC)
+            return dropped
+
+class RaceChannel:
+    """
+    Subscribers of one race and the task publishing its events to them
+    """
+    
+    def __init__(self, race_id: int):
+        self.race_id = race_id
+        self.subscribers: Set[Subscriber] = set()
+        self.task: Optional[asyncio.Task] = None
+
+class BroadcastHub:
+    """
+    Fan live race events out to every subscriber of a race.
+    
+    One publisher task per race waits for new events, encodes each batch
+    once and offers the same bytes to every subscriber's bounded queue,
+    so N viewers cost one encoding plus N queue puts per update. A
+    subscriber that falls behind has its backlog coalesced into a resync
+    (see Subscriber.offer) instead of growing memory; it resumes from
+    the race's event log, so no event is lost, only batched. New and
+    reconnecting subscribers catch up from the log the same way.
+    """
+    
+    def __init__(self, live_feed: LiveFeed, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.live_feed = live_feed
+        self.queue_size = queue_size
+        self.channels: Dict[int, RaceChannel] = {}
+        
+        self.batches = 0
+        self.events = 0
+        self.deliveries = 0
+        self.drops = 0
+        self.catch_ups = 0
+        self._fanout_seconds = deque(maxlen=TIMING_WINDOW)
+        self._encode_seconds = deque(maxlen=TIMING_WINDOW)
+    
+    def _join(self, subscriber: Subscriber):
+        channel = self.channels.setdefault(subscriber.race_id, RaceChannel(subscriber.race_id))
+        channel.subscribers.add(subscriber)
+        
+        if channel.task is None or channel.task.done():
+            channel.task = asyncio.create_task(self._publish(channel))
+    
+    def _leave(self, subscriber: Subscriber):
+        channel = self.channels.get(subscriber.race_id)
+        if channel is None:
+            return
+        
+        channel.subscribers.discard(subscriber)
+        if not channel.subscribers:
+            if channel.task is not None:
+                channel.task.cancel()
+            del self.channels[subscriber.race_id]
+    
+    async def _publish(self, channel: RaceChannel):
+        """
+        Encode each new batch of a race's events once and offer it to every subscriber
+        """
+        state, sequence = None, 0
+        
+        while channel.subscribers:
+            current = self.live_feed.get(channel.race_id)
+            if current is None:
+                current = await self.live_feed.wait_for_race(channel.race_id, HEARTBEAT_SECONDS)
+                if current is None:
+                    continue
+            
+            if current is not state:
+                # Reset (or first start): subscribers start over from the new state's log
+                if state is not None:
+                    for subscriber in list(channel.subscribers):
+                        self.drops += subscriber.offer(RESET)
+                state, sequence = current, current.sequence
+            
+            events = await state.wait_for_events(sequence, HEARTBEAT_SECONDS)
+            if not events:
+                continue
+            
+            start = time.perf_counter()
+            message = ('events', events[0][0], events[-1][0], encode_events(state.epoch, events))
+            encoded = time.perf_counter()
+            
+            for subscriber in list(channel.subscribers):
+                self.drops += subscriber.offer(message)
+            
+            self.batches += 1
+            self.events += len(events)
+            self.deliveries += len(channel.subscribers)
+            self._encode_seconds.append(encoded - start)
+            self._fanout_seconds.append(time.perf_counter() - encoded)
+            sequence = events[-1][0]
+    
+    @staticmethod
+    def _catch_up(subscriber: Subscriber, state: LiveRaceState) -> str:
+        """
+        Everything a subscriber has not seen of a state, read from its log
+        """
+        chunks = []
+        if subscriber.epoch != state.epoch or subscriber.sequence > state.sequence:
+            subscriber.epoch, subscriber.sequence = state.epoch, 0
+            chunks.append(encode_event('reset', {'raceId': state.race_id, 'lap': state.current_lap},
+                                       f"{state.epoch}-0"))
+        
+        events = state.events_since(subscriber.sequence)
+        if events:
+            chunks.append(encode_events(state.epoch, events))
+            subscriber.sequence = events[-1][0]
+        return ''.join(chunks)
+    
+    async def stream(self, race_id: int, cursor: Optional[str],
+                     is_disconnected: Callable[[], Awaitable[bool]]) -> AsyncIterator[str]:
+        """
+        Server-Sent Events of a live race from a cursor.
+        
+        A client resuming with the id of the last event it saw (the
+        Last-Event-ID header EventSource sends on reconnect) gets only the
+        events after it. Without a usable cursor, or when the race's live
+        state was reset since, a 'reset' event tells the client to clear
+        its data and the whole race follows as deltas. Event ids are
+        "{epoch}-{sequence}".
+        """
+        subscriber = Subscriber(race_id, self.queue_size)
+        subscriber.epoch, subscriber.sequence = parse_cursor(cursor)
+        self._join(subscriber)
+        
+        try:
+            state = self.live_feed.get(race_id)
+            chunk = self._catch_up(subscriber, state) if state is not None else ''
+            if chunk:
+                yield chunk
+            
+            while not await is_disconnected():
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                
+                state = self.live_feed.get(race_id)
+                if state is None:
+                    continue
+                
+                if message[0] == 'events' and subscriber.epoch == state.epoch:
+                    _, first, last, payload = message
+                    if last <= subscriber.sequence:
+                        continue
+                    if first == subscriber.sequence + 1:
+                        subscriber.sequence = last
+                        yield payload
+                        continue
+                
+                # Resync, reset, a new race state or a gap: read the log instead
+                self.catch_ups += 1
+                chunk = self._catch_up(subscriber, state)
+                if chunk:
+                    yield chunk
+        
+        finally:
+            self._leave(subscriber)
+    
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Subscriber counts, fan-out volume, drops and latency percentiles
+        """
+        def percentiles(samples) -> Dict[str, Optional[float]]:
+            if not samples:
+                return {'p50': None, 'p99': None}
+            values = np.fromiter(samples, dtype=float) * 1000
+            return {'p50': round(float(np.percentile(values, 50)), 4),
+                    'p99': round(float(np.percentile(values, 99)), 4)}
+        
+        return {
+            'subscribers': sum(len(channel.subscribers) for channel in self.channels.values()),
+            'subscribers_by_race': {race_id: len(channel.subscribers) for race_id, channel in self.channels.items()},
+            'batches': self.batches,
+            'events': self.events,
+            'deliveries': self.deliveries,
+            'drops': self.drops,
+            'catch_ups': self.catch_ups,
+            'encode_ms': percentiles(self._encode_seconds),
+            'fanout_ms': percentiles(self._fanout_seconds)
+        }
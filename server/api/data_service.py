@@ -1,15 +1,18 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any
 import logging
-from datetime import datetime, timedelta
 import os
 
+from utils.time_parsing import add_time_columns
+
 logger = logging.getLogger(__name__)
 
 class DataService:
-    def __init__(self):
+    def __init__(self, live_feed=None):
         self.data_path = "data/"
+        # Live lap, pit and confidence data of races being captured or replayed
+        self.live_feed = live_feed
         self._load_base_data()
     
     def _load_base_data(self):
@@ -24,9 +27,11 @@ class DataService:
             self.races = self._load_csv("races.csv")
             self.results = self._load_csv("results.csv")
             self.qualifying = self._load_csv("qualifying.csv")
-            self.lap_times = self._load_csv("lap_times.csv")
             self.pit_stops = self._load_csv("pit_stops.csv")
             
+            # Parse pit stop durations into a numeric millisecond column
+            add_time_columns(self.pit_stops, ['duration'])
+            
             logger.info("Base data loaded successfully")
             
         except Exception as e:
@@ -86,6 +91,11 @@ class DataService:
             'date': ['2024-05-26', '2024-07-07', '2024-09-01'],
             'time': ['15:00:00', '15:00:00', '15:00:00']
         })
+        
+        # No results, qualifying or pit data without the CSVs
+        self.results = pd.DataFrame()
+        self.qualifying = pd.DataFrame()
+        self.pit_stops = pd.DataFrame()
     
     async def get_current_race(self) -> Dict[str, Any]:
         """
@@ -229,6 +239,10 @@ class DataService:
         Get lap time data for a race
         """
         try:
+            live_state = self.live_feed.get(race_id) if self.live_feed is not None else None
+            if live_state is not None:
+                return live_state.lap_data()
+            
             # Generate mock lap data
             lap_data = []
             drivers = ['VER', 'HAM', 'LEC', 'RUS', 'NOR']
@@ -251,6 +265,10 @@ class DataService:
         Get pit stop data for a race
         """
         try:
+            live_state = self.live_feed.get(race_id) if self.live_feed is not None else None
+            if live_state is not None:
+                return live_state.pit_data()
+            
             # Mock pit stop data
             pit_data = [
                 {'driverId': 1, 'driver': 'VER', 'lap': 15, 'duration': 2.4, 'stop': 1, 'tireChange': 'Medium → Soft'},
@@ -271,6 +289,10 @@ class DataService:
         Get confidence stream data for live predictions
         """
         try:
+            live_state = self.live_feed.get(race_id) if self.live_feed is not None else None
+            if live_state is not None:
+                return live_state.confidence_data()
+            
             # Generate mock confidence data
             confidence_data = []
             drivers = ['VER', 'HAM', 'LEC', 'RUS', 'NOR']
@@ -288,29 +310,3 @@ class DataService:
         except Exception as e:
             logger.error(f"Error getting confidence stream: {str(e)}")
             raise
-    
-    async def get_telemetry_data(self, session_id: str, driver_id: Optional[int] = None) -> List[Dict[str, Any]]:
-        """
-        Get live telemetry data for a session
-        """
-        try:
-            # Mock telemetry data
-            telemetry_data = []
-            
-            for i in range(100):  # 100 telemetry points
-                telemetry_data.append({
-                    'timestamp': datetime.now() - timedelta(seconds=i),
-                    'driverId': driver_id or 1,
-                    'lap': (i // 10) + 1,
-                    'sector': (i % 3) + 1,
-                    'speed_kmh': 200 + np.random.normal(0, 20),
-                    'track_pos_x': np.random.uniform(0, 1000),
-                    'track_pos_y': np.random.uniform(0, 500),
-                    'lap_time_ms': 90000 + np.random.normal(0, 2000)
-                })
-            
-            return telemetry_data
-            
-        except Exception as e:
-            logger.error(f"Error getting telemetry data: {str(e)}")
-            raise
\ No newline at end of file
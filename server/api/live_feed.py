@@ -0,0 +1,169 @@
+import time
+import asyncio
+import logging
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class LiveRaceState:
+    """
+    Live lap, pit and confidence data of one race, in the shapes the
+    LiveMode page reads from /races/{race_id}/lap-data, pit-data and
+    confidence-stream.
+    
+    Every change is also appended to an event log numbered from 1, so
+    subscribers can follow the race as deltas from a cursor. epoch
+    identifies this state: a cursor from an earlier state of the race
+    (before a reset) is not valid against this one.
+    
+    Confidence points come with the grid predictions scored once per
+    completed lap (see api.live_pipeline).
+    """
+    
+    def __init__(self, race_id: int):
+        self.race_id = race_id
+        self.current_lap = 0
+        self.updated_at = None
+        self._laps: Dict[int, Dict[str, Any]] = {}
+        self._pits: List[Dict[str, Any]] = []
+        self._confidence: Dict[int, Dict[str, Any]] = {}
+        self._predictions: Dict[str, Any] = {'lap': 0, 'predictions': []}
+        
+        self.epoch = time.time_ns()
+        self._events: List[tuple] = []
+        self._changed = asyncio.Event()
+        
+        # Polled payloads, built once per change rather than once per request
+        self._payloads: Dict[str, tuple] = {}
+    
+    @property
+    def sequence(self) -> int:
+        """
+        Number of the latest event
+        """
+        return len(self._events)
+    
+    def _publish(self, kind: str, data: Dict[str, Any]):
+        self._events.append((kind, data))
+        self.updated_at = time.time()
+        
+        # Wake every waiting subscriber, then arm a fresh event for the next change
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+    
+    def events_since(self, cursor: int) -> List[tuple]:
+        """
+        (sequence, kind, data) of the events after cursor
+        """
+        return [(sequence, kind, data) for sequence, (kind, data)
+                in enumerate(self._events[cursor:], start=cursor + 1)]
+    
+    async def wait_for_events(self, cursor: int, timeout: float) -> List[tuple]:
+        """
+        Events after cursor, waiting up to timeout seconds for one if there are none yet
+        """
+        if cursor >= self.sequence:
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        return self.events_since(cursor)
+    
+    def record_lap(self, driver: str, lap: int, lap_time_ms: float):
+        """
+        Add one completed lap of a driver (code)
+        """
+        self._laps.setdefault(lap, {'lap': lap})[driver] = int(round(lap_time_ms))
+        self.current_lap = max(self.current_lap, lap)
+        self._publish('lap', {'lap': lap, 'driver': driver, 'lap_time_ms': int(round(lap_time_ms))})
+    
+    def record_predictions(self, lap: int, predictions: List[Dict[str, Any]]):
+        """
+        Set the grid's predictions for a lap, with every driver's confidence point
+        """
+        row = self._confidence.setdefault(lap, {'lap': lap})
+        for prediction in predictions:
+            row[f"{prediction['driver']}_confidence"] = prediction['confidence']
+        
+        self._predictions = {'lap': lap, 'predictions': predictions}
+        self._publish('prediction', self._predictions)
+    
+    def record_pit(self, driver_id: int, driver: str, lap: int, stop: int, duration_s: float,
+                   tire_change: Optional[str] = None):
+        """
+        Add one pit stop
+        """
+        pit = {
+            'driverId': driver_id,
+            'driver': driver,
+            'lap': lap,
+            'duration': round(duration_s, 3),
+            'stop': stop,
+            'tireChange': tire_change
+        }
+        self._pits.append(pit)
+        self._publish('pit', dict(pit))
+    
+    def _payload(self, name: str, build) -> List[Dict[str, Any]]:
+        sequence, payload = self._payloads.get(name, (None, None))
+        if sequence != self.sequence:
+            payload = build()
+            self._payloads[name] = (self.sequence, payload)
+        return payload
+    
+    def prediction_data(self) -> Dict[str, Any]:
+        """
+        Latest scored lap and its grid predictions
+        """
+        return self._predictions
+    
+    def lap_data(self) -> List[Dict[str, Any]]:
+        return self._payload('lap_data', lambda: [dict(self._laps[lap]) for lap in sorted(self._laps)])
+    
+    def pit_data(self) -> List[Dict[str, Any]]:
+        return self._payload('pit_data', lambda: [dict(pit) for pit in self._pits])
+    
+    def confidence_data(self) -> List[Dict[str, Any]]:
+        return self._payload('confidence_data',
+                             lambda: [dict(self._confidence[lap]) for lap in sorted(self._confidence)])
+
+class LiveFeed:
+    """
+    Live state of every race being captured or replayed, by raceId
+    """
+    
+    def __init__(self):
+        self.races: Dict[int, LiveRaceState] = {}
+        self._started = asyncio.Event()
+    
+    def get(self, race_id: int) -> Optional[LiveRaceState]:
+        return self.races.get(race_id)
+    
+    def reset(self, race_id: int) -> LiveRaceState:
+        """
+        Start a race's live state afresh
+        """
+        previous = self.races.get(race_id)
+        self.races[race_id] = LiveRaceState(race_id)
+        
+        # Subscribers waiting on the replaced state wake up and see the new epoch
+        if previous is not None:
+            previous._changed.set()
+        
+        started, self._started = self._started, asyncio.Event()
+        started.set()
+        return self.races[race_id]
+    
+    async def wait_for_race(self, race_id: int, timeout: float) -> Optional[LiveRaceState]:
+        """
+        Live state of a race, waiting up to timeout seconds for it to start
+        """
+        while race_id not in self.races:
+            try:
+                await asyncio.wait_for(self._started.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self.races[race_id]
+    
+    def remove(self, race_id: int):
+        self.races.pop(race_id, None)
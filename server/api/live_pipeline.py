@@ -0,0 +1,346 @@
+import time
+import logging
+import numpy as np
+import pandas as pd
+from collections import deque
+from typing import Dict, List, Any, Optional, Sequence
+
+from api.live_feed import LiveRaceState
+from utils.race_simulator import simulate_positions, DEFAULT_SIGMA
+
+logger = logging.getLogger(__name__)
+
+# Laps kept per driver: the feature window and the consistency window
+FEATURE_LAPS = 3
+WINDOW = 5
+
+# Initial rows of a grid; grows by doubling if more drivers turn up
+GRID_CAPACITY = 24
+
+# Simulated races behind each lap's outcome probabilities
+LIVE_SIMULATIONS = 20000
+
+# Scoring timings kept for the latency percentiles
+TIMING_WINDOW = 1024
+
+class LiveGrid:
+    """
+    Rolling per-driver lap state of one race in flat numpy arrays.
+    
+    Each driver owns a row of a ring buffer of their last WINDOW lap and
+    sector times. Running sums over the last FEATURE_LAPS laps (the
+    live_last_3_laps_mean_ms and live_last_3_sector_deltas_ms features)
+    and over the whole window (lap-time consistency) are updated in O(1)
+    per lap: the new value is added and the one leaving the window
+    subtracted. Reading the features of the whole grid is then a handful
+    of vectorized array operations.
+    
+    A race lap is complete, and ready to score, once every driver still
+    running has finished it, or as soon as anyone finishes the lap after
+    it (so lapped or retired cars never hold the grid back).
+    """
+    
+    def __init__(self, race_id: int, capacity: int = GRID_CAPACITY):
+        self.race_id = race_id
+        self.rows: Dict[int, int] = {}
+        self.codes: List[str] = []
+        
+        self.driver_ids = np.zeros(capacity, dtype=np.int64)
+        self.constructor_ids = np.zeros(capacity, dtype=np.int64)
+        self.grid_positions = np.full(capacity, 10.0)
+        self.laps = np.full((capacity, WINDOW), np.nan)
+        self.sectors = np.full((capacity, WINDOW, 3), np.nan)
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.last_lap = np.zeros(capacity, dtype=np.int64)
+        
+        self.lap_sum = np.zeros(capacity)        # last FEATURE_LAPS laps
+        self.window_sum = np.zeros(capacity)     # last WINDOW laps
+        self.window_sumsq = np.zeros(capacity)
+        self.sector_sum = np.zeros((capacity, 3))
+        self.sector_count = np.zeros((capacity, 3), dtype=np.int64)
+        self.best_sector = np.full(3, np.inf)
+        
+        self.completed: Dict[int, int] = {}
+        self.scored_lap = 0
+        self.max_lap = 0
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+    
+    def _grow(self):
+        capacity = 2 * len(self.driver_ids)
+        for name in ('driver_ids', 'constructor_ids', 'grid_positions', 'laps', 'sectors', 'count', 'last_lap',
+                     'lap_sum', 'window_sum', 'window_sumsq', 'sector_sum', 'sector_count'):
+            array = getattr(self, name)
+            fill = np.nan if name in ('laps', 'sectors') else (10.0 if name == 'grid_positions' else 0)
+            grown = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+    
+    def add_driver(self, driver_id: int, code: str, constructor_id: int = 0, grid_position: Optional[float] = None) -> int:
+        """
+        Row of a driver, registering them if new
+        """
+        row = self.rows.get(driver_id)
+        if row is not None:
+            return row
+        
+        row = len(self.rows)
+        if row == len(self.driver_ids):
+            self._grow()
+        
+        self.rows[driver_id] = row
+        self.codes.append(code)
+        self.driver_ids[row] = driver_id
+        self.constructor_ids[row] = constructor_id
+        if grid_position is not None:
+            self.grid_positions[row] = grid_position
+        return row
+    
+    def push(self, row: int, lap: int, lap_time_ms: float, sector_times_ms: Sequence[float]) -> List[int]:
+        """
+        Add a completed lap of a driver; returns the race laps that became ready to score
+        """
+        n = self.count[row]
+        slot = n % WINDOW
+        
+        # Values leaving the window and the feature window (NaN while not yet filled)
+        leaving = self.laps[row, slot]
+        if n >= WINDOW:
+            self.window_sum[row] -= leaving
+            self.window_sumsq[row] -= leaving * leaving
+        if n >= FEATURE_LAPS:
+            old = (n - FEATURE_LAPS) % WINDOW
+            self.lap_sum[row] -= self.laps[row, old]
+            old_sectors = self.sectors[row, old]
+            known = ~np.isnan(old_sectors)
+            self.sector_sum[row, known] -= old_sectors[known]
+            self.sector_count[row, known] -= 1
+        
+        sectors = np.asarray(sector_times_ms, dtype=float)
+        self.laps[row, slot] = lap_time_ms
+        self.sectors[row, slot] = sectors
+        self.lap_sum[row] += lap_time_ms
+        self.window_sum[row] += lap_time_ms
+        self.window_sumsq[row] += lap_time_ms * lap_time_ms
+        
+        known = ~np.isnan(sectors)
+        self.sector_sum[row, known] += sectors[known]
+        self.sector_count[row, known] += 1
+        np.fmin(self.best_sector, sectors, out=self.best_sector)
+        
+        self.count[row] = n + 1
+        self.last_lap[row] = max(self.last_lap[row], lap)
+        self.max_lap = max(self.max_lap, lap)
+        
+        if lap > self.scored_lap:
+            self.completed[lap] = self.completed.get(lap, 0) + 1
+        return self._ready_laps()
+    
+    def _ready_laps(self) -> List[int]:
+        ready = []
+        while True:
+            lap = self.scored_lap + 1
+            running = int(np.count_nonzero(self.last_lap[:len(self)] >= self.scored_lap))
+            if lap < self.max_lap or (lap == self.max_lap and self.completed.get(lap, 0) >= running):
+                ready.append(lap)
+                self.completed.pop(lap, None)
+                self.scored_lap = lap
+            else:
+                return ready
+    
+    def pending_laps(self) -> List[int]:
+        """
+        Laps driven but not scored yet (e.g. the last lap when the race ends)
+        """
+        laps = list(range(self.scored_lap + 1, self.max_lap + 1))
+        self.scored_lap = self.max_lap
+        self.completed.clear()
+        return laps
+    
+    def features(self) -> Dict[str, np.ndarray]:
+        """
+        Base model features of every driver on the grid, one array entry per driver
+        """
+        n = len(self)
+        count = self.count[:n]
+        laps = np.minimum(count, FEATURE_LAPS)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(laps > 0, self.lap_sum[:n] / laps, np.nan)
+            sector_mean = self.sector_sum[:n] / self.sector_count[:n]
+        
+        # Sector deltas are to the fastest time of the race in that sector so far
+        best = np.where(np.isfinite(self.best_sector), self.best_sector, np.nan)
+        deltas = np.nan_to_num(sector_mean - best)
+        
+        return {
+            'race_id': np.full(n, self.race_id),
+            'driver_id': self.driver_ids[:n],
+            'constructor_id': self.constructor_ids[:n],
+            'qualifying_position': self.grid_positions[:n],
+            'last_3_laps_mean': np.where(np.isnan(mean), 90000, mean),
+            'sector_delta_1': deltas[:, 0],
+            'sector_delta_2': deltas[:, 1],
+            'sector_delta_3': deltas[:, 2]
+        }
+    
+    def consistency(self) -> np.ndarray:
+        """
+        Confidence from the coefficient of variation of each driver's recent lap times
+        """
+        n = len(self)
+        laps = np.minimum(self.count[:n], WINDOW)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self.window_sum[:n] / laps
+            variance = np.maximum(self.window_sumsq[:n] / laps - mean * mean, 0)
+            variation = np.sqrt(variance) / mean
+        
+        confidence = np.clip(0.95 - 10 * variation, 0.3, 0.95)
+        return np.where(laps >= 2, confidence, 0.5)
+
+class LivePredictor:
+    """
+    Score the live grid of each race once per completed lap.
+    
+    Lap events from a replay (or any live source) update the race's
+    LiveGrid in O(1); when a race lap completes, the features of every
+    driver are read as arrays and the position model scores the whole
+    grid in one batch; a Monte Carlo over the predicted positions adds
+    each driver's win, podium and position probabilities. Predictions
+    and confidence points are published to the race's live state as one
+    'prediction' event per lap, which the confidence stream and SSE
+    subscribers read.
+    
+    Confidence and the simulation's spread come from each prediction's
+    own uncertainty (see ModelManager.predict_with_spread); if scoring
+    fails, confidence falls back to how consistent a driver's recent lap
+    times are.
+    """
+    
+    def __init__(self, prediction_service, results: pd.DataFrame):
+        self.prediction_service = prediction_service
+        self.results = results
+        self.grids: Dict[int, LiveGrid] = {}
+        self.scored = 0
+        self.failures = 0
+        self._score_seconds = deque(maxlen=TIMING_WINDOW)
+    
+    def _entries(self, race_id: int) -> Dict[int, tuple]:
+        """
+        (constructorId, grid position) of each driver in a race's results
+        """
+        if len(self.results) == 0 or 'raceId' not in self.results.columns:
+            return {}
+        
+        race = self.results[self.results['raceId'] == race_id]
+        grid = pd.to_numeric(race['grid'], errors='coerce') if 'grid' in race.columns else pd.Series(np.nan, race.index)
+        # Pit lane starts are recorded as grid 0
+        grid = grid.where(grid > 0)
+        return {int(d): (int(c), None if pd.isna(g) else float(g))
+                for d, c, g in zip(race['driverId'], race['constructorId'], grid)}
+    
+    def start(self, race_id: int, drivers: Dict[int, str]) -> LiveGrid:
+        """
+        Start a race's grid afresh with its entrants (driverId -> code)
+        """
+        grid = LiveGrid(race_id, max(GRID_CAPACITY, len(drivers)))
+        entries = self._entries(race_id)
+        for driver_id, code in drivers.items():
+            grid.add_driver(driver_id, code, *entries.get(driver_id, (0, None)))
+        
+        self.grids[race_id] = grid
+        return grid
+    
+    def on_lap(self, state: LiveRaceState, driver_id: int, driver: str, lap: int, lap_time_ms: float,
+               sector_times_ms: Sequence[float] = (np.nan, np.nan, np.nan)):
+        """
+        Feed one completed lap; scores the grid for every race lap it completes
+        """
+        grid = self.grids.get(state.race_id)
+        if grid is None:
+            grid = self.start(state.race_id, {})
+        
+        row = grid.rows.get(driver_id)
+        if row is None:
+            entries = self._entries(state.race_id)
+            row = grid.add_driver(driver_id, driver, *entries.get(driver_id, (0, None)))
+        
+        for ready in grid.push(row, lap, lap_time_ms, sector_times_ms):
+            self.score(state, grid, ready)
+    
+    def finish(self, state: LiveRaceState):
+        """
+        Score the laps still pending when a race's feed ends
+        """
+        grid = self.grids.get(state.race_id)
+        if grid is not None:
+            for lap in grid.pending_laps():
+                self.score(state, grid, lap)
+    
+    def score(self, state: LiveRaceState, grid: LiveGrid, lap: int):
+        """
+        Predict the whole grid in one batch and publish it for a lap
+        """
+        start = time.perf_counter()
+        features = grid.features()
+        
+        try:
+            positions, spread = self.prediction_service.predict_grid(features)
+            confidence = self.prediction_service.confidence_from_spread(spread)
+        except Exception as e:
+            # Lap-time consistency still gives confidence points; warn once per race rather than every lap
+            if self.failures == 0 or lap == 1:
+                logger.warning(f"Live prediction of race {grid.race_id} lap {lap} failed: {str(e)}")
+            self.failures += 1
+            positions, spread = np.full(len(grid), np.nan), np.full(len(grid), np.nan)
+            confidence = grid.consistency()
+        
+        # Drivers with a lap this race; the finishing order and outcome
+        # probabilities are among them
+        rows = np.flatnonzero(grid.count[:len(grid)] > 0)
+        predicted = positions[rows]
+        scored = not np.isnan(predicted).any()
+        
+        ranks = np.empty(len(rows), dtype=np.int64)
+        ranks[np.argsort(predicted, kind='stable')] = np.arange(1, len(rows) + 1)
+        sigma = np.where(np.isnan(spread[rows]), DEFAULT_SIGMA, spread[rows])
+        probabilities = simulate_positions(predicted, sigma, LIVE_SIMULATIONS, seed=lap) if scored else None
+        
+        predictions = []
+        for i, row in enumerate(rows):
+            prediction = {
+                'driverId': int(grid.driver_ids[row]),
+                'driver': grid.codes[row],
+                'predicted_position': round(float(predicted[i]), 3) if scored else None,
+                'predicted_rank': int(ranks[i]) if scored else None,
+                'uncertainty': round(float(spread[row]), 3) if np.isfinite(spread[row]) else None,
+                'confidence': round(float(confidence[row]), 4),
+                'last_3_laps_mean_ms': int(round(features['last_3_laps_mean'][row])),
+                'last_3_sector_deltas_ms': [int(round(features[f'sector_delta_{s}'][row])) for s in (1, 2, 3)]
+            }
+            if probabilities is not None:
+                prediction['win_probability'] = round(float(probabilities[i, 0]), 4)
+                prediction['podium_probability'] = round(float(probabilities[i, :3].sum()), 4)
+                prediction['position_probs'] = np.round(probabilities[i], 4).tolist()
+            predictions.append(prediction)
+        
+        state.record_predictions(lap, predictions)
+        self.scored += 1
+        self._score_seconds.append(time.perf_counter() - start)
+    
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Laps scored and scoring latency percentiles
+        """
+        if not self._score_seconds:
+            return {'laps_scored': self.scored, 'failures': self.failures, 'score_p50_ms': None, 'score_p99_ms': None}
+        
+        values = np.fromiter(self._score_seconds, dtype=float) * 1000
+        return {
+            'laps_scored': self.scored,
+            'failures': self.failures,
+            'score_p50_ms': round(float(np.percentile(values, 50)), 3),
+            'score_p99_ms': round(float(np.percentile(values, 99)), 3)
+        }
@@ -0,0 +1,32 @@
+import json
+import logging
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds between keep-alive comments when a race is quiet
+HEARTBEAT_SECONDS = 15.0
+
+def parse_cursor(cursor: Optional[str]) -> Tuple[Optional[int], int]:
+    """
+    (epoch, sequence) of an event id "{epoch}-{sequence}"; (None, 0) if absent or malformed
+    """
+    try:
+        epoch, sequence = cursor.split('-')
+        return int(epoch), int(sequence)
+    except (AttributeError, ValueError):
+        return None, 0
+
+def encode_event(kind: str, data, event_id: Optional[str] = None) -> str:
+    """
+    One Server-Sent Events message
+    """
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {kind}", f"data: {json.dumps(data, separators=(',', ':'))}"]
+    return '\n'.join(lines) + '\n\n'
+
+def encode_events(epoch: int, events) -> str:
+    """
+    SSE messages of (sequence, kind, data) events of one live state
+    """
+    return ''.join(encode_event(kind, data, f"{epoch}-{sequence}") for sequence, kind, data in events)
@@ -7,9 +7,16 @@ from datetime import datetime
 from models.model_manager import ModelManager
 from utils.feature_engineering import FeatureEngineer
 from utils.shap_explainer import SHAPExplainer
+from utils.race_simulator import simulate_positions, DEFAULT_SIGMA
 
 logger = logging.getLogger(__name__)
 
+# Cars in a race, for single-driver position distributions
+FIELD_SIZE = 20
+
+# Fixed simulation seed: the same request always gets the same probabilities
+SIMULATION_SEED = 0
+
 class PredictionService:
     def __init__(self):
         self.model_manager = ModelManager()
@@ -24,21 +31,22 @@ class PredictionService:
             # Extract features from request
             features = await self._extract_features(request)
             
-            # Get model prediction
+            # Get model prediction and its spread in one pass
             model = self.model_manager.get_model('position_predictor')
-            prediction = model.predict([features])[0]
+            predictions, spread = self.model_manager.predict_with_spread('position_predictor', features)
+            prediction, sigma = float(predictions[0]), float(spread[0])
             
             # Calculate confidence
-            confidence = await self._calculate_confidence(features, model)
+            confidence = await self._calculate_confidence(features, model, sigma)
             
             # Get SHAP explanations
             explanations = await self._get_explanations(features, model)
             
             # Generate rank probabilities (optional)
-            rank_probs = await self._generate_rank_probabilities(features, model)
+            rank_probs = await self._generate_rank_probabilities(features, model, prediction, sigma)
             
             return {
-                "predicted_position": float(prediction),
+                "predicted_position": prediction,
                 "predicted_rank_probs": rank_probs,
                 "confidence": float(confidence),
                 "explanations": explanations
@@ -48,6 +56,25 @@ class PredictionService:
             logger.error(f"Prediction error: {str(e)}")
             raise
     
+    def predict_grid(self, columns: Dict[str, np.ndarray]) -> tuple:
+        """
+        Predict finishing positions of a whole grid in one batch, from
+        arrays of the base features (one entry per driver); returns the
+        positions and their standard deviations
+        """
+        features = self.feature_engineer.create_feature_matrix(columns)
+        return self.model_manager.predict_with_spread('position_predictor', features)
+    
+    @staticmethod
+    def confidence_from_spread(sigma) -> np.ndarray:
+        """
+        Confidence from the standard deviation (in positions) of a
+        predicted position: 0.95 when the model is certain, falling by 0.1
+        per position of spread, floored at 0.3. Unknown spread gives 0.75.
+        """
+        sigma = np.nan_to_num(np.asarray(sigma, dtype=float), nan=DEFAULT_SIGMA)
+        return np.clip(0.95 - 0.1 * sigma, 0.3, 0.95)
+    
     async def _extract_features(self, request) -> np.ndarray:
         """
         Extract and engineer features from request
@@ -69,21 +96,16 @@ class PredictionService:
         
         return feature_vector
     
-    async def _calculate_confidence(self, features: np.ndarray, model) -> float:
+    async def _calculate_confidence(self, features: np.ndarray, model, sigma: float) -> float:
         """
         Calculate prediction confidence
         """
-        # Mock confidence calculation - replace with actual uncertainty estimation
-        base_confidence = 0.75
-        
-        # Adjust based on feature quality
         if hasattr(model, 'predict_proba'):
             proba = model.predict_proba([features])[0]
             confidence = float(np.max(proba))
         else:
-            # For regression models, use prediction variance or ensemble disagreement
-            confidence = base_confidence + np.random.normal(0, 0.1)
-            confidence = np.clip(confidence, 0.3, 0.95)
+            # For regression models, use the prediction's own spread
+            confidence = float(self.confidence_from_spread(sigma))
         
         return confidence
     
@@ -113,7 +135,8 @@ class PredictionService:
                 ]
             }
     
-    async def _generate_rank_probabilities(self, features: np.ndarray, model) -> Optional[List[float]]:
+    async def _generate_rank_probabilities(self, features: np.ndarray, model, prediction: float,
+                                           sigma: float) -> Optional[List[float]]:
         """
         Generate probability distribution over finishing positions
         """
@@ -122,22 +145,29 @@ class PredictionService:
                 probs = model.predict_proba([features])[0]
                 return probs.tolist()
             else:
-                # For regression models, create probability distribution around prediction
-                prediction = model.predict([features])[0]
-                probs = np.zeros(20)  # Assume max 20 positions
-                
-                # Create normal distribution around prediction
-                for i in range(20):
-                    probs[i] = np.exp(-0.5 * ((i + 1 - prediction) / 2.0) ** 2)
-                
-                # Normalize
-                probs = probs / np.sum(probs)
+                # For regression models, simulate the driver against a full field
+                probs = simulate_positions(*self._field_around(prediction, sigma), seed=SIMULATION_SEED)[0]
                 return probs.tolist()
                 
         except Exception as e:
             logger.warning(f"Rank probability generation failed: {str(e)}")
             return None
     
+    @staticmethod
+    def _field_around(prediction: float, sigma: float, field_size: int = FIELD_SIZE) -> tuple:
+        """
+        Predicted positions and spreads of a grid for a single-driver
+        prediction: the driver first, the rest of the field in the other
+        slots with the default spread
+        """
+        slots = np.arange(1, field_size + 1, dtype=float)
+        nearest = int(np.argmin(np.abs(slots - prediction)))
+        predicted = np.concatenate([[prediction], np.delete(slots, nearest)])
+        spread = np.full(field_size, DEFAULT_SIGMA)
+        if np.isfinite(sigma):
+            spread[0] = sigma
+        return predicted, spread
+    
     async def get_driver_explanations(self, driver_id: int, race_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Get SHAP explanations for a specific driver
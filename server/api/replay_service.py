@@ -0,0 +1,231 @@
+import time
+import asyncio
+import logging
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from typing import Dict, Any, Optional
+
+from api.live_feed import LiveFeed, LiveRaceState
+from api.live_pipeline import LivePredictor
+from api.telemetry_service import TelemetryService
+from utils.telemetry_schema import SECTOR_TIME_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# At max speed, yield to the event loop after this many events
+MAX_SPEED_BATCH = 64
+
+def build_timeline(laps: pa.Table, pit_stops: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replay events of a session ordered by race time.
+
+    One 'lap' event per completed lap, at the driver's cumulative lap
+    time, and one 'pit' event per stop at the end of its lap. value is
+    the lap time (ms) or the stop duration (s). Lap events also carry
+    the lap's sector times from the lap table (NaN where not timed).
+    """
+    columns = ['driverId', 'lap', 'lap_time_ms'] + [name for name in SECTOR_TIME_COLUMNS if name in laps.column_names]
+    frame = laps.select(columns).to_pandas().reindex(columns=['driverId', 'lap', 'lap_time_ms'] + SECTOR_TIME_COLUMNS)
+    frame = frame.astype({'driverId': 'int64', 'lap': 'int64', 'lap_time_ms': 'float64',
+                          **{name: 'float64' for name in SECTOR_TIME_COLUMNS}})
+
+    # Laps without a time (e.g. under red flag) still advance the clock by a typical lap
+    timing = frame['lap_time_ms'].fillna(frame.groupby('driverId')['lap_time_ms'].transform('median')).fillna(0)
+    frame['time_ms'] = timing.groupby(frame['driverId']).cumsum()
+
+    lap_events = pd.DataFrame({
+        'time_ms': frame['time_ms'],
+        'kind': 'lap',
+        'driverId': frame['driverId'],
+        'lap': frame['lap'],
+        'value': frame['lap_time_ms'],
+        'stop': 0,
+        **{name: frame[name] for name in SECTOR_TIME_COLUMNS}
+    }).dropna(subset=['value'])
+
+    pit_events = pd.DataFrame(columns=lap_events.columns)
+    if len(pit_stops) > 0:
+        stops = pit_stops[['driverId', 'lap', 'stop', 'milliseconds']].astype('int64')
+        stops = stops.merge(frame[['driverId', 'lap', 'time_ms']], on=['driverId', 'lap'])
+        pit_events = pd.DataFrame({
+            'time_ms': stops['time_ms'],
+            'kind': 'pit',
+            'driverId': stops['driverId'],
+            'lap': stops['lap'],
+            'value': stops['milliseconds'] / 1000,
+            'stop': stops['stop'],
+            **{name: np.nan for name in SECTOR_TIME_COLUMNS}
+        })
+
+    timeline = pd.concat([lap_events, pit_events], ignore_index=True) if len(pit_events) else lap_events
+    # A pit stop follows the lap it ends
+    return timeline.sort_values(['time_ms', 'kind', 'driverId'], kind='stable', ignore_index=True)
+
+class ReplayRun:
+    """
+    One replay of a session into the live feed, with its timing statistics
+    """
+    
+    def __init__(self, session_id: str, race_id: int, timeline: pd.DataFrame, speed: float):
+        self.session_id = session_id
+        self.race_id = race_id
+        self.timeline = timeline
+        self.speed = speed
+        self.state = 'running'
+        self.applied = 0
+        self.started_at = time.perf_counter()
+        self.elapsed = 0.0
+        # How late each event was applied relative to its scheduled time
+        # (at max speed, how long applying it took)
+        self.lag = np.zeros(len(timeline))
+        self.task: Optional[asyncio.Task] = None
+    
+    def status(self) -> Dict[str, Any]:
+        elapsed = self.elapsed if self.state != 'running' else time.perf_counter() - self.started_at
+        lag = self.lag[:self.applied] * 1000
+        
+        return {
+            'session_id': self.session_id,
+            'raceId': self.race_id,
+            'state': self.state,
+            'speed': self.speed if self.speed > 0 else 'max',
+            'events': len(self.timeline),
+            'applied': self.applied,
+            'race_time_ms': float(self.timeline['time_ms'].iloc[self.applied - 1]) if self.applied else 0.0,
+            'elapsed_s': round(elapsed, 3),
+            'events_per_second': round(self.applied / elapsed, 1) if elapsed > 0 else 0.0,
+            'lag_p50_ms': round(float(np.percentile(lag, 50)), 3) if len(lag) else None,
+            'lag_p99_ms': round(float(np.percentile(lag, 99)), 3) if len(lag) else None
+        }
+
+class ReplayService:
+    """
+    Replay captured sessions into the live feed as if they were happening now.
+    
+    Lap times come from the session's captured lap table and pit stops
+    from pit_stops history of the same raceId. Events are applied at
+    their race time divided by speed (1x, 10x, ...); speed <= 0 replays
+    as fast as possible, yielding to the event loop between batches so
+    the API keeps serving the feed. With a live predictor, laps also feed
+    its rolling grid, which is re-scored once per completed race lap.
+    """
+    
+    def __init__(self, telemetry_service: TelemetryService, live_feed: LiveFeed,
+                 pit_stops: pd.DataFrame, drivers: pd.DataFrame, live_predictor: Optional[LivePredictor] = None):
+        self.telemetry_service = telemetry_service
+        self.live_feed = live_feed
+        self.live_predictor = live_predictor
+        self.pit_stops = pit_stops
+        self.driver_codes = self._driver_codes(drivers)
+        self.runs: Dict[str, ReplayRun] = {}
+    
+    @staticmethod
+    def _driver_codes(drivers: pd.DataFrame) -> Dict[int, str]:
+        if len(drivers) == 0 or 'code' not in drivers.columns:
+            return {}
+        codes = drivers[['driverId', 'code']].dropna()
+        codes = codes[codes['code'] != '\\N']
+        return dict(zip(codes['driverId'].astype(int), codes['code']))
+    
+    def _race_pit_stops(self, race_id: int) -> pd.DataFrame:
+        if len(self.pit_stops) == 0 or 'raceId' not in self.pit_stops.columns:
+            return pd.DataFrame()
+        return self.pit_stops[self.pit_stops['raceId'] == race_id]
+    
+    async def start(self, session_id: str, speed: float = 1.0) -> Dict[str, Any]:
+        """
+        Start replaying a session, replacing any replay of it in progress
+        """
+        try:
+            await self.stop(session_id)
+            
+            race_id = self.telemetry_service.session_keys(session_id)['raceId']
+            laps = await asyncio.to_thread(self.telemetry_service.lap_table, session_id)
+            timeline = build_timeline(laps, self._race_pit_stops(race_id))
+            
+            run = ReplayRun(session_id, race_id, timeline, speed)
+            state = self.live_feed.reset(race_id)
+            if self.live_predictor is not None:
+                driver_ids = sorted(int(d) for d in timeline['driverId'].unique())
+                self.live_predictor.start(race_id, {d: self.driver_codes.get(d, str(d)) for d in driver_ids})
+            run.task = asyncio.create_task(self._run(run, state))
+            self.runs[session_id] = run
+            
+            logger.info(f"Replaying {session_id} (raceId {race_id}): {len(timeline)} events at "
+                        f"{'max' if speed <= 0 else f'{speed}x'} speed")
+            return run.status()
+        
+        except Exception as e:
+            logger.error(f"Error starting replay of {session_id}: {str(e)}")
+            raise
+    
+    async def stop(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Stop a session's replay; the live state it produced is kept
+        """
+        run = self.runs.get(session_id)
+        if run is None:
+            return None
+        
+        if run.task is not None and not run.task.done():
+            run.task.cancel()
+            try:
+                await run.task
+            except asyncio.CancelledError:
+                pass
+        return run.status()
+    
+    def status(self, session_id: str) -> Optional[Dict[str, Any]]:
+        run = self.runs.get(session_id)
+        return run.status() if run is not None else None
+    
+    def apply_event(self, state: LiveRaceState, event) -> None:
+        """
+        Feed one timeline event into a race's live state
+        """
+        driver_id = int(event.driverId)
+        driver = self.driver_codes.get(driver_id, str(driver_id))
+        
+        if event.kind == 'lap':
+            state.record_lap(driver, int(event.lap), float(event.value))
+            if self.live_predictor is not None:
+                self.live_predictor.on_lap(state, driver_id, driver, int(event.lap), float(event.value),
+                                           (event.sector_1_ms, event.sector_2_ms, event.sector_3_ms))
+        else:
+            state.record_pit(driver_id, driver, int(event.lap), int(event.stop), float(event.value))
+    
+    async def _run(self, run: ReplayRun, state: LiveRaceState):
+        start = time.perf_counter()
+        
+        try:
+            for i, event in enumerate(run.timeline.itertuples(index=False)):
+                if run.speed > 0:
+                    scheduled = start + event.time_ms / 1000 / run.speed
+                    delay = scheduled - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                else:
+                    if i % MAX_SPEED_BATCH == 0:
+                        await asyncio.sleep(0)
+                    scheduled = time.perf_counter()
+                
+                self.apply_event(state, event)
+                run.lag[i] = time.perf_counter() - scheduled
+                run.applied = i + 1
+            
+            if self.live_predictor is not None:
+                self.live_predictor.finish(state)
+            run.state = 'finished'
+        
+        except asyncio.CancelledError:
+            run.state = 'stopped'
+            raise
+        
+        except Exception as e:
+            run.state = 'failed'
+            logger.error(f"Replay of {run.session_id} failed: {str(e)}")
+        
+        finally:
+            run.elapsed = time.perf_counter() - run.started_at
+            logger.info(f"Replay of {run.session_id} {run.state}: {run.applied} events")
@@ -0,0 +1,216 @@
+import os
+import json
+import asyncio
+import logging
+import threading
+import pyarrow as pa
+import pyarrow.dataset as ds
+from pyarrow import fs
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+
+from utils.telemetry_schema import PARTITION_SCHEMA, SAMPLE_SCHEMA, LAP_SCHEMA, SAMPLES_DIR, LAPS_DIR
+
+logger = logging.getLogger(__name__)
+
+# Columns a query can project: sample channels plus the lap time joined from the lap table
+QUERY_COLUMNS = [name for name in SAMPLE_SCHEMA.names if name not in ('season', 'raceId', 'session')] + ['lap_time_ms']
+
+class SessionNotFoundError(KeyError):
+    pass
+
+class TelemetryService:
+    """
+    Query captured telemetry straight from the partitioned Parquet datasets.
+    
+    A session_id ({year}_{event}_{session}) resolves to its partition
+    directory through the capture's info file or live manifest. Each
+    session is opened once as a memory-mapped Arrow dataset and kept in
+    a bounded LRU of handles, reopened when a capture adds files. Driver
+    filters prune driverId partitions, and lap, sector and time filters
+    are pushed down to Parquet row-group statistics, so a query reads
+    only the columns and row groups it needs.
+    """
+    
+    def __init__(self, root: str = "data/live_telemetry_saved", max_handles: int = 16):
+        self.root = root
+        self.max_handles = max_handles
+        self.filesystem = fs.LocalFileSystem(use_mmap=True)
+        self._handles = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _session_keys(self, session_id: str) -> Dict[str, Any]:
+        """
+        Partition keys (season, raceId, session) of a captured session
+        """
+        info_file = os.path.join(self.root, f"{session_id}_info.json")
+        manifest_file = os.path.join(self.root, f"{session_id}_live", "manifest.json")
+        
+        if os.path.exists(info_file):
+            with open(info_file) as f:
+                info = json.load(f)
+            if 'raceId' in info:
+                return {'season': int(info['year']), 'raceId': int(info['raceId']), 'session': info['session_type']}
+        
+        if os.path.exists(manifest_file):
+            with open(manifest_file) as f:
+                manifest = json.load(f)
+            year, *_, session = session_id.split('_')
+            return {'season': int(year), 'raceId': int(manifest['race_id']), 'session': session}
+        
+        raise SessionNotFoundError(f"No captured telemetry for session {session_id}")
+    
+    def _signature(self, session_id: str, session_dir: str) -> tuple:
+        """
+        Modification times that change when a capture adds files to a session
+        """
+        paths = [
+            os.path.join(self.root, f"{session_id}_info.json"),
+            os.path.join(self.root, f"{session_id}_live", "manifest.json"),
+            session_dir
+        ]
+        return tuple(os.stat(path).st_mtime_ns if os.path.exists(path) else None for path in paths)
+    
+    def _open(self, session_id: str) -> Dict[str, Any]:
+        """
+        Cached dataset handles of a session, opened or refreshed as needed
+        """
+        with self._lock:
+            handle = self._handles.get(session_id)
+            
+            if handle is not None and self._signature(session_id, handle['samples_dir']) == handle['signature']:
+                self._handles.move_to_end(session_id)
+                return handle
+            
+            keys = self._session_keys(session_id)
+            partition = os.path.join(f"season={keys['season']}", f"raceId={keys['raceId']}",
+                                     f"session={keys['session']}")
+            samples_dir = os.path.abspath(os.path.join(self.root, SAMPLES_DIR, partition))
+            laps_dir = os.path.abspath(os.path.join(self.root, LAPS_DIR, partition))
+            
+            if not os.path.isdir(samples_dir):
+                raise SessionNotFoundError(f"No captured telemetry for session {session_id}")
+            
+            # Below the session directory only driverId is a partition key
+            signature = self._signature(session_id, samples_dir)
+            handle = {
+                'keys': keys,
+                'samples_dir': samples_dir,
+                'signature': signature,
+                'samples': ds.dataset(samples_dir, format='parquet', filesystem=self.filesystem,
+                                      partitioning=ds.partitioning(pa.schema([PARTITION_SCHEMA.field('driverId')]),
+                                                                   flavor='hive')),
+                'laps': ds.dataset(laps_dir, format='parquet', filesystem=self.filesystem)
+                        if os.path.isdir(laps_dir) else None
+            }
+            
+            self._handles[session_id] = handle
+            self._handles.move_to_end(session_id)
+            while len(self._handles) > self.max_handles:
+                self._handles.popitem(last=False)
+            
+            logger.info(f"Opened telemetry dataset for {session_id}: {len(handle['samples'].files)} files")
+            return handle
+    
+    @staticmethod
+    def build_filter(driver_id: Optional[int] = None, lap_min: Optional[int] = None, lap_max: Optional[int] = None,
+                     sector: Optional[int] = None, start_ms: Optional[int] = None,
+                     end_ms: Optional[int] = None) -> Optional[ds.Expression]:
+        """
+        Dataset filter of the query parameters; start_ms/end_ms bound the
+        time into each lap
+        """
+        conditions = []
+        if driver_id is not None:
+            conditions.append(ds.field('driverId') == driver_id)
+        if lap_min is not None:
+            conditions.append(ds.field('lap') >= lap_min)
+        if lap_max is not None:
+            conditions.append(ds.field('lap') <= lap_max)
+        if sector is not None:
+            conditions.append(ds.field('sector') == sector)
+        if start_ms is not None:
+            conditions.append(ds.field('time_ms') >= start_ms)
+        if end_ms is not None:
+            conditions.append(ds.field('time_ms') <= end_ms)
+        
+        if not conditions:
+            return None
+        
+        expression = conditions[0]
+        for condition in conditions[1:]:
+            expression = expression & condition
+        return expression
+    
+    def query(self, session_id: str, driver_id: Optional[int] = None, lap_min: Optional[int] = None,
+              lap_max: Optional[int] = None, sector: Optional[int] = None, start_ms: Optional[int] = None,
+              end_ms: Optional[int] = None, columns: Optional[List[str]] = None,
+              limit: Optional[int] = None) -> pa.Table:
+        """
+        Telemetry samples of a session matching the filters, as an Arrow table
+        """
+        columns = list(columns or QUERY_COLUMNS)
+        unknown = [name for name in columns if name not in QUERY_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown telemetry columns: {unknown}")
+        
+        handle = self._open(session_id)
+        expression = self.build_filter(driver_id, lap_min, lap_max, sector, start_ms, end_ms)
+        
+        join_lap_times = 'lap_time_ms' in columns
+        sample_columns = [name for name in columns if name != 'lap_time_ms']
+        if join_lap_times:
+            sample_columns += [name for name in ('driverId', 'lap') if name not in sample_columns]
+        
+        scanner = handle['samples'].scanner(columns=sample_columns, filter=expression)
+        table = scanner.head(limit) if limit is not None else scanner.to_table()
+        
+        if join_lap_times:
+            table = self._join_lap_times(handle, table, driver_id, lap_min, lap_max)
+        
+        return table.select(columns)
+    
+    def _join_lap_times(self, handle: Dict[str, Any], table: pa.Table, driver_id: Optional[int],
+                        lap_min: Optional[int], lap_max: Optional[int]) -> pa.Table:
+        """
+        Add each sample's lap time from the (small) lap table
+        """
+        if handle['laps'] is None or table.num_rows == 0:
+            return table.append_column('lap_time_ms', pa.nulls(table.num_rows, LAP_SCHEMA.field('lap_time_ms').type))
+        
+        laps = handle['laps'].to_table(
+            columns=['driverId', 'lap', 'lap_time_ms'],
+            filter=self.build_filter(driver_id, lap_min, lap_max)
+        )
+        # The join does not keep row order; _row restores it and is dropped by the caller's select
+        table = table.append_column('_row', pa.array(range(table.num_rows), pa.int64()))
+        return table.join(laps, keys=['driverId', 'lap'], join_type='left outer').sort_by('_row')
+    
+    def session_keys(self, session_id: str) -> Dict[str, Any]:
+        """
+        Partition keys (season, raceId, session) of a captured session
+        """
+        return self._open(session_id)['keys']
+    
+    def lap_table(self, session_id: str) -> pa.Table:
+        """
+        Lap table of a session, one row per driver and lap, sorted by driver and lap
+        """
+        handle = self._open(session_id)
+        if handle['laps'] is None:
+            lap_fields = [field for field in LAP_SCHEMA if field.name not in ('season', 'raceId', 'session')]
+            return pa.schema(lap_fields).empty_table()
+        
+        return handle['laps'].to_table().sort_by([('driverId', 'ascending'), ('lap', 'ascending')])
+    
+    async def get_telemetry_data(self, session_id: str, **filters) -> List[Dict[str, Any]]:
+        """
+        Matching telemetry samples as JSON-ready rows
+        """
+        try:
+            table = await asyncio.to_thread(self.query, session_id, **filters)
+            return table.to_pylist()
+        
+        except Exception as e:
+            logger.error(f"Error querying telemetry for {session_id}: {str(e)}")
+            raise
@@ -1,6 +1,6 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 import uvicorn
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
@@ -11,7 +11,13 @@ import logging
 
 from api.prediction_service import PredictionService
 from api.data_service import DataService
+from api.telemetry_service import TelemetryService, SessionNotFoundError
+from api.live_feed import LiveFeed
+from api.live_pipeline import LivePredictor
+from api.broadcast_hub import BroadcastHub
+from api.replay_service import ReplayService
 from models.model_manager import ModelManager
+from utils.strategy_engine import StrategyEngine
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -34,7 +40,14 @@ app.add_middleware(
 
 # Initialize services
 prediction_service = PredictionService()
-data_service = DataService()
+live_feed = LiveFeed()
+broadcast_hub = BroadcastHub(live_feed)
+data_service = DataService(live_feed)
+telemetry_service = TelemetryService()
+live_predictor = LivePredictor(prediction_service, data_service.results)
+strategy_engine = StrategyEngine(data_service.pit_stops, data_service.races, data_service.results)
+replay_service = ReplayService(telemetry_service, live_feed, data_service.pit_stops, data_service.drivers,
+                               live_predictor)
 model_manager = ModelManager()
 
 # Pydantic models for request/response
@@ -47,6 +60,10 @@ class PredictionRequest(BaseModel):
     live_last_3_sector_deltas_ms: Optional[List[int]] = None
     precomputed_features: Optional[Dict[str, Any]] = None
 
+class ReplayRequest(BaseModel):
+    session_id: str
+    speed: float = 1.0  # 10 for 10x; 0 replays as fast as possible
+
 class FeatureContribution(BaseModel):
     feature: str
     contribution: float
@@ -196,18 +213,106 @@ async def get_confidence_stream(race_id: int):
         logger.error(f"Error getting confidence stream: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/races/{race_id}/live")
+async def stream_live_race(race_id: int, request: Request, cursor: Optional[str] = None,
+                           last_event_id: Optional[str] = Header(None)):
+    """
+    Server-Sent Events of a live race: lap, pit and per-lap prediction deltas.
+    Reconnects resume after the Last-Event-ID header (or cursor parameter)
+    """
+    return StreamingResponse(
+        broadcast_hub.stream(race_id, last_event_id or cursor, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/races/{race_id}/strategy")
+async def get_race_strategy(race_id: int, driver: Optional[str] = None, pit_laps: Optional[str] = None,
+                            total_laps: Optional[int] = None):
+    """
+    Pit strategy what-ifs of a live race: best no-, one- and two-stop plans
+    per driver and the projected outcome of stopping on each lap (or on the
+    comma-separated pit_laps, e.g. driver=VER&pit_laps=22,28)
+    """
+    state = live_feed.get(race_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Race {race_id} is not live")
+    
+    try:
+        laps = [int(lap) for lap in pit_laps.split(',')] if pit_laps else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid pit_laps: {pit_laps}")
+    
+    try:
+        return strategy_engine.evaluate(race_id, state.lap_data(), state.pit_data(), total_laps, driver, laps)
+    except Exception as e:
+        logger.error(f"Error evaluating strategy: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/live/metrics")
+async def get_live_metrics():
+    """
+    Live stream subscribers, fan-out volume, drops and latency, and live
+    prediction scoring latency
+    """
+    return {**broadcast_hub.metrics(), 'predictions': live_predictor.metrics()}
+
 @app.get("/telemetry/{session_id}")
-async def get_telemetry_data(session_id: str, driver_id: Optional[int] = None):
+async def get_telemetry_data(session_id: str, driver_id: Optional[int] = None, lap_min: Optional[int] = None,
+                             lap_max: Optional[int] = None, sector: Optional[int] = None,
+                             start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+                             columns: Optional[str] = None, limit: Optional[int] = None):
     """
-    Get live telemetry data for a session
+    Get captured telemetry for a session, filtered by driver, lap range,
+    sector and time into the lap (ms), with optional comma-separated columns
     """
     try:
-        telemetry = await data_service.get_telemetry_data(session_id, driver_id)
+        telemetry = await telemetry_service.get_telemetry_data(
+            session_id, driver_id=driver_id, lap_min=lap_min, lap_max=lap_max, sector=sector,
+            start_ms=start_ms, end_ms=end_ms, columns=columns.split(',') if columns else None, limit=limit
+        )
         return {"telemetry": telemetry}
+    except SessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting telemetry: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/replay")
+async def start_replay(request: ReplayRequest):
+    """
+    Replay a captured session into the live lap, pit and confidence feeds
+    """
+    try:
+        return await replay_service.start(request.session_id, request.speed)
+    except SessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error starting replay: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/replay/{session_id}")
+async def get_replay_status(session_id: str):
+    """
+    Progress, throughput and lag of a session replay
+    """
+    status = replay_service.status(session_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"No replay of {session_id}")
+    return status
+
+@app.delete("/replay/{session_id}")
+async def stop_replay(session_id: str):
+    """
+    Stop a session replay, keeping the live data it produced
+    """
+    status = await replay_service.stop(session_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"No replay of {session_id}")
+    return status
+
 @app.get("/models/status")
 async def get_model_status():
     """
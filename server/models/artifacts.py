@@ -0,0 +1,335 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import numpy as np
+from typing import Dict, List, Any, Optional
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Bump when the bundle layout changes incompatibly
+ARTIFACT_FORMAT_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+
+# Flat forest node arrays, one .npy file each
+FOREST_ARRAYS = ['children_left', 'children_right', 'feature', 'threshold', 'value', 'roots']
+
+class ScalerParams:
+    """
+    StandardScaler replacement backed by plain mean/scale arrays
+    """
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    @classmethod
+    def from_scaler(cls, scaler) -> 'ScalerParams':
+        n_features = scaler.n_features_in_
+        mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features)
+        scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+        return cls(np.asarray(mean, dtype=np.float64), np.asarray(scale, dtype=np.float64))
+
+    def transform(self, X) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+class FlatForest:
+    """
+    Regression forest stored as flat node arrays.
+
+    All trees share one set of arrays; roots[t] is the index of tree t's
+    root and child indices are global, with -1 marking a leaf. Prediction
+    walks every (sample, tree) pair one level per step, so a whole batch
+    against the whole forest costs max_depth vectorized steps.
+    """
+
+    def __init__(self, children_left: np.ndarray, children_right: np.ndarray, feature: np.ndarray,
+                 threshold: np.ndarray, value: np.ndarray, roots: np.ndarray, max_depth: int):
+        self.children_left = children_left
+        self.children_right = children_right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+
+    @classmethod
+    def from_estimators(cls, estimators: List[Any]) -> 'FlatForest':
+        """
+        Flatten fitted sklearn regression trees
+        """
+        arrays = {name: [] for name in FOREST_ARRAYS if name != 'roots'}
+        roots = []
+        offset = 0
+        max_depth = 0
+
+        for estimator in estimators:
+            tree = estimator.tree_
+            roots.append(offset)
+            is_leaf = tree.children_left == -1
+
+            arrays['children_left'].append(np.where(is_leaf, -1, tree.children_left + offset))
+            arrays['children_right'].append(np.where(is_leaf, -1, tree.children_right + offset))
+            arrays['feature'].append(np.where(is_leaf, 0, tree.feature))
+            arrays['threshold'].append(tree.threshold)
+            arrays['value'].append(tree.value[:, 0, 0])
+
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            children_left=np.concatenate(arrays['children_left']).astype(np.int32),
+            children_right=np.concatenate(arrays['children_right']).astype(np.int32),
+            feature=np.concatenate(arrays['feature']).astype(np.int32),
+            threshold=np.concatenate(arrays['threshold']).astype(np.float64),
+            value=np.concatenate(arrays['value']).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth
+        )
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def append(self, other: 'FlatForest') -> 'FlatForest':
+        """
+        New forest containing this forest's trees followed by other's
+        """
+        offset = len(self.children_left)
+
+        def shift(children):
+            return np.where(children == -1, -1, children + offset).astype(np.int32)
+
+        return FlatForest(
+            children_left=np.concatenate([self.children_left, shift(other.children_left)]),
+            children_right=np.concatenate([self.children_right, shift(other.children_right)]),
+            feature=np.concatenate([self.feature, other.feature]),
+            threshold=np.concatenate([self.threshold, other.threshold]),
+            value=np.concatenate([self.value, other.value]),
+            roots=np.concatenate([self.roots, other.roots + offset]).astype(np.int32),
+            max_depth=max(self.max_depth, other.max_depth)
+        )
+
+    def predict_per_tree(self, X) -> np.ndarray:
+        """
+        Leaf value of every tree for every sample, shape (n_samples, n_trees)
+        """
+        # sklearn compares float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_trees)).copy()
+
+        for _ in range(self.max_depth):
+            left = self.children_left[nodes]
+            is_leaf = left == -1
+            if is_leaf.all():
+                break
+
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(is_leaf, nodes, np.where(go_left, left, self.children_right[nodes]))
+
+        return self.value[nodes]
+
+    def predict(self, X) -> np.ndarray:
+        return self.predict_per_tree(X).mean(axis=1)
+
+class XGBoostPredictor:
+    """
+    Thin wrapper giving an XGBoost Booster a numpy predict()
+    """
+
+    def __init__(self, booster):
+        self.booster = booster
+
+    def predict(self, X) -> np.ndarray:
+        return self.booster.inplace_predict(np.asarray(X, dtype=np.float32))
+
+class LoadedBundle:
+    """
+    A model bundle loaded from disk
+    """
+
+    def __init__(self, model, scaler: Optional[ScalerParams], manifest: Dict[str, Any],
+                 quantile_heads: Optional[Dict[float, Any]] = None):
+        self.model = model
+        self.scaler = scaler
+        self.manifest = manifest
+        # LightGBM quantile models (alpha -> Booster), evaluated on unscaled features
+        self.quantile_heads = quantile_heads or {}
+
+    @property
+    def feature_names(self) -> List[str]:
+        return self.manifest.get('feature_names', [])
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        return self.manifest.get('metrics', {})
+
+    def predict(self, X) -> np.ndarray:
+        if self.scaler is not None:
+            X = self.scaler.transform(X)
+        return self.model.predict(X)
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _write_model_files(model, tmp_dir: str) -> tuple:
+    """
+    Write a model in its portable format; returns (model_format, extra manifest fields)
+    """
+    if isinstance(model, XGBoostPredictor):
+        model = model.booster
+
+    module = type(model).__module__
+
+    if module.startswith('lightgbm'):
+        # LightGBM native text format, cut at the best iteration
+        model.save_model(os.path.join(tmp_dir, "model.txt"))
+        return 'lightgbm', {}
+
+    if module.startswith('xgboost'):
+        model.save_model(os.path.join(tmp_dir, "model.ubj"))
+        return 'xgboost', {}
+
+    if hasattr(model, 'estimators_'):
+        model = FlatForest.from_estimators(model.estimators_)
+    if isinstance(model, FlatForest):
+        for name in FOREST_ARRAYS:
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), getattr(model, name))
+        return 'flat_forest', {'max_depth': int(model.max_depth), 'n_trees': int(model.n_trees)}
+
+    raise ValueError(f"No portable artifact format for {type(model).__name__}")
+
+def _quantile_file(alpha: float) -> str:
+    return f"quantile_{round(alpha * 100):02d}.txt"
+
+def save_bundle(bundle_dir: str, model, scaler=None, feature_names: Optional[List[str]] = None,
+                metrics: Optional[Dict[str, Any]] = None,
+                quantile_heads: Optional[Dict[float, Any]] = None) -> str:
+    """
+    Save a model as a versioned bundle directory.
+
+    The bundle holds the model in a portable format (LightGBM text, XGBoost
+    UBJSON or flat forest .npy arrays), scaler parameters as .npy arrays,
+    any LightGBM quantile heads (alpha -> Booster, taking unscaled
+    features) as text files and a manifest.json with feature names,
+    metrics and file checksums. It is written to a temporary directory
+    and swapped into place.
+    """
+    tmp_dir = f"{bundle_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    try:
+        model_format, extra = _write_model_files(model, tmp_dir)
+
+        quantile_heads = quantile_heads or {}
+        for alpha, head in quantile_heads.items():
+            head.save_model(os.path.join(tmp_dir, _quantile_file(alpha)))
+
+        if scaler is not None:
+            params = scaler if isinstance(scaler, ScalerParams) else ScalerParams.from_scaler(scaler)
+            np.save(os.path.join(tmp_dir, "scaler_mean.npy"), params.mean_)
+            np.save(os.path.join(tmp_dir, "scaler_scale.npy"), params.scale_)
+
+        files = {
+            name: {'sha256': _sha256(os.path.join(tmp_dir, name)),
+                   'bytes': os.path.getsize(os.path.join(tmp_dir, name))}
+            for name in sorted(os.listdir(tmp_dir))
+        }
+
+        manifest = {
+            'format_version': ARTIFACT_FORMAT_VERSION,
+            'model_format': model_format,
+            'has_scaler': scaler is not None,
+            'feature_names': list(feature_names or []),
+            'quantile_heads': {str(alpha): _quantile_file(alpha) for alpha in sorted(quantile_heads)},
+            'metrics': metrics or {},
+            'files': files,
+            'created': datetime.now().isoformat(),
+            **extra
+        }
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2, default=float)
+
+        # Swap the finished bundle into place
+        old_dir = f"{bundle_dir}.old-{os.getpid()}"
+        if os.path.exists(bundle_dir):
+            os.rename(bundle_dir, old_dir)
+        os.rename(tmp_dir, bundle_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    return bundle_dir
+
+def is_bundle(bundle_dir: str) -> bool:
+    return os.path.exists(os.path.join(bundle_dir, MANIFEST_FILE))
+
+def read_manifest(bundle_dir: str) -> Dict[str, Any]:
+    with open(os.path.join(bundle_dir, MANIFEST_FILE)) as f:
+        return json.load(f)
+
+def load_bundle(bundle_dir: str, verify: bool = True) -> LoadedBundle:
+    """
+    Load a bundle without unpickling anything.
+
+    Flat forest and scaler arrays are memory-mapped; boosters are parsed
+    from their native files. With verify, every file is checked against
+    the manifest checksum first.
+    """
+    manifest = read_manifest(bundle_dir)
+
+    if manifest.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format {manifest.get('format_version')} in {bundle_dir}")
+
+    if verify:
+        for name, info in manifest['files'].items():
+            if _sha256(os.path.join(bundle_dir, name)) != info['sha256']:
+                raise ValueError(f"Checksum mismatch for {name} in {bundle_dir}")
+
+    def array(name):
+        return np.load(os.path.join(bundle_dir, f"{name}.npy"), mmap_mode='r', allow_pickle=False)
+
+    model_format = manifest['model_format']
+    if model_format == 'lightgbm':
+        import lightgbm as lgb
+        model = lgb.Booster(model_file=os.path.join(bundle_dir, "model.txt"))
+    elif model_format == 'xgboost':
+        import xgboost as xgb
+        booster = xgb.Booster()
+        booster.load_model(os.path.join(bundle_dir, "model.ubj"))
+        model = XGBoostPredictor(booster)
+    elif model_format == 'flat_forest':
+        model = FlatForest(*(array(name) for name in FOREST_ARRAYS), max_depth=manifest['max_depth'])
+    else:
+        raise ValueError(f"Unknown model format {model_format} in {bundle_dir}")
+
+    scaler = None
+    if manifest.get('has_scaler'):
+        scaler = ScalerParams(array('scaler_mean'), array('scaler_scale'))
+
+    quantile_heads = {}
+    if manifest.get('quantile_heads'):
+        import lightgbm as lgb
+        quantile_heads = {
+            float(alpha): lgb.Booster(model_file=os.path.join(bundle_dir, name))
+            for alpha, name in manifest['quantile_heads'].items()
+        }
+
+    return LoadedBundle(model, scaler, manifest, quantile_heads)
+
+def bundle_files(bundle_dir: str) -> List[str]:
+    """
+    Paths of every file in a bundle, manifest included
+    """
+    return [os.path.join(bundle_dir, name) for name in os.listdir(bundle_dir)]
@@ -0,0 +1,80 @@
+import os
+import time
+import logging
+import numpy as np
+from typing import Dict, List, Any, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+def _timed_ms(fn: Callable, *args) -> float:
+    """
+    Wall time of one call in milliseconds
+    """
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1000
+
+def benchmark_model(predict_fn: Callable[[np.ndarray], np.ndarray], load_fn: Callable[[], Any],
+                    artifact_files: List[str], X_holdout: np.ndarray, y_holdout: np.ndarray,
+                    n_single: int = 200, n_batch: int = 50, batch_size: int = 20,
+                    n_loads: int = 3) -> Dict[str, Any]:
+    """
+    Accuracy and serving-cost benchmark for one candidate model.
+
+    Measures held-out MAE, single-row p50/p99 latency, latency of a
+    batch of batch_size rows (one race grid), total artifact size and
+    load time. predict_fn must include any preprocessing done at serving
+    time (scaling, DMatrix construction).
+    """
+    predictions = predict_fn(X_holdout)
+    mae = float(np.mean(np.abs(predictions - y_holdout)))
+
+    rng = np.random.default_rng(0)
+
+    # Warm up so the first call's lazy initialisation is not measured
+    predict_fn(X_holdout[:1])
+
+    rows = rng.integers(0, len(X_holdout), size=n_single)
+    single_ms = np.array([_timed_ms(predict_fn, X_holdout[i:i + 1]) for i in rows])
+
+    starts = rng.integers(0, max(1, len(X_holdout) - batch_size), size=n_batch)
+    batch_ms = np.array([_timed_ms(predict_fn, X_holdout[i:i + batch_size]) for i in starts])
+
+    load_ms = np.array([_timed_ms(load_fn) for _ in range(n_loads)])
+
+    return {
+        'holdout_mae': mae,
+        'holdout_rows': int(len(X_holdout)),
+        'single_p50_ms': float(np.percentile(single_ms, 50)),
+        'single_p99_ms': float(np.percentile(single_ms, 99)),
+        f'batch{batch_size}_p50_ms': float(np.percentile(batch_ms, 50)),
+        f'batch{batch_size}_p99_ms': float(np.percentile(batch_ms, 99)),
+        'artifact_bytes': int(sum(os.path.getsize(f) for f in artifact_files if os.path.exists(f))),
+        'load_ms': float(np.median(load_ms))
+    }
+
+def select_model(reports: Dict[str, Dict[str, Any]], latency_budget_ms: Optional[float] = None,
+                 latency_key: str = 'single_p99_ms') -> str:
+    """
+    Most accurate model whose latency fits the budget.
+
+    Without a budget the most accurate model wins. If no model fits the
+    budget, the fastest one is chosen and a warning is logged.
+    """
+    if not reports:
+        raise ValueError("No benchmark reports to select from")
+
+    candidates = reports
+    if latency_budget_ms is not None:
+        candidates = {
+            name: report for name, report in reports.items()
+            if report[latency_key] <= latency_budget_ms
+        }
+
+    if not candidates:
+        fastest = min(reports, key=lambda name: reports[name][latency_key])
+        logger.warning(f"No model meets the {latency_budget_ms}ms {latency_key} budget; "
+                       f"falling back to the fastest ({fastest})")
+        return fastest
+
+    return min(candidates, key=lambda name: candidates[name]['holdout_mae'])
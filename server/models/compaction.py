@@ -0,0 +1,82 @@
+import copy
+import logging
+import numpy as np
+import lightgbm as lgb
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# Greedy selection scores candidates on at most this many validation rows
+MAX_SELECTION_ROWS = 5000
+
+def per_tree_predictions(forest, X: np.ndarray) -> np.ndarray:
+    """
+    Predictions of every tree in a fitted forest, shape (n_trees, n_samples)
+    """
+    return np.vstack([tree.predict(X) for tree in forest.estimators_])
+
+def select_tree_subset(tree_predictions: np.ndarray, y: np.ndarray, target_mae: float,
+                       min_trees: int = 10) -> List[int]:
+    """
+    Greedy forward selection of trees.
+
+    Starting from an empty ensemble, repeatedly add the tree whose
+    inclusion gives the lowest MAE, stopping once the subset's MAE is
+    within target_mae. Every step scores all remaining trees at once.
+    """
+    n_trees = tree_predictions.shape[0]
+
+    if tree_predictions.shape[1] > MAX_SELECTION_ROWS:
+        rows = np.random.default_rng(0).choice(tree_predictions.shape[1], MAX_SELECTION_ROWS, replace=False)
+        tree_predictions, y = tree_predictions[:, rows], y[rows]
+
+    selected = []
+    remaining = np.ones(n_trees, dtype=bool)
+    running_sum = np.zeros(tree_predictions.shape[1])
+
+    while remaining.any():
+        candidates = np.flatnonzero(remaining)
+        k = len(selected) + 1
+
+        # (n_candidates, n_samples) ensemble means if each candidate were added
+        candidate_means = (running_sum + tree_predictions[candidates]) / k
+        candidate_maes = np.mean(np.abs(candidate_means - y), axis=1)
+
+        best = candidates[np.argmin(candidate_maes)]
+        selected.append(int(best))
+        remaining[best] = False
+        running_sum += tree_predictions[best]
+
+        if k >= min_trees and candidate_maes.min() <= target_mae:
+            break
+
+    return selected
+
+def subset_forest(forest, tree_indices: List[int]):
+    """
+    Copy of a fitted forest keeping only the given trees
+    """
+    compact = copy.copy(forest)
+    compact.estimators_ = [forest.estimators_[i] for i in tree_indices]
+    compact.n_estimators = len(tree_indices)
+    return compact
+
+def distill_forest(forest_predictions: np.ndarray, X: np.ndarray, num_leaves: int = 15,
+                   max_depth: int = 5, num_boost_round: int = 200, n_threads: int = 0) -> lgb.Booster:
+    """
+    Distill a forest into a shallow LightGBM model trained on its predictions.
+
+    Tree splits are invariant to feature scaling, so the student takes
+    unscaled features and needs no scaler at serving time.
+    """
+    params = {
+        'objective': 'regression',
+        'metric': 'mae',
+        'num_leaves': num_leaves,
+        'max_depth': max_depth,
+        'learning_rate': 0.1,
+        'num_threads': n_threads,
+        'verbose': -1
+    }
+
+    return lgb.train(params, lgb.Dataset(X, label=forest_predictions), num_boost_round=num_boost_round)
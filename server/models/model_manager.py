@@ -1,20 +1,32 @@
 import pickle
+import json
 import joblib
 import numpy as np
 import pandas as pd
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import logging
 import os
 from datetime import datetime
+from statistics import NormalDist
+
+from models.artifacts import FlatForest, save_bundle, load_bundle, is_bundle
 
 logger = logging.getLogger(__name__)
 
+# A Gaussian error's standard deviation is about 1.25 times its mean absolute error
+MAE_TO_STD = 1.25
+
 class ModelManager:
     def __init__(self):
         self.models = {}
         self.scalers = {}
         self.feature_names = {}
         self.model_metadata = {}
+        # LightGBM quantile models bundled with a model (alpha -> Booster)
+        self.quantile_heads = {}
+        # sklearn forests flattened once for per-tree predictions
+        self._flat_forests = {}
+        self._constant_spread_warned = set()
         self._load_models()
     
     def _load_models(self):
@@ -42,6 +54,25 @@ class ModelManager:
         Load a specific model from disk
         """
         try:
+            bundle_dir = os.path.join(models_path, model_name)
+            if is_bundle(bundle_dir):
+                bundle = load_bundle(bundle_dir)
+                self.models[model_name] = bundle.model
+                if bundle.scaler is not None:
+                    self.scalers[model_name] = bundle.scaler
+                self.feature_names[model_name] = bundle.feature_names
+                if bundle.quantile_heads:
+                    self.quantile_heads[model_name] = bundle.quantile_heads
+                
+                self.model_metadata[model_name] = {
+                    "metrics": bundle.metrics,
+                    "artifact_format": bundle.manifest.get("model_format"),
+                    **self._load_json_sidecars(model_name, models_path)
+                }
+                logger.info(f"Loaded model bundle: {model_name}")
+                return
+            
+            # Legacy pickled artifacts; convert with scripts/convert_artifacts.py
             model_file = os.path.join(models_path, f"{model_name}.pkl")
             scaler_file = os.path.join(models_path, f"{model_name}_scaler.pkl")
             features_file = os.path.join(models_path, f"{model_name}_features.pkl")
@@ -56,9 +87,28 @@ class ModelManager:
                 if os.path.exists(features_file):
                     self.feature_names[model_name] = joblib.load(features_file)
                     
+                self.model_metadata[model_name] = self._load_json_sidecars(model_name, models_path)
+        
         except Exception as e:
             logger.error(f"Error loading model {model_name}: {str(e)}")
     
+    def _load_json_sidecars(self, model_name: str, models_path: str) -> Dict[str, Any]:
+        """
+        Load the metrics and benchmark reports saved next to a model
+        """
+        metadata = {}
+        
+        for key in ("metrics", "benchmark"):
+            sidecar_file = os.path.join(models_path, f"{model_name}_{key}.json")
+            if os.path.exists(sidecar_file):
+                try:
+                    with open(sidecar_file) as f:
+                        metadata[key] = json.load(f)
+                except Exception as e:
+                    logger.warning(f"Could not read {sidecar_file}: {str(e)}")
+        
+        return metadata
+    
     def _create_mock_models(self):
         """
         Create mock models for development
@@ -131,6 +181,74 @@ class ModelManager:
         
         return model.predict(features)
     
+    def _forest(self, model_name: str, model) -> Optional[FlatForest]:
+        """
+        The model as a flat forest, if it is an averaging tree ensemble
+        """
+        if isinstance(model, FlatForest):
+            return model
+        
+        from sklearn.ensemble import RandomForestRegressor, ExtraTreesRegressor
+        if not isinstance(model, (RandomForestRegressor, ExtraTreesRegressor)):
+            return None
+        
+        cached = self._flat_forests.get(model_name)
+        if cached is None or cached[0] is not model:
+            cached = (model, FlatForest.from_estimators(list(model.estimators_)))
+            self._flat_forests[model_name] = cached
+        return cached[1]
+    
+    def predict_with_spread(self, model_name: str, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predictions for a batch of feature rows and the standard deviation
+        of each.
+        
+        A model bundled with quantile heads gets each row's spread from the
+        interval between its lowest and highest quantile, read as a normal
+        distribution's; this works the same whichever model serves the
+        point prediction. A forest without heads is evaluated tree by tree
+        in one vectorized walk (see FlatForest.predict_per_tree), its mean
+        the prediction and its spread across trees the uncertainty. Other
+        models fall back to one spread from their validation MAE (NaN if
+        unknown). All are deterministic for the same input.
+        """
+        model = self.get_model(model_name)
+        scaler = self.get_scaler(model_name)
+        heads = self.quantile_heads.get(model_name)
+        
+        raw = np.atleast_2d(features)
+        features = scaler.transform(raw) if scaler is not None else raw
+        
+        if heads:
+            predictions = np.asarray(model.predict(features), dtype=float)
+            return predictions, self._quantile_spread(heads, raw)
+        
+        forest = self._forest(model_name, model)
+        if forest is not None:
+            per_tree = forest.predict_per_tree(features)
+            return per_tree.mean(axis=1), per_tree.std(axis=1)
+        
+        if model_name not in self._constant_spread_warned:
+            logger.warning(f"{model_name} has no quantile heads; using one spread for every prediction. "
+                           f"Retrain to bundle them")
+            self._constant_spread_warned.add(model_name)
+        
+        predictions = np.asarray(model.predict(features), dtype=float)
+        mae = self.model_metadata.get(model_name, {}).get('metrics', {}).get('mae')
+        spread = np.full(len(predictions), MAE_TO_STD * float(mae) if mae else np.nan)
+        return predictions, spread
+    
+    @staticmethod
+    def _quantile_spread(heads: Dict[float, Any], features: np.ndarray) -> np.ndarray:
+        """
+        Standard deviation of each row from its outermost quantile predictions
+        """
+        low, high = min(heads), max(heads)
+        width = heads[high].predict(features) - heads[low].predict(features)
+        z_width = NormalDist().inv_cdf(high) - NormalDist().inv_cdf(low)
+        # Independently fitted quantiles can cross; a crossed interval means little spread
+        return np.maximum(width, 0.0) / z_width
+    
     def get_model_status(self) -> Dict[str, Any]:
         """
         Get status of all loaded models
@@ -143,7 +261,9 @@ class ModelManager:
                 "type": type(self.models[model_name]).__name__,
                 "features": len(self.feature_names.get(model_name, [])),
                 "has_scaler": model_name in self.scalers,
-                "metadata": self.model_metadata.get(model_name, {})
+                "quantile_heads": sorted(self.quantile_heads.get(model_name, {})),
+                "metadata": self.model_metadata.get(model_name, {}),
+                "benchmark": self.model_metadata.get(model_name, {}).get("benchmark")
             }
         
         return status
@@ -156,19 +276,9 @@ class ModelManager:
             models_path = "models/saved/"
             os.makedirs(models_path, exist_ok=True)
             
-            # Save model
-            model_file = os.path.join(models_path, f"{model_name}.pkl")
-            joblib.dump(model, model_file)
-            
-            # Save scaler if provided
-            if scaler is not None:
-                scaler_file = os.path.join(models_path, f"{model_name}_scaler.pkl")
-                joblib.dump(scaler, scaler_file)
-            
-            # Save feature names if provided
-            if feature_names is not None:
-                features_file = os.path.join(models_path, f"{model_name}_features.pkl")
-                joblib.dump(feature_names, features_file)
+            # Save model, scaler and feature names as one bundle
+            save_bundle(os.path.join(models_path, model_name), model, scaler=scaler,
+                        feature_names=feature_names)
             
             # Update in-memory storage
             self.models[model_name] = model
@@ -0,0 +1,217 @@
+import json
+import math
+import os
+import logging
+import numpy as np
+from typing import Dict, List, Any, Callable
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+class TrialJournal:
+    """
+    Append-only JSON-lines journal of hyperparameter trials.
+
+    The first line records the search settings; every later line is one
+    finished (trial, rung) evaluation. Lines are flushed and fsynced as
+    they are written, so an interrupted search loses at most the trials
+    that were still running.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> tuple:
+        """
+        Return (settings, {(trial_id, rung): record}) from the journal
+        """
+        settings = None
+        records = {}
+
+        if not os.path.exists(self.path):
+            return settings, records
+
+        with open(self.path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from an interrupted write
+                    logger.warning(f"Skipping corrupt journal line in {self.path}")
+                    continue
+
+                if entry.get('type') == 'settings':
+                    settings = entry['settings']
+                else:
+                    records[(entry['trial_id'], entry['rung'])] = entry
+
+        return settings, records
+
+    def append(self, entry: Dict[str, Any]):
+        """
+        Durably append one entry
+        """
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(entry, default=float) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+def sample_configs(search_space: Dict[str, tuple], n_trials: int, seed: int) -> List[Dict[str, Any]]:
+    """
+    Draw n_trials configurations deterministically from a search space.
+
+    Each parameter is ('int', low, high, log), ('float', low, high, log)
+    or ('choice', options). The same seed always yields the same configs,
+    which is what lets a resumed search line up with its journal.
+    """
+    rng = np.random.default_rng(seed)
+    configs = []
+
+    for _ in range(n_trials):
+        config = {}
+        for name, spec in search_space.items():
+            kind = spec[0]
+            if kind == 'choice':
+                config[name] = spec[1][int(rng.integers(len(spec[1])))]
+                continue
+
+            low, high, log = spec[1], spec[2], spec[3]
+            if log:
+                value = math.exp(rng.uniform(math.log(low), math.log(high)))
+            else:
+                value = rng.uniform(low, high)
+
+            config[name] = int(round(value)) if kind == 'int' else float(value)
+        configs.append(config)
+
+    return configs
+
+class SuccessiveHalvingSearch:
+    """
+    Resumable successive-halving search for one model.
+
+    Rung k evaluates its surviving trials with min_resource * eta**k units
+    of resource (boosting rounds or trees); the best 1/eta of each rung
+    are promoted to the next one. Trials within a rung run concurrently.
+    """
+
+    def __init__(self, model_name: str, search_space: Dict[str, tuple], resource_param: str,
+                 n_trials: int = 27, eta: int = 3, min_resource: int = 50,
+                 max_resource: int = 1000, seed: int = 42, journal_dir: str = "models/saved/tuning"):
+        self.model_name = model_name
+        self.search_space = search_space
+        self.resource_param = resource_param
+        self.n_trials = n_trials
+        self.eta = eta
+        self.min_resource = min_resource
+        self.max_resource = max_resource
+        self.seed = seed
+        self.journal = TrialJournal(os.path.join(journal_dir, f"{model_name}_journal.jsonl"))
+
+    def settings(self) -> Dict[str, Any]:
+        """
+        Settings that must match for a journal to be resumed
+        """
+        return {
+            'model': self.model_name,
+            'search_space': {name: list(spec) for name, spec in self.search_space.items()},
+            'resource_param': self.resource_param,
+            'n_trials': self.n_trials,
+            'eta': self.eta,
+            'min_resource': self.min_resource,
+            'max_resource': self.max_resource,
+            'seed': self.seed
+        }
+
+    def rung_resources(self) -> List[int]:
+        """
+        Resource given to each rung, capped at max_resource
+        """
+        resources = []
+        resource = self.min_resource
+        while resource < self.max_resource and len(resources) < 32:
+            resources.append(int(resource))
+            resource *= self.eta
+        resources.append(int(self.max_resource))
+        return resources
+
+    def run(self, evaluate: Callable[[Dict[str, Dict[str, Any]], Callable], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run (or resume) the search.
+
+        evaluate(jobs, on_result) receives {job_name: params} for the trials
+        still missing from the current rung and calls on_result(job_name,
+        result) as each finishes, where result['score'] is lower-is-better.
+        """
+        settings, records = self.journal.load()
+
+        if settings is None:
+            self.journal.append({'type': 'settings', 'settings': self.settings(),
+                                 'created': datetime.now().isoformat()})
+        elif json.loads(json.dumps(settings)) != json.loads(json.dumps(self.settings())):
+            raise ValueError(f"Journal {self.journal.path} was written with different search "
+                             f"settings; remove it or use another journal directory")
+        elif records:
+            logger.info(f"Resuming {self.model_name} search with {len(records)} finished evaluations")
+
+        configs = sample_configs(self.search_space, self.n_trials, self.seed)
+        survivors = list(range(self.n_trials))
+
+        for rung, resource in enumerate(self.rung_resources()):
+            pending = {
+                f"{self.model_name}_t{trial_id}_r{rung}": trial_id
+                for trial_id in survivors if (trial_id, rung) not in records
+            }
+
+            logger.info(f"{self.model_name} rung {rung}: {len(survivors)} trials at "
+                        f"{self.resource_param}={resource} ({len(pending)} to run)")
+
+            def record_result(job_name, result, rung=rung, resource=resource):
+                trial_id = pending[job_name]
+                entry = {
+                    'type': 'trial',
+                    'trial_id': trial_id,
+                    'rung': rung,
+                    'resource': resource,
+                    'params': configs[trial_id],
+                    'score': float(result['score']),
+                    'metrics': result.get('metrics', {}),
+                    'finished': datetime.now().isoformat()
+                }
+                self.journal.append(entry)
+                records[(trial_id, rung)] = entry
+
+            if pending:
+                jobs = {
+                    job_name: {**configs[trial_id], self.resource_param: resource}
+                    for job_name, trial_id in pending.items()
+                }
+                evaluate(jobs, record_result)
+
+            scored = [(records[(t, rung)]['score'], t) for t in survivors if (t, rung) in records]
+            if len(scored) < len(survivors):
+                raise RuntimeError(f"{len(survivors) - len(scored)} trials failed in rung {rung}; "
+                                   f"rerun to retry them")
+
+            scored.sort()
+            if resource >= self.max_resource or len(scored) == 1:
+                best_score, best_trial = scored[0]
+                break
+
+            survivors = [t for _, t in scored[:max(1, len(scored) // self.eta)]]
+
+        best = {
+            'model': self.model_name,
+            'trial_id': best_trial,
+            'score': best_score,
+            'params': {**configs[best_trial], self.resource_param: int(self.max_resource)}
+        }
+
+        logger.info(f"{self.model_name} best trial {best_trial}: score {best_score:.4f}")
+
+        return best
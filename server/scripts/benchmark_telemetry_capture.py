@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Benchmark telemetry extraction (per-point dicts versus column slices) and storage layout
+"""
+
+import os
+import sys
+import time
+import tempfile
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.capture_telemetry import (sample_lap_telemetry, lap_telemetry_columns, lap_sector_times,
+                                       build_telemetry_table, TELEMETRY_SCHEMA)
+from utils.telemetry_schema import normalize_telemetry, write_telemetry_dataset, telemetry_dataset
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def synthetic_session(n_drivers: int = 20, n_laps: int = 58, points_per_lap: int = 100, seed: int = 0) -> dict:
+    """
+    FastF1-shaped sampled lap telemetry for a whole race, keyed by driver
+    """
+    rng = np.random.default_rng(seed)
+    session = {}
+
+    for driver in range(n_drivers):
+        laps = []
+        for lap_number in range(1, n_laps + 1):
+            lap_time = pd.Timedelta(milliseconds=int(90000 + rng.normal(0, 1500)))
+            offsets = np.sort(rng.uniform(0, lap_time.total_seconds(), points_per_lap))
+            telemetry = pd.DataFrame({
+                'Time': pd.to_timedelta(offsets, unit='s'),
+                'RPM': rng.uniform(8000, 12000, points_per_lap),
+                'Speed': rng.uniform(80, 330, points_per_lap),
+                'nGear': rng.integers(1, 9, points_per_lap),
+                'Throttle': rng.uniform(0, 100, points_per_lap),
+                'Brake': rng.random(points_per_lap) < 0.2,
+                'DRS': rng.choice([0, 8, 12], points_per_lap),
+                'X': rng.normal(0, 3000, points_per_lap),
+                'Y': rng.normal(0, 3000, points_per_lap),
+                'Distance': np.linspace(0, 5000, points_per_lap)
+            })
+            sector_split = [lap_time * share for share in (0.3, 0.35, 0.35)]
+            laps.append((pd.Series({'LapNumber': float(lap_number), 'LapTime': lap_time,
+                                    **{f"Sector{k}Time": sector_split[k - 1] for k in (1, 2, 3)}}), telemetry))
+        session[driver + 1] = laps
+
+    return session
+
+def cached_session(year: int, event: str, session: str, cache_dir: str) -> dict:
+    """
+    Sampled lap telemetry of a session from the FastF1 cache
+    """
+    import fastf1
+
+    fastf1.Cache.enable_cache(cache_dir)
+    session_obj = fastf1.get_session(year, event, session)
+    session_obj.load()
+
+    laps_by_driver = {}
+    for driver in session_obj.drivers:
+        laps_by_driver[driver] = [
+            (lap, sample_lap_telemetry(lap))
+            for _, lap in session_obj.laps.pick_driver(driver).iterlaps()
+        ]
+    return laps_by_driver
+
+def legacy_extract(laps_by_driver: dict, session_id: str, race_id: int) -> pa.Table:
+    """
+    The previous extraction: one dict per telemetry point via iterrows
+    """
+    telemetry_data = []
+
+    for driver, laps in laps_by_driver.items():
+        for lap, lap_telemetry in laps:
+            sector_times = lap_sector_times(lap)
+            sector_1, sector_2, _ = sector_times
+            sector_ms = [value.total_seconds() * 1000 if pd.notna(value) else None for value in sector_times]
+            for _, telem_point in lap_telemetry.iterrows():
+                # Sector from the lap's sector timing; 0 without it
+                if pd.notna(sector_1) and pd.notna(sector_2):
+                    sector = 1 + (telem_point['Time'] >= sector_1) + (telem_point['Time'] >= sector_1 + sector_2)
+                else:
+                    sector = 0
+                telemetry_data.append({
+                    'session_id': session_id,
+                    'timestamp': telem_point['Time'],
+                    'event_type': 'telemetry',
+                    'driverId': driver,
+                    'raceId': race_id,
+                    'lap': lap['LapNumber'],
+                    'sector': int(sector),
+                    'lap_time_ms': lap['LapTime'].total_seconds() * 1000 if pd.notna(lap['LapTime']) else None,
+                    'sector_1_ms': sector_ms[0],
+                    'sector_2_ms': sector_ms[1],
+                    'sector_3_ms': sector_ms[2],
+                    'speed_kmh': telem_point.get('Speed', 0),
+                    'track_pos_x': telem_point.get('X', 0),
+                    'track_pos_y': telem_point.get('Y', 0),
+                    'additional_json': {
+                        'throttle': telem_point.get('Throttle', 0),
+                        'brake': telem_point.get('Brake', 0),
+                        'gear': telem_point.get('nGear', 0),
+                        'rpm': telem_point.get('RPM', 0),
+                        'drs': telem_point.get('DRS', 0)
+                    }
+                })
+
+    return pa.Table.from_pandas(pd.DataFrame(telemetry_data), schema=TELEMETRY_SCHEMA, preserve_index=False)
+
+def vectorized_extract(laps_by_driver: dict, session_id: str, race_id: int) -> pa.Table:
+    """
+    The current extraction: per-lap column slices concatenated per driver
+    """
+    tables = [
+        build_telemetry_table(
+            [lap_telemetry_columns(telemetry, lap['LapNumber'], lap['LapTime'], lap_sector_times(lap))
+             for lap, telemetry in laps],
+            session_id, race_id, driver
+        )
+        for driver, laps in laps_by_driver.items()
+    ]
+    return pa.concat_tables(tables)
+
+def _median_ms(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+def benchmark_storage(table: pa.Table, repeats: int) -> dict:
+    """
+    Size and scan speed of one session file versus the partitioned flat layout
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # The previous layout: one pandas-written file per session
+        legacy_file = os.path.join(tmp_dir, "session_telemetry.parquet")
+        table.to_pandas().to_parquet(legacy_file, index=False)
+
+        samples, laps = normalize_telemetry(table, 2024, 'R')
+        dataset_root = os.path.join(tmp_dir, "telemetry")
+        files = write_telemetry_dataset(samples, laps, dataset_root)
+
+        driver_id = table.column('driverId')[0].as_py()
+
+        return {
+            'legacy_bytes': os.path.getsize(legacy_file),
+            'partitioned_bytes': sum(os.path.getsize(os.path.join(dataset_root, f)) for f in files),
+            'legacy_full_scan_ms': _median_ms(lambda: pd.read_parquet(legacy_file), repeats),
+            'partitioned_full_scan_ms': _median_ms(
+                lambda: telemetry_dataset(dataset_root).to_table().to_pandas(), repeats),
+            'legacy_driver_scan_ms': _median_ms(
+                lambda: pd.read_parquet(legacy_file, columns=['speed_kmh', 'additional_json'],
+                                        filters=[('driverId', '==', driver_id)]), repeats),
+            'partitioned_driver_scan_ms': _median_ms(
+                lambda: telemetry_dataset(dataset_root).to_table(
+                    columns=['speed_kmh', 'gear'], filter=ds.field('driverId') == driver_id).to_pandas(), repeats)
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark telemetry extraction')
+    parser.add_argument('--year', type=int, help='Season year of a cached session (default: synthetic race)')
+    parser.add_argument('--event', type=str, default='Monaco', help='Event name')
+    parser.add_argument('--session', type=str, default='R', help='Session type')
+    parser.add_argument('--cache-dir', type=str, default='cache', help='FastF1 cache directory')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per method')
+
+    args = parser.parse_args()
+
+    if args.year:
+        laps_by_driver = cached_session(args.year, args.event, args.session, args.cache_dir)
+        source = f"{args.year} {args.event} {args.session}"
+    else:
+        laps_by_driver = synthetic_session()
+        source = "synthetic 20-driver, 58-lap race"
+
+    results = {}
+    for name, extract in (('iterrows', legacy_extract), ('column slices', vectorized_extract)):
+        timings = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            table = extract(laps_by_driver, 'benchmark', 0)
+            timings.append(time.perf_counter() - start)
+        results[name] = table
+
+        seconds = float(np.median(timings))
+        logger.info(f"{name}: {table.num_rows} rows in {seconds:.3f}s ({table.num_rows / seconds:,.0f} rows/s)")
+
+    if not results['iterrows'].equals(results['column slices']):
+        logger.error("Extraction outputs differ")
+        return 1
+
+    logger.info(f"Outputs identical on {source}")
+
+    storage = benchmark_storage(results['column slices'], args.repeats)
+    logger.info(f"Storage: {storage['legacy_bytes'] / 1e6:.2f}MB single file -> "
+                f"{storage['partitioned_bytes'] / 1e6:.2f}MB partitioned")
+    logger.info(f"Full scan: {storage['legacy_full_scan_ms']:.1f}ms -> {storage['partitioned_full_scan_ms']:.1f}ms; "
+                f"one driver, two channels: {storage['legacy_driver_scan_ms']:.1f}ms -> "
+                f"{storage['partitioned_driver_scan_ms']:.1f}ms")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -6,26 +6,271 @@ Script to capture live F1 telemetry using FastF1
 import fastf1
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import pyarrow.dataset as ds
 from datetime import datetime
+from typing import Dict, List, Any, Optional
 import os
+import sys
+import json
+import shutil
 import logging
 import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.telemetry_schema import normalize_telemetry, write_telemetry_dataset, PARTITION_SCHEMA, SAMPLE_SCHEMA
+from utils.downsampling import downsample_telemetry
+from utils.id_resolver import load_id_resolver
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Most telemetry samples kept per lap; laps usually need fewer
+SAMPLES_PER_LAP = 100
+
+# Races and drivers missing from the dataset CSVs (e.g. a season newer
+# than the data) get deterministic IDs above any real one: year * 100 +
+# round for races, this base plus the car number for drivers
+UNKNOWN_DRIVER_BASE = 100000
+
+# Channels stored in additional_json, with the value used when FastF1 lacks one
+ADDITIONAL_CHANNELS = {
+    'throttle': ('Throttle', pa.float64(), 0.0),
+    'brake': ('Brake', pa.bool_(), False),
+    'gear': ('nGear', pa.int64(), 0),
+    'rpm': ('RPM', pa.float64(), 0.0),
+    'drs': ('DRS', pa.int64(), 0)
+}
+
+# Row-per-sample layout produced by extraction; normalize_telemetry
+# flattens it into the stored sample and lap tables
+TELEMETRY_SCHEMA = pa.schema([
+    ('session_id', pa.string()),
+    ('timestamp', pa.duration('ns')),
+    ('event_type', pa.string()),
+    ('driverId', pa.int64()),
+    ('raceId', pa.int64()),
+    ('lap', pa.float64()),
+    ('sector', pa.int64()),
+    ('lap_time_ms', pa.float64()),
+    ('sector_1_ms', pa.float64()),
+    ('sector_2_ms', pa.float64()),
+    ('sector_3_ms', pa.float64()),
+    ('speed_kmh', pa.float64()),
+    ('track_pos_x', pa.float64()),
+    ('track_pos_y', pa.float64()),
+    ('additional_json', pa.struct([(name, dtype) for name, (_, dtype, _) in ADDITIONAL_CHANNELS.items()]))
+])
+
+def sample_lap_telemetry(lap, max_points: int = SAMPLES_PER_LAP, tolerance_scale: float = 1.0) -> pd.DataFrame:
+    """
+    Merged telemetry of one lap, adaptively downsampled to at most max_points.
+    
+    Samples are kept where the channels change shape (braking, apexes,
+    gear changes) rather than at even intervals; tolerance_scale loosens
+    or tightens the per-channel error tolerances.
+    """
+    return downsample_telemetry(lap.get_telemetry(), tolerance_scale=tolerance_scale, max_points=max_points)
+
+def _channel(telemetry: pd.DataFrame, column: str, default, dtype) -> np.ndarray:
+    """
+    One telemetry channel as a typed array, or the default if it is missing
+    """
+    if column not in telemetry.columns:
+        return np.full(len(telemetry), default, dtype=dtype)
+    
+    values = telemetry[column]
+    if not np.issubdtype(dtype, np.floating):
+        # Integer and boolean channels cannot hold NaN
+        values = values.fillna(default)
+    return values.to_numpy(dtype=dtype)
+
+def _duration_ms(value) -> float:
+    """
+    Milliseconds of a timing duration, NaN when it is missing
+    """
+    return pd.Timedelta(value).total_seconds() * 1000 if pd.notna(value) else np.nan
+
+def lap_sector_times(lap) -> tuple:
+    """
+    FastF1 Sector1Time/Sector2Time/Sector3Time of a lap (NaT where not timed)
+    """
+    return tuple(lap.get(f"Sector{k}Time", pd.NaT) for k in (1, 2, 3))
+
+def lap_telemetry_columns(telemetry: pd.DataFrame, lap_number: float, lap_time,
+                          sector_times: tuple = (pd.NaT, pd.NaT, pd.NaT)) -> Dict[str, np.ndarray]:
+    """
+    Column slices of one lap's telemetry, with lap-level values broadcast
+    """
+    n_points = len(telemetry)
+    lap_time_ms = _duration_ms(lap_time)
+    timestamp = telemetry['Time'].to_numpy(dtype='timedelta64[ns]')
+    
+    # Each sample's sector from the lap's sector timing (Time is time into
+    # the lap); 0 when the lap lacks the first two sector times, e.g. lap 1
+    sector_1_ms, sector_2_ms, sector_3_ms = (_duration_ms(value) for value in sector_times)
+    if np.isfinite(sector_1_ms) and np.isfinite(sector_2_ms):
+        boundaries = np.array([sector_1_ms, sector_1_ms + sector_2_ms]) * 1_000_000
+        sector = 1 + np.searchsorted(boundaries, timestamp.astype(np.int64), side='right')
+    else:
+        sector = np.zeros(n_points, dtype=np.int64)
+    
+    columns = {
+        'timestamp': timestamp,
+        'lap': np.full(n_points, lap_number, dtype=np.float64),
+        'sector': sector.astype(np.int64),
+        'lap_time_ms': np.full(n_points, lap_time_ms, dtype=np.float64),
+        'sector_1_ms': np.full(n_points, sector_1_ms, dtype=np.float64),
+        'sector_2_ms': np.full(n_points, sector_2_ms, dtype=np.float64),
+        'sector_3_ms': np.full(n_points, sector_3_ms, dtype=np.float64),
+        'speed_kmh': _channel(telemetry, 'Speed', 0.0, np.float64),
+        'track_pos_x': _channel(telemetry, 'X', 0.0, np.float64),
+        'track_pos_y': _channel(telemetry, 'Y', 0.0, np.float64)
+    }
+    
+    for name, (column, dtype, default) in ADDITIONAL_CHANNELS.items():
+        columns[name] = _channel(telemetry, column, default, dtype.to_pandas_dtype())
+    
+    return columns
+
+def build_telemetry_table(lap_columns: List[Dict[str, np.ndarray]], session_id: str,
+                          race_id: int, driver_id: int) -> pa.Table:
+    """
+    Concatenate per-lap column slices into one typed telemetry table
+    """
+    if not lap_columns:
+        return TELEMETRY_SCHEMA.empty_table()
+    
+    merged = {name: np.concatenate([lap[name] for lap in lap_columns]) for name in lap_columns[0]}
+    n_rows = len(merged['lap'])
+    
+    additional = pa.StructArray.from_arrays(
+        [pa.array(merged[name], type=dtype, from_pandas=True) for name, (_, dtype, _) in ADDITIONAL_CHANNELS.items()],
+        names=list(ADDITIONAL_CHANNELS)
+    )
+    
+    return pa.Table.from_arrays([
+        pa.array(np.full(n_rows, session_id, dtype=object), type=pa.string()),
+        pa.array(merged['timestamp'], type=pa.duration('ns')),
+        pa.array(np.full(n_rows, 'telemetry', dtype=object), type=pa.string()),
+        pa.array(np.full(n_rows, driver_id, dtype=np.int64)),
+        pa.array(np.full(n_rows, race_id, dtype=np.int64)),
+        pa.array(merged['lap']),
+        pa.array(merged['sector']),
+        pa.array(merged['lap_time_ms'], from_pandas=True),
+        pa.array(merged['sector_1_ms'], from_pandas=True),
+        pa.array(merged['sector_2_ms'], from_pandas=True),
+        pa.array(merged['sector_3_ms'], from_pandas=True),
+        pa.array(merged['speed_kmh'], from_pandas=True),
+        pa.array(merged['track_pos_x'], from_pandas=True),
+        pa.array(merged['track_pos_y'], from_pandas=True),
+        additional
+    ], schema=TELEMETRY_SCHEMA)
+
+def extract_driver_telemetry(driver_laps, session_id: str, race_id: int, driver_id: int,
+                             max_points: int = SAMPLES_PER_LAP, tolerance_scale: float = 1.0) -> pa.Table:
+    """
+    Telemetry table for one driver's laps; failing laps are skipped
+    """
+    lap_columns = []
+    
+    for _, lap in driver_laps.iterlaps():
+        try:
+            telemetry = sample_lap_telemetry(lap, max_points, tolerance_scale)
+            lap_columns.append(lap_telemetry_columns(telemetry, lap['LapNumber'], lap['LapTime'],
+                                                     lap_sector_times(lap)))
+        except Exception as e:
+            logger.warning(f"Error processing lap {lap['LapNumber']} for driver {driver_id}: {str(e)}")
+            continue
+    
+    return build_telemetry_table(lap_columns, session_id, race_id, driver_id)
+
+# Manifest listing a live capture's parts and per-driver high-water marks
+LIVE_MANIFEST_FILE = "manifest.json"
+
+def read_live_manifest(live_dir: str) -> Optional[Dict[str, Any]]:
+    """
+    Manifest of a live capture directory, or None if it has none yet
+    """
+    manifest_file = os.path.join(live_dir, LIVE_MANIFEST_FILE)
+    if not os.path.exists(manifest_file):
+        return None
+    
+    with open(manifest_file) as f:
+        return json.load(f)
+
+def load_live_capture(live_dir: str) -> pa.Table:
+    """
+    All telemetry samples captured so far by a live capture
+    """
+    manifest = read_live_manifest(live_dir)
+    if manifest is None or not manifest['parts']:
+        return SAMPLE_SCHEMA.empty_table()
+    
+    # Part files live in the partitioned dataset next to the live directory
+    root = os.path.dirname(os.path.abspath(live_dir))
+    sample_files = [
+        os.path.join(root, path) for part in manifest['parts'] for path in part['files']
+        if path.startswith('samples')
+    ]
+    dataset = ds.dataset(sample_files, format='parquet', partition_base_dir=os.path.join(root, 'samples'),
+                          partitioning=ds.partitioning(PARTITION_SCHEMA, flavor='hive'))
+    return dataset.to_table()
+
+# Session loaded once per capture worker process
+_worker_session = None
+
+def _init_capture_worker(year: int, event: str, session: str, cache_dir: str):
+    """
+    Load the session in a worker process, from the FastF1 cache the parent filled
+    """
+    global _worker_session
+    
+    logging.basicConfig(level=logging.INFO)
+    fastf1.Cache.enable_cache(cache_dir)
+    _worker_session = fastf1.get_session(year, event, session)
+    _worker_session.load()
+
+def _capture_driver_job(driver: str, fragment_file: str, session_id: str, race_id: int, driver_id: int,
+                        max_points: int = SAMPLES_PER_LAP, tolerance_scale: float = 1.0) -> int:
+    """
+    Extract one driver in a worker and write it as a Parquet fragment
+    """
+    table = extract_driver_telemetry(_worker_session.laps.pick_driver(driver), session_id, race_id, driver_id,
+                                     max_points, tolerance_scale)
+    
+    # Write then rename so an interrupted job never leaves a partial fragment
+    tmp_file = f"{fragment_file}.tmp.{os.getpid()}"
+    pq.write_table(table, tmp_file)
+    os.replace(tmp_file, fragment_file)
+    
+    return table.num_rows
+
 class F1TelemetryCapture:
-    def __init__(self, output_dir="data/live_telemetry_saved"):
+    def __init__(self, output_dir="data/live_telemetry_saved", cache_dir="cache",
+                 max_points=SAMPLES_PER_LAP, tolerance_scale=1.0, data_path="data/"):
         self.output_dir = output_dir
+        self.cache_dir = cache_dir
+        self.ids = load_id_resolver(data_path)
+        
+        # Per-lap downsampling: sample budget and error tolerance multiplier
+        self.max_points = max_points
+        self.tolerance_scale = tolerance_scale
         os.makedirs(output_dir, exist_ok=True)
         
         # Enable FastF1 cache
-        fastf1.Cache.enable_cache('cache')
+        fastf1.Cache.enable_cache(cache_dir)
         
-    def capture_session(self, year: int, event: str, session: str):
+    def capture_session(self, year: int, event: str, session: str, workers: int = 1):
         """
-        Capture telemetry data for a specific session
+        Capture telemetry data for a specific session, extracting drivers
+        across worker processes when workers > 1
         """
         try:
             logger.info(f"Loading session: {year} {event} {session}")
@@ -46,67 +291,26 @@ class F1TelemetryCapture:
             
             logger.info(f"Session loaded: {session_info['total_laps']} laps")
             
-            # Extract telemetry data
-            telemetry_data = []
+            race_id = self._get_race_id(session_obj, year, event)
             
-            for driver in session_obj.drivers:
-                try:
-                    driver_laps = session_obj.laps.pick_driver(driver)
-                    
-                    for lap_idx, lap in driver_laps.iterrows():
-                        # Get telemetry for this lap
-                        try:
-                            lap_telemetry = lap.get_telemetry()
-                            
-                            # Sample telemetry data (reduce size)
-                            if len(lap_telemetry) > 100:
-                                sample_indices = np.linspace(0, len(lap_telemetry)-1, 100, dtype=int)
-                                lap_telemetry = lap_telemetry.iloc[sample_indices]
-                            
-                            # Process telemetry points
-                            for telem_idx, telem_point in lap_telemetry.iterrows():
-                                telemetry_data.append({
-                                    'session_id': session_info['session_id'],
-                                    'timestamp': telem_point['Time'],
-                                    'event_type': 'telemetry',
-                                    'driverId': self._get_driver_id(driver),
-                                    'raceId': self._get_race_id(year, event),
-                                    'lap': lap['LapNumber'],
-                                    'sector': self._get_sector(telem_point.get('Sector', 1)),
-                                    'lap_time_ms': lap['LapTime'].total_seconds() * 1000 if pd.notna(lap['LapTime']) else None,
-                                    'sector_time_ms': None,  # Would need sector timing data
-                                    'speed_kmh': telem_point.get('Speed', 0),
-                                    'track_pos_x': telem_point.get('X', 0),
-                                    'track_pos_y': telem_point.get('Y', 0),
-                                    'additional_json': {
-                                        'throttle': telem_point.get('Throttle', 0),
-                                        'brake': telem_point.get('Brake', 0),
-                                        'gear': telem_point.get('nGear', 0),
-                                        'rpm': telem_point.get('RPM', 0),
-                                        'drs': telem_point.get('DRS', 0)
-                                    }
-                                })
-                                
-                        except Exception as e:
-                            logger.warning(f"Error processing lap {lap['LapNumber']} for driver {driver}: {str(e)}")
-                            continue
-                            
-                except Exception as e:
-                    logger.warning(f"Error processing driver {driver}: {str(e)}")
-                    continue
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(telemetry_data)
+            if workers > 1:
+                table = self._capture_drivers_parallel(session_obj, session_info, race_id, workers)
+            else:
+                table = self._capture_drivers(session_obj, session_info, race_id)
             
-            if len(df) > 0:
-                # Save as parquet
+            if table.num_rows > 0:
+                # Save as partitioned parquet with a separate lap table
+                samples, laps = normalize_telemetry(table, year, session)
+                write_telemetry_dataset(samples, laps, self.output_dir)
+                
                 output_file = os.path.join(
-                    self.output_dir, 
-                    f"{session_info['session_id']}_telemetry.parquet"
+                    self.output_dir, "samples",
+                    f"season={year}", f"raceId={race_id}", f"session={session}"
                 )
-                df.to_parquet(output_file, index=False)
+                session_info['raceId'] = race_id
                 
-                logger.info(f"Saved {len(df)} telemetry points to {output_file}")
+                logger.info(f"Saved {samples.num_rows} telemetry points and {laps.num_rows} laps "
+                            f"to {output_file}")
                 
                 # Save session info
                 info_file = os.path.join(
@@ -114,7 +318,6 @@ class F1TelemetryCapture:
                     f"{session_info['session_id']}_info.json"
                 )
                 
-                import json
                 with open(info_file, 'w') as f:
                     json.dump(session_info, f, indent=2, default=str)
                 
@@ -127,35 +330,209 @@ class F1TelemetryCapture:
             logger.error(f"Error capturing session: {str(e)}")
             raise
     
-    def _get_driver_id(self, driver_code: str) -> int:
+    def _capture_drivers(self, session_obj, session_info: dict, race_id: int) -> pa.Table:
         """
-        Map driver code to driver ID (mock mapping)
+        Extract telemetry one driver at a time as typed column arrays
         """
-        driver_map = {
-            'VER': 1, 'HAM': 2, 'LEC': 3, 'RUS': 4, 'NOR': 5,
-            'PER': 6, 'SAI': 7, 'PIA': 8, 'ALO': 9, 'STR': 10,
-            'TSU': 11, 'GAS': 12, 'OCO': 13, 'HUL': 14, 'MAG': 15,
-            'RIC': 16, 'BOT': 17, 'ZHO': 18, 'ALB': 19, 'SAR': 20
+        tables = []
+        
+        for driver in session_obj.drivers:
+            try:
+                driver_laps = session_obj.laps.pick_driver(driver)
+                tables.append(extract_driver_telemetry(
+                    driver_laps, session_info['session_id'], race_id,
+                    self._get_driver_id(session_obj, session_info['year'], driver),
+                    self.max_points, self.tolerance_scale
+                ))
+                
+            except Exception as e:
+                logger.warning(f"Error processing driver {driver}: {str(e)}")
+                continue
+        
+        return pa.concat_tables(tables) if tables else TELEMETRY_SCHEMA.empty_table()
+    
+    def _capture_drivers_parallel(self, session_obj, session_info: dict, race_id: int, workers: int) -> pa.Table:
+        """
+        Extract drivers in a process pool, one Parquet fragment per driver.
+        
+        Every worker loads the session once from the FastF1 cache. Fragments
+        are written as drivers finish, so a failing or slow driver neither
+        loses nor holds back the others. Fragments left by an earlier failed
+        run are reused, and the fragment directory is removed only once
+        every driver has been merged.
+        """
+        session_id = session_info['session_id']
+        fragment_dir = os.path.join(self.output_dir, f"{session_id}_fragments")
+        os.makedirs(fragment_dir, exist_ok=True)
+        
+        fragments = {
+            driver: os.path.join(fragment_dir, f"driver_{driver}.parquet")
+            for driver in session_obj.drivers
         }
-        return driver_map.get(driver_code, 999)
+        pending = {driver: path for driver, path in fragments.items() if not os.path.exists(path)}
+        if len(pending) < len(fragments):
+            logger.info(f"Reusing {len(fragments) - len(pending)} driver fragments from {fragment_dir}")
+        
+        failed = []
+        if pending:
+            context = multiprocessing.get_context('spawn')
+            initargs = (session_info['year'], session_info['event'], session_info['session_type'], self.cache_dir)
+            
+            with ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=context,
+                                     initializer=_init_capture_worker, initargs=initargs) as executor:
+                futures = {
+                    executor.submit(_capture_driver_job, driver, path, session_id, race_id,
+                                    self._get_driver_id(session_obj, session_info['year'], driver),
+                                    self.max_points, self.tolerance_scale): driver
+                    for driver, path in pending.items()
+                }
+                
+                for future in as_completed(futures):
+                    driver = futures[future]
+                    try:
+                        rows = future.result()
+                        logger.info(f"Driver {driver}: {rows} telemetry points")
+                    except Exception as e:
+                        logger.warning(f"Error processing driver {driver}: {str(e)}")
+                        failed.append(driver)
+        
+        # Merge in the session's driver order
+        tables = [pq.read_table(path) for path in fragments.values() if os.path.exists(path)]
+        
+        if failed:
+            logger.warning(f"Drivers {failed} failed; fragments kept in {fragment_dir} for a rerun")
+        else:
+            shutil.rmtree(fragment_dir, ignore_errors=True)
+        
+        return pa.concat_tables(tables) if tables else TELEMETRY_SCHEMA.empty_table()
+    
+    def _get_driver_id(self, session_obj, year: int, driver: str) -> int:
+        """
+        Dataset driverId of a FastF1 driver (car number), by code then number
+        """
+        try:
+            code = session_obj.get_driver(driver)['Abbreviation']
+        except Exception:
+            code = None
+        
+        driver_id = self.ids.driver_id(year, code, driver)
+        if driver_id is None:
+            driver_id = UNKNOWN_DRIVER_BASE + int(driver)
+            logger.warning(f"Driver {code or driver} not in the dataset for {year}; using driverId {driver_id}")
+        return driver_id
     
-    def _get_race_id(self, year: int, event: str) -> int:
+    def _get_race_id(self, session_obj, year: int, event: str) -> int:
         """
-        Generate race ID from year and event (mock)
+        Dataset raceId of a session's event, by round then by name
         """
-        return hash(f"{year}_{event}") % 10000
+        try:
+            event_info = session_obj.event
+            round_number = int(event_info['RoundNumber'])
+            names = [event, event_info['EventName'], event_info['Location'], event_info['Country']]
+        except Exception:
+            round_number, names = None, [event]
+        
+        race_id = self.ids.race_id(year, *names, round_number=round_number)
+        if race_id is None:
+            if round_number is None:
+                raise ValueError(f"Cannot resolve a raceId for {year} {event}")
+            race_id = year * 100 + round_number
+            logger.warning(f"{year} {event} not in the dataset; using raceId {race_id}")
+        return race_id
     
-    def _get_sector(self, sector_value) -> int:
+    def capture_session_delta(self, year: int, event: str, session: str) -> Optional[str]:
         """
-        Get sector number
+        Capture only the laps completed since the previous update.
+        
+        A per-driver high-water mark is kept in the manifest of
+        {session_id}_live/: the end of the contiguous run of laps captured
+        so far, plus the laps already captured above it. Laps above the
+        mark that are not yet captured are extracted and
+        added as new files in the session's dataset partitions, so an
+        update costs time in proportion to the new laps rather than the
+        whole race. Files are written before the manifest that references
+        them, and their names follow the manifest, so an interrupted update
+        is simply redone.
         """
-        if pd.isna(sector_value):
-            return 1
-        return int(sector_value) if sector_value in [1, 2, 3] else 1
+        session_id = f"{year}_{event}_{session}"
+        live_dir = os.path.join(self.output_dir, f"{session_id}_live")
+        os.makedirs(live_dir, exist_ok=True)
+        
+        session_obj = fastf1.get_session(year, event, session)
+        session_obj.load()
+        
+        manifest = read_live_manifest(live_dir) or {
+            'session_id': session_id,
+            'race_id': self._get_race_id(session_obj, year, event),
+            'high_water': {},
+            'parts': []
+        }
+        high_water = manifest['high_water']
+        captured_above = manifest.setdefault('captured_above', {})
+        
+        tables = []
+        for driver in session_obj.drivers:
+            try:
+                key = str(driver)
+                mark = high_water.get(key, 0)
+                captured = set(captured_above.get(key, []))
+                
+                driver_laps = session_obj.laps.pick_driver(driver)
+                lap_numbers = driver_laps['LapNumber']
+                new_laps = driver_laps[(lap_numbers > mark) & ~lap_numbers.isin(captured)]
+                if len(new_laps) == 0:
+                    continue
+                
+                table = extract_driver_telemetry(new_laps, session_id, manifest['race_id'],
+                                                 self._get_driver_id(session_obj, year, driver),
+                                                 self.max_points, self.tolerance_scale)
+                if table.num_rows == 0:
+                    continue
+                tables.append(table)
+                captured.update(pc.unique(table.column('lap')).to_pylist())
+                
+                # Advance the mark only over a contiguous run of captured laps;
+                # a lap whose telemetry failed stays above it and is retried
+                for lap in sorted(lap_numbers[lap_numbers > mark].dropna()):
+                    if lap not in captured:
+                        break
+                    mark = float(lap)
+                high_water[key] = mark
+                captured_above[key] = sorted(lap for lap in captured if lap > mark)
+                
+            except Exception as e:
+                logger.warning(f"Error processing driver {driver}: {str(e)}")
+                continue
+        
+        if not tables:
+            logger.info("No new laps since the last update")
+            return None
+        
+        samples, laps = normalize_telemetry(pa.concat_tables(tables), year, session)
+        part_name = f"live-{len(manifest['parts']):05d}"
+        
+        # New files join the session's partitions; nothing already written is touched
+        files = write_telemetry_dataset(samples, laps, self.output_dir, basename=part_name, replace=False)
+        
+        manifest['parts'].append({
+            'name': part_name,
+            'files': files,
+            'rows': samples.num_rows,
+            'created': datetime.now().isoformat()
+        })
+        manifest['updated'] = datetime.now().isoformat()
+        
+        tmp_file = os.path.join(live_dir, f"{LIVE_MANIFEST_FILE}.tmp")
+        with open(tmp_file, 'w') as f:
+            json.dump(manifest, f, indent=2, default=str)
+        os.replace(tmp_file, os.path.join(live_dir, LIVE_MANIFEST_FILE))
+        
+        logger.info(f"Appended {samples.num_rows} telemetry points as {part_name}")
+        return part_name
     
     def capture_live_session(self, year: int, event: str, session: str, interval: int = 30):
         """
-        Capture live session data with periodic updates
+        Capture live session data with periodic delta updates
         """
         logger.info(f"Starting live capture for {year} {event} {session}")
         
@@ -163,8 +540,8 @@ class F1TelemetryCapture:
         
         while True:
             try:
-                # Capture current session state
-                output_file = self.capture_session(year, event, session)
+                # Capture laps completed since the last update
+                output_file = self.capture_session_delta(year, event, session)
                 
                 if output_file:
                     logger.info(f"Live capture update saved: {output_file}")
@@ -187,11 +564,17 @@ def main():
     parser.add_argument('--live', action='store_true', help='Enable live capture mode')
     parser.add_argument('--interval', type=int, default=30, help='Live capture interval (seconds)')
     parser.add_argument('--output', type=str, default='data/live_telemetry_saved', help='Output directory')
+    parser.add_argument('--data-path', type=str, default='data/', help='Directory with races, drivers and results CSVs')
+    parser.add_argument('--workers', type=int, default=1, help='Processes extracting drivers in parallel')
+    parser.add_argument('--max-points', type=int, default=SAMPLES_PER_LAP, help='Most telemetry samples kept per lap')
+    parser.add_argument('--tolerance', type=float, default=1.0,
+                        help='Downsampling error tolerance multiplier (lower keeps more detail)')
     
     args = parser.parse_args()
     
     # Create capture instance
-    capture = F1TelemetryCapture(args.output)
+    capture = F1TelemetryCapture(args.output, max_points=args.max_points, tolerance_scale=args.tolerance,
+                                 data_path=args.data_path)
     
     try:
         if args.live:
@@ -199,7 +582,7 @@ def main():
             capture.capture_live_session(args.year, args.event, args.session, args.interval)
         else:
             # Single capture
-            output_file = capture.capture_session(args.year, args.event, args.session)
+            output_file = capture.capture_session(args.year, args.event, args.session, args.workers)
             if output_file:
                 logger.info(f"Telemetry data saved to: {output_file}")
             else:
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Convert legacy pickled models to artifact bundles and benchmark cold loads
+"""
+
+import os
+import sys
+import json
+import glob
+import logging
+import argparse
+import subprocess
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.artifacts import save_bundle, is_bundle, bundle_files
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in a fresh interpreter so library imports count towards the load time
+PICKLE_LOAD = """
+import sys, time
+start = time.perf_counter()
+import joblib
+model = joblib.load(sys.argv[1])
+for path in sys.argv[2:]:
+    joblib.load(path)
+print((time.perf_counter() - start) * 1000)
+"""
+
+BUNDLE_LOAD = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[2])
+from models.artifacts import load_bundle
+bundle = load_bundle(sys.argv[1])
+print((time.perf_counter() - start) * 1000)
+"""
+
+def legacy_files(models_dir: str, model_name: str) -> list:
+    """
+    Existing pickle files of one model, model file first
+    """
+    files = [os.path.join(models_dir, f"{model_name}{suffix}.pkl") for suffix in ('', '_scaler', '_features')]
+    return [f for f in files if os.path.exists(f)]
+
+def convert_model(models_dir: str, model_name: str) -> str:
+    """
+    Write a bundle next to a model's legacy pickles
+    """
+    import joblib
+
+    model = joblib.load(os.path.join(models_dir, f"{model_name}.pkl"))
+
+    scaler_file = os.path.join(models_dir, f"{model_name}_scaler.pkl")
+    scaler = joblib.load(scaler_file) if os.path.exists(scaler_file) else None
+
+    features_file = os.path.join(models_dir, f"{model_name}_features.pkl")
+    feature_names = joblib.load(features_file) if os.path.exists(features_file) else []
+
+    metrics = {}
+    metrics_file = os.path.join(models_dir, f"{model_name}_metrics.json")
+    if os.path.exists(metrics_file):
+        with open(metrics_file) as f:
+            metrics = json.load(f)
+
+    return save_bundle(os.path.join(models_dir, model_name), model, scaler=scaler,
+                       feature_names=list(feature_names), metrics=metrics)
+
+def cold_load_ms(script: str, args: list, repeats: int) -> float:
+    """
+    Median wall time of loading in a fresh interpreter
+    """
+    times = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', script, *args],
+                                capture_output=True, text=True, check=True).stdout
+        times.append(float(output.strip().splitlines()[-1]))
+    return float(np.median(times))
+
+def benchmark_cold_load(models_dir: str, model_name: str, repeats: int) -> dict:
+    """
+    Compare cold-load time and size of a model's pickles and its bundle
+    """
+    pickles = legacy_files(models_dir, model_name)
+    bundle_dir = os.path.join(models_dir, model_name)
+
+    return {
+        'pickle_load_ms': cold_load_ms(PICKLE_LOAD, pickles, repeats),
+        'bundle_load_ms': cold_load_ms(BUNDLE_LOAD, [bundle_dir, SERVER_DIR], repeats),
+        'pickle_bytes': int(sum(os.path.getsize(f) for f in pickles)),
+        'bundle_bytes': int(sum(os.path.getsize(f) for f in bundle_files(bundle_dir)))
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert pickled models to artifact bundles')
+    parser.add_argument('--models-dir', type=str, default='models/saved', help='Saved models directory')
+    parser.add_argument('--benchmark', action='store_true', help='Compare cold-load time against the pickles')
+    parser.add_argument('--repeats', type=int, default=5, help='Fresh-process loads per benchmark')
+    parser.add_argument('--remove-pickles', action='store_true', help='Delete pickles once converted')
+
+    args = parser.parse_args()
+
+    model_names = sorted(
+        os.path.basename(path)[:-len('.pkl')]
+        for path in glob.glob(os.path.join(args.models_dir, '*.pkl'))
+        if not path.endswith(('_scaler.pkl', '_features.pkl'))
+    )
+
+    if not model_names:
+        logger.warning(f"No pickled models in {args.models_dir}")
+        return 0
+
+    for model_name in model_names:
+        try:
+            if not is_bundle(os.path.join(args.models_dir, model_name)):
+                convert_model(args.models_dir, model_name)
+                logger.info(f"Converted {model_name}")
+
+            if args.benchmark:
+                report = benchmark_cold_load(args.models_dir, model_name, args.repeats)
+                logger.info(f"{model_name} - cold load: pickle {report['pickle_load_ms']:.0f}ms, "
+                            f"bundle {report['bundle_load_ms']:.0f}ms; size: "
+                            f"pickle {report['pickle_bytes'] / 1e6:.1f}MB, bundle {report['bundle_bytes'] / 1e6:.1f}MB")
+
+            if args.remove_pickles:
+                for path in legacy_files(args.models_dir, model_name):
+                    os.remove(path)
+
+        except Exception as e:
+            logger.error(f"Could not convert {model_name}: {str(e)}")
+            return 1
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
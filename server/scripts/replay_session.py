@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Replay a captured session through the live feed and measure throughput and latency
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.live_feed import LiveFeed
+from api.live_pipeline import LivePredictor
+from api.prediction_service import PredictionService
+from api.broadcast_hub import BroadcastHub
+from api.replay_service import ReplayService
+from api.telemetry_service import TelemetryService
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def load_reference(data_path: str) -> tuple:
+    """
+    Pit stop history and driver codes used to label the replay, and the
+    results giving each driver's constructor and grid slot
+    """
+    pit_file = os.path.join(data_path, "pit_stops.csv")
+    drivers_file = os.path.join(data_path, "drivers.csv")
+    results_file = os.path.join(data_path, "results.csv")
+
+    pit_stops = pd.read_csv(pit_file, usecols=['raceId', 'driverId', 'stop', 'lap', 'milliseconds']) \
+        if os.path.exists(pit_file) else pd.DataFrame()
+    drivers = pd.read_csv(drivers_file, usecols=['driverId', 'code']) if os.path.exists(drivers_file) else pd.DataFrame()
+    results = pd.read_csv(results_file, usecols=['raceId', 'driverId', 'constructorId', 'grid']) \
+        if os.path.exists(results_file) else pd.DataFrame()
+    return pit_stops, drivers, results
+
+async def poll_feed(live_feed: LiveFeed, race_id: int, interval: float, done: asyncio.Event) -> list:
+    """
+    Read and encode the three LiveMode payloads like a polling dashboard,
+    returning the time each poll took
+    """
+    timings = []
+    while not done.is_set():
+        state = live_feed.get(race_id)
+        if state is not None:
+            start = time.perf_counter()
+            json.dumps({
+                'lap_data': state.lap_data(),
+                'pit_data': state.pit_data(),
+                'confidence_data': state.confidence_data()
+            })
+            timings.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return timings
+
+async def subscribe(hub: BroadcastHub, race_id: int, delay: float, received: list):
+    """
+    Consume a race's event stream like a dashboard, taking delay seconds per
+    message; appends the sequence of every event received
+    """
+    async def connected():
+        return False
+
+    async for chunk in hub.stream(race_id, None, connected):
+        for line in chunk.split('\n'):
+            if line.startswith('id: '):
+                sequence = int(line.rsplit('-', 1)[1])
+                if sequence > 0:
+                    received.append(sequence)
+        if delay:
+            await asyncio.sleep(delay)
+
+async def replay(args) -> dict:
+    pit_stops, drivers, results = load_reference(args.data_path)
+    live_feed = LiveFeed()
+    hub = BroadcastHub(live_feed, args.queue_size)
+    telemetry_service = TelemetryService(args.telemetry_dir)
+    predictor = LivePredictor(PredictionService(), results) if not args.no_predictions else None
+    service = ReplayService(telemetry_service, live_feed, pit_stops, drivers, predictor)
+
+    # Subscribers join before the replay starts, a slow share of them lagging on every message
+    race_id = telemetry_service.session_keys(args.session_id)['raceId']
+    received = [[] for _ in range(args.subscribers)]
+    subscribers = [
+        asyncio.create_task(subscribe(hub, race_id, args.slow_delay if i < args.slow_subscribers else 0, received[i]))
+        for i in range(args.subscribers)
+    ]
+    await asyncio.sleep(0)
+
+    status = await service.start(args.session_id, args.speed)
+    done = asyncio.Event()
+    poller = asyncio.create_task(poll_feed(live_feed, status['raceId'], args.poll_interval, done))
+
+    await service.runs[args.session_id].task
+    done.set()
+    poll_timings = await poller
+
+    # Let every subscriber drain, then check none lost or repeated an event
+    total = live_feed.get(race_id).sequence
+    deadline = time.perf_counter() + 30
+    while any(not r or r[-1] < total for r in received) and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+    for task in subscribers:
+        task.cancel()
+    await asyncio.gather(*subscribers, return_exceptions=True)
+
+    status = service.status(args.session_id)
+    state = live_feed.get(status['raceId'])
+    status['laps_in_feed'] = len(state.lap_data())
+    status['pit_stops_in_feed'] = len(state.pit_data())
+    status['polls'] = len(poll_timings)
+    if predictor is not None:
+        status['predictions'] = predictor.metrics()
+        status['predicted_laps'] = state.prediction_data()['lap']
+    if args.subscribers:
+        status['subscribers_complete'] = sum(sorted(set(r)) == list(range(1, total + 1)) for r in received)
+        status['hub'] = hub.metrics()
+    if poll_timings:
+        status['poll_p50_ms'] = round(float(np.percentile(poll_timings, 50)) * 1000, 3)
+        status['poll_p99_ms'] = round(float(np.percentile(poll_timings, 99)) * 1000, 3)
+    return status
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a captured session into the live feed')
+    parser.add_argument('--session-id', type=str, required=True, help='Captured session, e.g. 2024_Monaco_R')
+    parser.add_argument('--speed', type=float, default=10.0, help='Replay speed (1, 10, ...; 0 = as fast as possible)')
+    parser.add_argument('--telemetry-dir', type=str, default='data/live_telemetry_saved', help='Capture output directory')
+    parser.add_argument('--data-path', type=str, default='data/', help='Directory with pit_stops and drivers CSVs')
+    parser.add_argument('--poll-interval', type=float, default=0.05, help='Seconds between simulated dashboard polls')
+    parser.add_argument('--subscribers', type=int, default=0, help='Simulated live stream subscribers')
+    parser.add_argument('--slow-subscribers', type=int, default=0, help='How many of them are slow consumers')
+    parser.add_argument('--slow-delay', type=float, default=0.05, help='Seconds a slow subscriber takes per message')
+    parser.add_argument('--no-predictions', action='store_true', help='Do not score live predictions per lap')
+    parser.add_argument('--queue-size', type=int, default=32, help='Messages buffered per subscriber')
+
+    args = parser.parse_args()
+
+    try:
+        status = asyncio.run(replay(args))
+    except Exception as e:
+        logger.error(f"Replay failed: {str(e)}")
+        return 1
+
+    logger.info(json.dumps(status, indent=2))
+    return 0 if status['state'] == 'finished' else 1
+
+if __name__ == "__main__":
+    exit(main())
@@ -5,27 +5,143 @@ Training script for F1 prediction models
 
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, GroupKFold
+from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, r2_score
 import lightgbm as lgb
 import xgboost as xgb
-import joblib
 import logging
 import os
+import json
+import hashlib
+import argparse
+import sys
+import tempfile
+import tracemalloc
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.streaming_aggregation import find_input, aggregate_lap_times, aggregate_pit_stops
+from models.tuning import SuccessiveHalvingSearch
+from models.benchmark import benchmark_model, select_model
+from models.compaction import per_tree_predictions, select_tree_subset, subset_forest, distill_forest
+from models.artifacts import (FlatForest, XGBoostPredictor, save_bundle, load_bundle, read_manifest,
+                              bundle_files, is_bundle)
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bump whenever engineer_features changes the frame it produces so that
+# cached feature frames from older pipeline versions are not reused
+FEATURE_PIPELINE_VERSION = 5
+
+# Candidate models trained by default
+MODEL_NAMES = ['lightgbm', 'xgboost', 'random_forest']
+
+# Default hyperparameters per model; tuned parameters override these
+DEFAULT_PARAMS = {
+    'lightgbm': {
+        'num_leaves': 31,
+        'learning_rate': 0.05,
+        'feature_fraction': 0.9,
+        'bagging_fraction': 0.8,
+        'bagging_freq': 5,
+        'num_boost_round': 1000
+    },
+    'xgboost': {
+        'max_depth': 6,
+        'learning_rate': 0.05,
+        'subsample': 0.8,
+        'colsample_bytree': 0.8,
+        'num_boost_round': 1000
+    },
+    'random_forest': {
+        'n_estimators': 200,
+        'max_depth': 10,
+        'min_samples_split': 5,
+        'min_samples_leaf': 2
+    }
+}
+
+# Search spaces for the tune command: ('int'|'float', low, high, log) or ('choice', options)
+SEARCH_SPACES = {
+    'lightgbm': {
+        'num_leaves': ('int', 15, 255, True),
+        'learning_rate': ('float', 0.01, 0.2, True),
+        'feature_fraction': ('float', 0.5, 1.0, False),
+        'bagging_fraction': ('float', 0.5, 1.0, False),
+        'min_data_in_leaf': ('int', 5, 200, True),
+        'lambda_l2': ('float', 0.001, 10.0, True)
+    },
+    'xgboost': {
+        'max_depth': ('int', 3, 10, False),
+        'learning_rate': ('float', 0.01, 0.2, True),
+        'subsample': ('float', 0.5, 1.0, False),
+        'colsample_bytree': ('float', 0.5, 1.0, False),
+        'min_child_weight': ('float', 0.5, 20.0, True),
+        'reg_lambda': ('float', 0.001, 10.0, True)
+    },
+    'random_forest': {
+        'max_depth': ('int', 4, 20, False),
+        'min_samples_split': ('int', 2, 20, False),
+        'min_samples_leaf': ('int', 1, 10, False),
+        'max_features': ('choice', [1.0, 0.7, 0.5, 'sqrt'])
+    }
+}
+
+# Parameter successive halving spends as its resource
+RESOURCE_PARAMS = {
+    'lightgbm': 'num_boost_round',
+    'xgboost': 'num_boost_round',
+    'random_forest': 'n_estimators'
+}
+
+# Columns the trainer reads from each input file, with compact dtypes.
+# Nothing else in the CSVs (names, URLs, dates) is loaded or joined.
+TRAINING_COLUMNS = {
+    "results.csv": {'raceId': 'int32', 'driverId': 'int32', 'constructorId': 'int32',
+                    'grid': 'int32', 'positionOrder': 'int32'},
+    "races.csv": {'raceId': 'int32', 'year': 'int32', 'round': 'int32', 'circuitId': 'int32'},
+    "qualifying.csv": {'raceId': 'int32', 'driverId': 'int32', 'position': 'float32'}
+}
+
+# Quantiles of the finishing position bundled with position_predictor;
+# the interval between them gives each prediction's uncertainty
+QUANTILE_ALPHAS = (0.1, 0.9)
+
+# Lap times and pit stops are streamed through per-driver aggregates
+# (utils/streaming_aggregation.py), as Parquet if present or else CSV
+STREAMED_INPUTS = ["lap_times", "pit_stops"]
+
+# Files whose contents determine the engineered feature frame
+FEATURE_INPUT_FILES = list(TRAINING_COLUMNS) + [
+    f"{stem}{extension}" for stem in STREAMED_INPUTS for extension in ('.parquet', '.csv')
+]
+
 class F1ModelTrainer:
-    def __init__(self, data_path="data/"):
+    def __init__(self, data_path="data/", params: Optional[Dict[str, Dict[str, Any]]] = None):
         self.data_path = data_path
+        self.params = {
+            name: {**defaults, **(params or {}).get(name, {})}
+            for name, defaults in DEFAULT_PARAMS.items()
+        }
+        self.cache_path = os.path.join(data_path, "cache", "features")
         self.models = {}
         self.scalers = {}
         self.feature_names = {}
+        self.metrics = {}
+        self.test_predictions = {}
+        self.quantile_heads = {}
+        self.quantile_metrics = {}
+        self.data_loaded = False
+        self.build_stats = {}
         
     def load_data(self):
         """
@@ -35,70 +151,196 @@ class F1ModelTrainer:
         
         try:
             # Load core datasets
-            self.results = pd.read_csv(os.path.join(self.data_path, "results.csv"))
-            self.races = pd.read_csv(os.path.join(self.data_path, "races.csv"))
-            self.drivers = pd.read_csv(os.path.join(self.data_path, "drivers.csv"))
-            self.constructors = pd.read_csv(os.path.join(self.data_path, "constructors.csv"))
-            self.circuits = pd.read_csv(os.path.join(self.data_path, "circuits.csv"))
-            self.qualifying = pd.read_csv(os.path.join(self.data_path, "qualifying.csv"))
-            
-            # Optional datasets
-            try:
-                self.lap_times = pd.read_csv(os.path.join(self.data_path, "lap_times.csv"))
-                self.pit_stops = pd.read_csv(os.path.join(self.data_path, "pit_stops.csv"))
-            except FileNotFoundError:
+            self.results = self._read_training_columns("results.csv")
+            self.races = self._read_training_columns("races.csv")
+            self.qualifying = self._read_training_columns("qualifying.csv")
+            
+            # Optional datasets, aggregated in chunks rather than loaded whole
+            lap_times_file = find_input(self.data_path, "lap_times")
+            pit_stops_file = find_input(self.data_path, "pit_stops")
+            
+            # Both are needed; pit stop features are only used alongside lap times
+            if lap_times_file is None or pit_stops_file is None:
                 logger.warning("Lap times or pit stops data not found")
-                self.lap_times = pd.DataFrame()
-                self.pit_stops = pd.DataFrame()
+                self.lap_features = None
+                self.pit_features = None
+            else:
+                self.lap_features = aggregate_lap_times(lap_times_file)
+                self.pit_features = aggregate_pit_stops(pit_stops_file)
             
+            self.data_loaded = True
             logger.info("Data loaded successfully")
             
         except Exception as e:
             logger.error(f"Error loading data: {str(e)}")
             raise
     
-    def engineer_features(self):
+    def _read_training_columns(self, filename: str) -> pd.DataFrame:
         """
-        Engineer features for model training
+        Read only the columns the trainer uses from one input file, downcast
+        """
+        dtypes = TRAINING_COLUMNS[filename]
+        return pd.read_csv(os.path.join(self.data_path, filename), usecols=list(dtypes),
+                           dtype=dtypes, na_values=['\\N'])
+    
+    def engineer_features(self, rebuild: bool = False):
+        """
+        Engineer features for model training, reusing the cached frame
+        when the input files and pipeline version are unchanged
+        """
+        cache_key = self._feature_cache_key()
+        
+        if not rebuild and self._load_cached_features(cache_key):
+            return
+        
+        tracing = not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        start = time.perf_counter()
+        
+        if not self.data_loaded:
+            self.load_data()
+        
+        self._build_features()
+        
+        self.build_stats['build_seconds'] = time.perf_counter() - start
+        self.build_stats['peak_memory_mb'] = tracemalloc.get_traced_memory()[1] / 1e6
+        if tracing:
+            tracemalloc.stop()
+        
+        logger.info(f"Feature build took {self.build_stats['build_seconds']:.2f}s "
+                    f"(joins {self.build_stats['join_seconds']:.2f}s), "
+                    f"peak traced memory {self.build_stats['peak_memory_mb']:.0f}MB")
+        
+        # Only the columns used downstream are kept, cached or not
+        self.feature_data = self.feature_data[self._frame_columns()]
+        self._save_cached_features(cache_key)
+    
+    def _input_checksums(self) -> dict:
+        """
+        SHA-256 checksums of the feature pipeline input files
+        """
+        checksums = {}
+        
+        for filename in FEATURE_INPUT_FILES:
+            filepath = os.path.join(self.data_path, filename)
+            if not os.path.exists(filepath):
+                checksums[filename] = None
+                continue
+            
+            digest = hashlib.sha256()
+            with open(filepath, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+            checksums[filename] = digest.hexdigest()
+        
+        return checksums
+    
+    def _feature_cache_key(self) -> str:
+        """
+        Cache key derived from input checksums and pipeline version
+        """
+        key_source = json.dumps({
+            'pipeline_version': FEATURE_PIPELINE_VERSION,
+            'inputs': self._input_checksums()
+        }, sort_keys=True)
+        
+        return hashlib.sha256(key_source.encode()).hexdigest()[:16]
+    
+    def _frame_columns(self) -> list:
+        """
+        Columns of the engineered frame used by training
+        """
+        return list(dict.fromkeys(
+            self.feature_columns + ['raceId', 'year', 'target_position']
+        ))
+    
+    def _load_cached_features(self, cache_key: str) -> bool:
+        """
+        Load the engineered frame from the Parquet cache if present
+        """
+        frame_file = os.path.join(self.cache_path, f"features_{cache_key}.parquet")
+        meta_file = os.path.join(self.cache_path, f"features_{cache_key}.json")
+        
+        if not (os.path.exists(frame_file) and os.path.exists(meta_file)):
+            return False
+        
+        try:
+            with open(meta_file) as f:
+                metadata = json.load(f)
+            
+            self.feature_data = pd.read_parquet(frame_file)
+            self.feature_columns = metadata['feature_columns']
+            
+            logger.info(f"Loaded cached features {cache_key} ({len(self.feature_data)} rows)")
+            return True
+            
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable feature cache {cache_key}: {str(e)}")
+            return False
+    
+    def _save_cached_features(self, cache_key: str):
+        """
+        Write the engineered frame to the Parquet cache atomically
+        """
+        try:
+            os.makedirs(self.cache_path, exist_ok=True)
+            
+            frame_file = os.path.join(self.cache_path, f"features_{cache_key}.parquet")
+            meta_file = os.path.join(self.cache_path, f"features_{cache_key}.json")
+            
+            self.feature_data.to_parquet(f"{frame_file}.tmp", index=False)
+            os.replace(f"{frame_file}.tmp", frame_file)
+            
+            metadata = {
+                'cache_key': cache_key,
+                'pipeline_version': FEATURE_PIPELINE_VERSION,
+                'inputs': self._input_checksums(),
+                'feature_columns': self.feature_columns,
+                'rows': len(self.feature_data),
+                'build_stats': self.build_stats,
+                'created': datetime.now().isoformat()
+            }
+            with open(f"{meta_file}.tmp", 'w') as f:
+                json.dump(metadata, f, indent=2)
+            os.replace(f"{meta_file}.tmp", meta_file)
+            
+            logger.info(f"Cached engineered features as {cache_key}")
+            
+        except Exception as e:
+            logger.warning(f"Could not cache engineered features: {str(e)}")
+    
+    def _build_features(self):
+        """
+        Build the engineered feature frame from the loaded datasets
         """
         logger.info("Engineering features...")
         
-        # Join main datasets
+        join_start = time.perf_counter()
+        
+        # Join main datasets; only the projected columns are carried along.
+        # Driver, constructor and circuit attributes are not features, so
+        # their tables are not joined at all.
         df = self.results.merge(self.races, on='raceId', how='left')
-        df = df.merge(self.drivers, on='driverId', how='left')
-        df = df.merge(self.constructors, on='constructorId', how='left')
-        df = df.merge(self.circuits, on='circuitId', how='left')
         
         # Add qualifying data
-        qualifying_features = self.qualifying.groupby(['raceId', 'driverId']).agg({
-            'position': 'first',
-            'q1': lambda x: pd.to_numeric(x.replace('\\N', np.nan), errors='coerce').first(),
-            'q2': lambda x: pd.to_numeric(x.replace('\\N', np.nan), errors='coerce').first(),
-            'q3': lambda x: pd.to_numeric(x.replace('\\N', np.nan), errors='coerce').first()
-        }).reset_index()
-        
-        qualifying_features.columns = ['raceId', 'driverId', 'qualifying_position', 'q1_time', 'q2_time', 'q3_time']
+        qualifying_features = (self.qualifying.drop_duplicates(['raceId', 'driverId'])
+                               .rename(columns={'position': 'qualifying_position'}))
+        
         df = df.merge(qualifying_features, on=['raceId', 'driverId'], how='left')
         
         # Add lap time features if available
-        if not self.lap_times.empty:
-            lap_features = self.lap_times.groupby(['raceId', 'driverId']).agg({
-                'milliseconds': ['mean', 'std', 'min', 'count']
-            }).reset_index()
-            lap_features.columns = ['raceId', 'driverId', 'avg_lap_time', 'lap_time_std', 'fastest_lap', 'lap_count']
-            df = df.merge(lap_features, on=['raceId', 'driverId'], how='left')
+        if self.lap_features is not None:
+            df = df.merge(self.lap_features, on=['raceId', 'driverId'], how='left')
         
         # Add pit stop features if available
-        if not self.pit_stops.empty:
-            pit_features = self.pit_stops.groupby(['raceId', 'driverId']).agg({
-                'stop': 'count',
-                'milliseconds': 'sum'
-            }).reset_index()
-            pit_features.columns = ['raceId', 'driverId', 'pit_count', 'total_pit_time']
-            df = df.merge(pit_features, on=['raceId', 'driverId'], how='left')
+        if self.pit_features is not None:
+            df = df.merge(self.pit_features, on=['raceId', 'driverId'], how='left')
+        
+        self.build_stats = {'join_seconds': time.perf_counter() - join_start, 'joined_rows': len(df)}
         
         # Create target variable (finishing position)
-        df['target_position'] = pd.to_numeric(df['positionOrder'], errors='coerce')
+        df['target_position'] = pd.to_numeric(df['positionOrder'], errors='coerce').astype('float32')
         
         # Filter valid positions
         df = df[df['target_position'].notna()]
@@ -111,17 +353,17 @@ class F1ModelTrainer:
         ]
         
         # Add lap time features if available
-        if not self.lap_times.empty:
+        if self.lap_features is not None:
             feature_columns.extend(['avg_lap_time', 'lap_time_std', 'fastest_lap', 'lap_count'])
         
         # Add pit features if available
-        if not self.pit_stops.empty:
+        if self.pit_features is not None:
             feature_columns.extend(['pit_count', 'total_pit_time'])
         
         # Fill missing values
         for col in feature_columns:
             if col in df.columns:
-                if df[col].dtype in ['float64', 'int64']:
+                if pd.api.types.is_numeric_dtype(df[col]):
                     df[col] = df[col].fillna(df[col].median())
                 else:
                     df[col] = df[col].fillna(0)
@@ -158,26 +400,47 @@ class F1ModelTrainer:
         train_years = df['year'].unique()
         split_year = np.percentile(train_years, 80)  # 80% for training
         
-        train_mask = df['year'] <= split_year
+        train_mask = (df['year'] <= split_year).values
+        
+        # Hold out the last training season for early stopping
+        valid_year = df.loc[train_mask, 'year'].max()
+        valid_mask = (df['year'] == valid_year).values
+        fit_mask = train_mask & ~valid_mask
         
         X = df[self.feature_columns].values
         y = df['target_position'].values
         race_groups = df['raceId'].values
         
-        X_train = X[train_mask]
-        X_test = X[~train_mask]
-        y_train = y[train_mask]
-        y_test = y[~train_mask]
-        
-        self.X_train = X_train
-        self.X_test = X_test
-        self.y_train = y_train
-        self.y_test = y_test
+        self.X_train = X[fit_mask]
+        self.X_valid = X[valid_mask]
+        self.X_test = X[~train_mask]
+        self.y_train = y[fit_mask]
+        self.y_valid = y[valid_mask]
+        self.y_test = y[~train_mask]
         self.race_groups = race_groups
         
-        logger.info(f"Training data: {X_train.shape}, Test data: {X_test.shape}")
+        # Full arrays for season-grouped cross-validation
+        self.X = X
+        self.y = y
+        self.row_keys = df[['raceId', 'driverId', 'year']].reset_index(drop=True)
+        
+        logger.info(f"Training data: {self.X_train.shape}, Validation season {valid_year}: "
+                    f"{self.X_valid.shape}, Test data: {self.X_test.shape}")
+        
+    def training_data(self) -> Dict[str, np.ndarray]:
+        """
+        Arrays a worker process needs to train and evaluate a model
+        """
+        return {
+            'X_train': self.X_train,
+            'X_valid': self.X_valid,
+            'X_test': self.X_test,
+            'y_train': self.y_train,
+            'y_valid': self.y_valid,
+            'y_test': self.y_test
+        }
         
-    def train_lightgbm(self):
+    def train_lightgbm(self, n_threads: int = -1):
         """
         Train LightGBM model
         """
@@ -185,39 +448,44 @@ class F1ModelTrainer:
         
         # Create datasets
         train_data = lgb.Dataset(self.X_train, label=self.y_train)
+        valid_data = lgb.Dataset(self.X_valid, label=self.y_valid, reference=train_data)
         
         # Parameters
         params = {
             'objective': 'regression',
             'metric': 'mae',
             'boosting_type': 'gbdt',
-            'num_leaves': 31,
-            'learning_rate': 0.05,
-            'feature_fraction': 0.9,
-            'bagging_fraction': 0.8,
-            'bagging_freq': 5,
+            **self.params['lightgbm'],
+            'num_threads': max(n_threads, 0),
             'verbose': -1
         }
+        num_boost_round = params.pop('num_boost_round')
         
         # Train model
         model = lgb.train(
             params,
             train_data,
-            num_boost_round=1000,
-            valid_sets=[train_data],
-            callbacks=[lgb.early_stopping(100), lgb.log_evaluation(0)]
+            num_boost_round=num_boost_round,
+            valid_sets=[valid_data],
+            valid_names=['valid'],
+            callbacks=[lgb.early_stopping(100, verbose=False), lgb.log_evaluation(0)]
         )
         
         # Evaluate
-        y_pred = model.predict(self.X_test)
+        y_pred = model.predict(self.X_test, num_iteration=model.best_iteration)
         mae = mean_absolute_error(self.y_test, y_pred)
         r2 = r2_score(self.y_test, y_pred)
         
-        logger.info(f"LightGBM - MAE: {mae:.3f}, R2: {r2:.3f}")
+        logger.info(f"LightGBM - MAE: {mae:.3f}, R2: {r2:.3f}, best iteration: {model.best_iteration}")
         
         self.models['lightgbm'] = model
+        self.test_predictions['lightgbm'] = y_pred
+        self.metrics['lightgbm'] = {
+            'mae': mae, 'r2': r2, 'n_threads': n_threads,
+            'best_iteration': model.best_iteration
+        }
         
-    def train_xgboost(self):
+    def train_xgboost(self, n_threads: int = -1):
         """
         Train XGBoost model
         """
@@ -227,37 +495,47 @@ class F1ModelTrainer:
         params = {
             'objective': 'reg:squarederror',
             'eval_metric': 'mae',
-            'max_depth': 6,
-            'learning_rate': 0.05,
-            'subsample': 0.8,
-            'colsample_bytree': 0.8,
+            **self.params['xgboost'],
+            'nthread': n_threads,
             'random_state': 42
         }
+        num_boost_round = params.pop('num_boost_round')
         
         # Create DMatrix
-        dtrain = xgb.DMatrix(self.X_train, label=self.y_train)
-        dtest = xgb.DMatrix(self.X_test, label=self.y_test)
+        dtrain = xgb.DMatrix(self.X_train, label=self.y_train, nthread=n_threads)
+        dvalid = xgb.DMatrix(self.X_valid, label=self.y_valid, nthread=n_threads)
+        dtest = xgb.DMatrix(self.X_test, label=self.y_test, nthread=n_threads)
         
         # Train model
         model = xgb.train(
             params,
             dtrain,
-            num_boost_round=1000,
-            evals=[(dtrain, 'train')],
+            num_boost_round=num_boost_round,
+            evals=[(dvalid, 'valid')],
             early_stopping_rounds=100,
             verbose_eval=False
         )
         
+        # Keep only the trees up to the best iteration so every consumer
+        # of the saved booster predicts with the early-stopped model
+        best_iteration = model.best_iteration
+        model = model[:best_iteration + 1]
+        
         # Evaluate
         y_pred = model.predict(dtest)
         mae = mean_absolute_error(self.y_test, y_pred)
         r2 = r2_score(self.y_test, y_pred)
         
-        logger.info(f"XGBoost - MAE: {mae:.3f}, R2: {r2:.3f}")
+        logger.info(f"XGBoost - MAE: {mae:.3f}, R2: {r2:.3f}, best iteration: {best_iteration}")
         
         self.models['xgboost'] = model
+        self.test_predictions['xgboost'] = y_pred
+        self.metrics['xgboost'] = {
+            'mae': mae, 'r2': r2, 'n_threads': n_threads,
+            'best_iteration': best_iteration
+        }
         
-    def train_random_forest(self):
+    def train_random_forest(self, n_threads: int = -1):
         """
         Train Random Forest model
         """
@@ -270,12 +548,9 @@ class F1ModelTrainer:
         
         # Train model
         model = RandomForestRegressor(
-            n_estimators=200,
-            max_depth=10,
-            min_samples_split=5,
-            min_samples_leaf=2,
+            **self.params['random_forest'],
             random_state=42,
-            n_jobs=-1
+            n_jobs=n_threads
         )
         
         model.fit(X_train_scaled, self.y_train)
@@ -289,65 +564,868 @@ class F1ModelTrainer:
         
         self.models['random_forest'] = model
         self.scalers['random_forest'] = scaler
+        self.test_predictions['random_forest'] = y_pred
+        self.metrics['random_forest'] = {'mae': mae, 'r2': r2, 'n_threads': n_threads}
+        
+    def train_quantile_heads(self, n_threads: int = -1):
+        """
+        Train LightGBM quantile models of the finishing position, one per
+        QUANTILE_ALPHAS entry, on unscaled features.
+        
+        They are bundled with position_predictor whichever model serves
+        the point prediction, so every served prediction gets its own
+        uncertainty from the interval between them.
+        """
+        logger.info("Training quantile heads...")
+        
+        train_data = lgb.Dataset(self.X_train, label=self.y_train)
+        valid_data = lgb.Dataset(self.X_valid, label=self.y_valid, reference=train_data)
+        
+        base_params = dict(self.params['lightgbm'])
+        num_boost_round = base_params.pop('num_boost_round')
+        
+        heads = {}
+        for alpha in QUANTILE_ALPHAS:
+            params = {
+                'objective': 'quantile',
+                'alpha': alpha,
+                'metric': 'quantile',
+                'boosting_type': 'gbdt',
+                **base_params,
+                'num_threads': max(n_threads, 0),
+                'verbose': -1
+            }
+            heads[alpha] = lgb.train(
+                params,
+                train_data,
+                num_boost_round=num_boost_round,
+                valid_sets=[valid_data],
+                valid_names=['valid'],
+                callbacks=[lgb.early_stopping(100, verbose=False), lgb.log_evaluation(0)]
+            )
         
-    def save_models(self):
+        # How often the test finishing position falls inside the interval
+        low = heads[min(heads)].predict(self.X_test)
+        high = heads[max(heads)].predict(self.X_test)
+        coverage = float(np.mean((self.y_test >= low) & (self.y_test <= high)))
+        
+        self.quantile_heads = heads
+        self.quantile_metrics = {
+            'alphas': list(QUANTILE_ALPHAS),
+            'expected_coverage': max(QUANTILE_ALPHAS) - min(QUANTILE_ALPHAS),
+            'test_coverage': coverage,
+            'test_mean_width': float(np.mean(np.maximum(high - low, 0))),
+            'best_iterations': {str(alpha): head.best_iteration for alpha, head in heads.items()}
+        }
+        
+        logger.info(f"Quantile heads - test coverage: {coverage:.3f} (expected "
+                    f"{self.quantile_metrics['expected_coverage']:.2f}), mean width: "
+                    f"{self.quantile_metrics['test_mean_width']:.2f} positions")
+        
+    def predict_with(self, model_name: str, X: np.ndarray) -> np.ndarray:
+        """
+        Predict with a trained model, applying its scaler if it has one
+        """
+        model = self.models[model_name]
+        
+        if model_name in self.scalers:
+            X = self.scalers[model_name].transform(X)
+        
+        if isinstance(model, xgb.Booster):
+            return model.predict(xgb.DMatrix(X))
+        
+        return model.predict(X)
+        
+    def load_saved_models(self, model_names: List[str], models_dir: str = "models/saved"):
+        """
+        Load previously saved models, scalers and metrics
+        """
+        for model_name in model_names:
+            bundle_dir = os.path.join(models_dir, model_name)
+            if not is_bundle(bundle_dir):
+                raise FileNotFoundError(f"No saved {model_name} bundle in {models_dir}; run a full training "
+                                        f"or scripts/convert_artifacts.py first")
+            
+            bundle = load_bundle(bundle_dir)
+            self.models[model_name] = bundle.model
+            if bundle.scaler is not None:
+                self.scalers[model_name] = bundle.scaler
+            self.metrics[model_name] = {
+                k: v for k, v in bundle.metrics.items() if k not in ('model', 'trained')
+            }
+            
+            if bundle.feature_names != self.feature_columns:
+                raise ValueError(f"Saved {model_name} model was trained on different features; run a full training")
+        
+    def incremental_update(self, model_names: List[str], race_ids: Optional[List[int]] = None,
+                           models_dir: str = "models/saved", rounds: int = 20, extra_trees: int = 20,
+                           drift_window: int = 10, drift_tolerance: float = 0.05) -> Dict[str, Any]:
+        """
+        Continue the saved models with only the newly ingested race rows.
+        
+        Boosters keep training from their existing trees (init_model /
+        xgb_model) for a bounded number of rounds; the forest grows extra
+        trees fitted on the new rows. Each updated model is checked on the races
+        just before the new ones, and the update is rejected as drifted if
+        its MAE there degrades by more than drift_tolerance.
+        """
+        df = self.feature_data.dropna(subset=['target_position'])
+        
+        # Races in chronological order; default to the latest one
+        race_order = df.drop_duplicates('raceId').sort_values(['year', 'round'])['raceId'].tolist()
+        race_ids = race_ids or race_order[-1:]
+        
+        unknown = [race_id for race_id in race_ids if race_id not in race_order]
+        if unknown:
+            raise ValueError(f"Races {unknown} have no engineered rows with a finishing position")
+        
+        new_mask = df['raceId'].isin(race_ids).values
+        
+        first_new = min(race_order.index(race_id) for race_id in race_ids)
+        recent_races = race_order[max(0, first_new - drift_window):first_new]
+        recent_mask = df['raceId'].isin(recent_races).values
+        
+        X = df[self.feature_columns].values
+        y = df['target_position'].values
+        X_new, y_new = X[new_mask], y[new_mask]
+        X_recent, y_recent = X[recent_mask], y[recent_mask]
+        
+        self.load_saved_models(model_names, models_dir)
+        
+        logger.info(f"Incremental update on races {race_ids}: {len(X_new)} new rows, "
+                    f"drift check on {len(recent_races)} earlier races")
+        
+        report = {'race_ids': race_ids, 'models': {}, 'drifted': []}
+        
+        for model_name in model_names:
+            start = time.perf_counter()
+            
+            new_mae_before = mean_absolute_error(y_new, self.predict_with(model_name, X_new))
+            recent_mae_before = mean_absolute_error(y_recent, self.predict_with(model_name, X_recent))
+            
+            previous_model = self.models[model_name]
+            self.models[model_name] = self._continue_model(model_name, X_new, y_new, rounds, extra_trees)
+            
+            recent_mae_after = mean_absolute_error(y_recent, self.predict_with(model_name, X_recent))
+            drifted = recent_mae_after > recent_mae_before * (1 + drift_tolerance)
+            
+            result = {
+                'new_rows': int(len(X_new)),
+                'new_race_mae_before': new_mae_before,
+                'recent_mae_before': recent_mae_before,
+                'recent_mae_after': recent_mae_after,
+                'update_seconds': time.perf_counter() - start,
+                'drifted': bool(drifted)
+            }
+            report['models'][model_name] = result
+            
+            if drifted:
+                logger.warning(f"{model_name} degraded on recent races "
+                               f"({recent_mae_before:.3f} -> {recent_mae_after:.3f}); discarding update")
+                self.models[model_name] = previous_model
+                report['drifted'].append(model_name)
+                continue
+            
+            updates = self.metrics.get(model_name, {}).get('incremental_updates', [])
+            self.metrics[model_name] = {
+                **self.metrics.get(model_name, {}),
+                'incremental_updates': updates + [{
+                    'race_ids': race_ids,
+                    'updated': datetime.now().isoformat(),
+                    **result
+                }]
+            }
+            self.save_model_artifacts(model_name, models_dir)
+            
+            logger.info(f"{model_name} updated in {result['update_seconds']:.1f}s - recent MAE "
+                        f"{recent_mae_before:.3f} -> {recent_mae_after:.3f}")
+        
+        return report
+        
+    def _continue_model(self, model_name: str, X_new: np.ndarray, y_new: np.ndarray,
+                        rounds: int, extra_trees: int):
+        """
+        Warm-start one model on new rows and return the continued model
+        """
+        model = self.models[model_name]
+        params = dict(self.params[model_name])
+        
+        if model_name == 'lightgbm':
+            params.pop('num_boost_round')
+            params.update({'objective': 'regression', 'metric': 'mae', 'verbose': -1,
+                           'min_data_in_leaf': min(params.get('min_data_in_leaf', 20), max(1, len(X_new) // 4))})
+            
+            # Continue from the best iteration, not the trees after it
+            init_model = lgb.Booster(model_str=model.model_to_string())
+            return lgb.train(params, lgb.Dataset(X_new, label=y_new), num_boost_round=rounds,
+                             init_model=init_model)
+        
+        if model_name == 'xgboost':
+            params.pop('num_boost_round')
+            params.update({'objective': 'reg:squarederror', 'eval_metric': 'mae'})
+            
+            # Saved boosters are already cut at their best iteration
+            booster = model.booster if isinstance(model, XGBoostPredictor) else model
+            return xgb.train(params, xgb.DMatrix(X_new, label=y_new), num_boost_round=rounds,
+                             xgb_model=booster)
+        
+        if model_name == 'random_forest':
+            # Saved forests are flat arrays, so grow the extra trees separately
+            # and append them, as warm_start would on an in-memory estimator
+            if not isinstance(model, FlatForest):
+                model = FlatForest.from_estimators(model.estimators_)
+            extra = RandomForestRegressor(**{**params, 'n_estimators': extra_trees},
+                                          random_state=len(model.roots), n_jobs=1)
+            extra.fit(self.scalers[model_name].transform(X_new), y_new)
+            return model.append(FlatForest.from_estimators(extra.estimators_))
+        
+        raise ValueError(f"Incremental update not supported for {model_name}")
+        
+    def save_model_artifacts(self, model_name: str, models_dir: str = "models/saved", artifact_name: str = None,
+                             quantile_heads: Optional[Dict[float, Any]] = None):
+        """
+        Atomically save one model bundle with its scaler, feature names,
+        metrics and any quantile heads
+        """
+        artifact_name = artifact_name or model_name
+        os.makedirs(models_dir, exist_ok=True)
+        
+        save_bundle(
+            os.path.join(models_dir, artifact_name),
+            self.models[model_name],
+            scaler=self.scalers.get(model_name),
+            feature_names=self.feature_columns,
+            metrics={'model': model_name, 'trained': datetime.now().isoformat(),
+                     **self.metrics.get(model_name, {})},
+            quantile_heads=quantile_heads
+        )
+        
+        logger.info(f"Saved {artifact_name} model")
+        
+    def save_models(self, models_dir: str = "models/saved"):
         """
         Save trained models
         """
         logger.info("Saving models...")
         
-        models_dir = "models/saved"
-        os.makedirs(models_dir, exist_ok=True)
+        for model_name in self.models:
+            self.save_model_artifacts(model_name, models_dir)
+        
+        self.save_position_predictor(models_dir)
         
-        for model_name, model in self.models.items():
-            # Save model
-            model_path = os.path.join(models_dir, f"{model_name}.pkl")
-            joblib.dump(model, model_path)
+    def compact_random_forest(self, models_dir: str = "models/saved", mae_tolerance: float = 0.02) -> Dict[str, Any]:
+        """
+        Build a smaller serving model from the random forest.
+        
+        Two compactions are tried: greedy tree subset selection and
+        distillation into a shallow LightGBM model. Those within
+        mae_tolerance (relative) of the forest's validation MAE are
+        benchmarked and the fastest is registered as random_forest_compact.
+        """
+        forest = self.models['random_forest']
+        scaler = self.scalers['random_forest']
+        X_valid_scaled = scaler.transform(self.X_valid)
+        
+        original_valid_mae = mean_absolute_error(self.y_valid, forest.predict(X_valid_scaled))
+        target_mae = original_valid_mae * (1 + mae_tolerance)
+        
+        logger.info(f"Compacting random forest: validation MAE {original_valid_mae:.3f}, target {target_mae:.3f}")
+        
+        # Select trees on half the validation rows and check the tolerance
+        # on all of them, so the subset is not judged only on what it fit
+        selection_rows = np.arange(len(X_valid_scaled)) % 2 == 0
+        tree_indices = select_tree_subset(
+            per_tree_predictions(forest, X_valid_scaled[selection_rows]),
+            self.y_valid[selection_rows],
+            target_mae
+        )
+        teacher_predictions = forest.predict(scaler.transform(self.X_train))
+        
+        candidates = {
+            'original': (forest, scaler),
+            'tree_subset': (subset_forest(forest, tree_indices), scaler),
+            'distilled_lightgbm': (distill_forest(teacher_predictions, self.X_train), None)
+        }
+        
+        reports = {}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for method, (model, method_scaler) in candidates.items():
+                bundle_dir = save_bundle(os.path.join(tmp_dir, method), model, scaler=method_scaler,
+                                         feature_names=self.feature_columns)
+                
+                # Benchmark the serving path: the bundle as it loads from disk
+                predict_fn = load_bundle(bundle_dir).predict
+                
+                reports[method] = benchmark_model(
+                    predict_fn=predict_fn,
+                    load_fn=lambda bundle_dir=bundle_dir: load_bundle(bundle_dir),
+                    artifact_files=bundle_files(bundle_dir),
+                    X_holdout=self.X_test,
+                    y_holdout=self.y_test
+                )
+                reports[method]['valid_mae'] = mean_absolute_error(self.y_valid, predict_fn(self.X_valid))
+                reports[method]['meets_tolerance'] = bool(reports[method]['valid_mae'] <= target_mae)
+        
+        reports['tree_subset']['n_trees'] = len(tree_indices)
+        original = reports['original']
+        
+        for method, report in reports.items():
+            if method == 'original':
+                continue
+            report['size_reduction'] = 1 - report['artifact_bytes'] / original['artifact_bytes']
+            report['load_speedup'] = original['load_ms'] / max(report['load_ms'], 1e-9)
+            report['single_p50_speedup'] = original['single_p50_ms'] / max(report['single_p50_ms'], 1e-9)
             
-            # Save scaler if exists
-            if model_name in self.scalers:
-                scaler_path = os.path.join(models_dir, f"{model_name}_scaler.pkl")
-                joblib.dump(self.scalers[model_name], scaler_path)
+            logger.info(f"{method} - valid MAE: {report['valid_mae']:.3f}, test MAE: {report['holdout_mae']:.3f}, "
+                        f"size -{report['size_reduction']:.0%}, load x{report['load_speedup']:.1f}, "
+                        f"single-row x{report['single_p50_speedup']:.1f}")
+        
+        passing = [m for m in ('tree_subset', 'distilled_lightgbm') if reports[m]['meets_tolerance']]
+        selected = min(passing, key=lambda m: reports[m]['single_p50_ms']) if passing else None
+        
+        if selected is None:
+            logger.warning(f"No compaction met the {mae_tolerance:.1%} MAE tolerance; keeping the full forest only")
+        else:
+            model, method_scaler = candidates[selected]
+            self.models['random_forest_compact'] = model
+            if method_scaler is not None:
+                self.scalers['random_forest_compact'] = method_scaler
+            self.metrics['random_forest_compact'] = {
+                'mae': reports[selected]['holdout_mae'],
+                'compaction': selected,
+                'source_model': 'random_forest'
+            }
+            self.save_model_artifacts('random_forest_compact', models_dir)
+            logger.info(f"Registered {selected} as random_forest_compact")
+        
+        report = {
+            'mae_tolerance': mae_tolerance,
+            'original_valid_mae': original_valid_mae,
+            'selected': selected,
+            'candidates': reports
+        }
+        _atomic_write_json(report, os.path.join(models_dir, "random_forest_compaction.json"))
+        
+        return report
+        
+    def benchmark_models(self, models_dir: str = "models/saved") -> Dict[str, Dict[str, Any]]:
+        """
+        Accuracy and serving-cost benchmark of every trained model
+        """
+        reports = {}
+        
+        for model_name in self.models:
+            bundle_dir = os.path.join(models_dir, model_name)
             
-            # Save feature names
-            features_path = os.path.join(models_dir, f"{model_name}_features.pkl")
-            joblib.dump(self.feature_columns, features_path)
+            # Benchmark the serving path: the bundle as it loads from disk
+            reports[model_name] = benchmark_model(
+                predict_fn=load_bundle(bundle_dir).predict,
+                load_fn=lambda bundle_dir=bundle_dir: load_bundle(bundle_dir),
+                artifact_files=bundle_files(bundle_dir),
+                X_holdout=self.X_test,
+                y_holdout=self.y_test
+            )
             
-            logger.info(f"Saved {model_name} model")
+            report = reports[model_name]
+            logger.info(f"{model_name} - MAE: {report['holdout_mae']:.3f}, single p50/p99: "
+                        f"{report['single_p50_ms']:.2f}/{report['single_p99_ms']:.2f}ms, "
+                        f"batch20 p50: {report['batch20_p50_ms']:.2f}ms, "
+                        f"size: {report['artifact_bytes'] / 1e6:.1f}MB, load: {report['load_ms']:.0f}ms")
         
-        # Save best model as position_predictor
-        best_model_name = 'lightgbm'  # Choose best performing model
-        best_model_path = os.path.join(models_dir, "position_predictor.pkl")
-        joblib.dump(self.models[best_model_name], best_model_path)
+        return reports
         
-        if best_model_name in self.scalers:
-            best_scaler_path = os.path.join(models_dir, "position_predictor_scaler.pkl")
-            joblib.dump(self.scalers[best_model_name], best_scaler_path)
+    def save_position_predictor(self, models_dir: str = "models/saved", latency_budget_ms: Optional[float] = None):
+        """
+        Save the most accurate model within the latency budget as position_predictor
+        """
+        reports = self.benchmark_models(models_dir)
+        best_model_name = select_model(reports, latency_budget_ms)
         
-        best_features_path = os.path.join(models_dir, "position_predictor_features.pkl")
-        joblib.dump(self.feature_columns, best_features_path)
+        if not self.quantile_heads:
+            logger.warning("No quantile heads trained; position_predictor uncertainty will not vary per prediction")
+        self.save_model_artifacts(best_model_name, models_dir, artifact_name="position_predictor",
+                                  quantile_heads=self.quantile_heads)
         
+        # Keep the benchmark next to the artifact it justifies
+        _atomic_write_json({
+            'selected': best_model_name,
+            'latency_budget_ms': latency_budget_ms,
+            'latency_metric': 'single_p99_ms',
+            'benchmarked': datetime.now().isoformat(),
+            'candidates': reports,
+            'quantile_heads': self.quantile_metrics
+        }, os.path.join(models_dir, "position_predictor_benchmark.json"))
+        
+        logger.info(f"Selected {best_model_name} as position_predictor")
         logger.info("Model training and saving complete!")
 
+def _atomic_write_json(data: dict, path: str):
+    """
+    Write JSON via a temporary file and rename
+    """
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+def _attach_job_log(log_dir: str, job_name: str) -> logging.Handler:
+    """
+    Give a worker job its own log file next to the shared stderr output
+    """
+    os.makedirs(log_dir, exist_ok=True)
+    handler = logging.FileHandler(os.path.join(log_dir, f"{job_name}.log"), mode='w')
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    logging.getLogger().addHandler(handler)
+    return handler
+
+def _detach_job_log(handler: logging.Handler):
+    """
+    Remove a job log handler once the job is done
+    """
+    logging.getLogger().removeHandler(handler)
+    handler.close()
+
+def _run_training_job(model_name: str, n_threads: int, training_data: dict, feature_columns: list,
+                      models_dir: str, log_dir: str, params: Optional[dict] = None) -> dict:
+    """
+    Worker process entry point: train one model and write its artifacts
+    """
+    handler = _attach_job_log(log_dir, model_name)
+    
+    try:
+        trainer = F1ModelTrainer(params=params)
+        trainer.feature_columns = feature_columns
+        for key, value in training_data.items():
+            setattr(trainer, key, value)
+        
+        logger.info(f"[{model_name}] Starting with {n_threads} threads")
+        start = time.perf_counter()
+        getattr(trainer, f"train_{model_name}")(n_threads=n_threads)
+        trainer.metrics[model_name]['train_seconds'] = time.perf_counter() - start
+        
+        trainer.save_model_artifacts(model_name, models_dir)
+        
+        return {
+            'model_name': model_name,
+            'model': trainer.models[model_name],
+            'scaler': trainer.scalers.get(model_name),
+            'metrics': trainer.metrics[model_name]
+        }
+        
+    finally:
+        _detach_job_log(handler)
+
+def _run_cv_fold(model_name: str, fold: int, n_threads: int, X: np.ndarray, y: np.ndarray,
+                 masks: tuple, log_dir: str, params: Optional[dict] = None) -> dict:
+    """
+    Worker process entry point: train and evaluate one cross-validation fold
+    """
+    handler = _attach_job_log(log_dir, f"cv_{model_name}_fold{fold}")
+    
+    try:
+        train_mask, valid_mask, test_mask = masks
+        
+        trainer = F1ModelTrainer(params=params)
+        trainer.X_train, trainer.y_train = X[train_mask], y[train_mask]
+        trainer.X_valid, trainer.y_valid = X[valid_mask], y[valid_mask]
+        trainer.X_test, trainer.y_test = X[test_mask], y[test_mask]
+        
+        logger.info(f"[{model_name} fold {fold}] Starting with {n_threads} threads")
+        start = time.perf_counter()
+        getattr(trainer, f"train_{model_name}")(n_threads=n_threads)
+        trainer.metrics[model_name]['train_seconds'] = time.perf_counter() - start
+        
+        return {
+            'model_name': model_name,
+            'fold': fold,
+            'metrics': trainer.metrics[model_name],
+            'predictions': trainer.test_predictions[model_name]
+        }
+        
+    finally:
+        _detach_job_log(handler)
+
+def _run_tuning_trial(model_name: str, params: dict, n_threads: int, training_data: dict) -> dict:
+    """
+    Worker process entry point: score one hyperparameter configuration on
+    the validation season
+    """
+    trainer = F1ModelTrainer(params={model_name: params})
+    for key, value in training_data.items():
+        setattr(trainer, key, value)
+    
+    # Score on the validation season; the test seasons stay unseen
+    trainer.X_test, trainer.y_test = trainer.X_valid, trainer.y_valid
+    
+    start = time.perf_counter()
+    getattr(trainer, f"train_{model_name}")(n_threads=n_threads)
+    trainer.metrics[model_name]['train_seconds'] = time.perf_counter() - start
+    
+    return {
+        'score': trainer.metrics[model_name]['mae'],
+        'metrics': trainer.metrics[model_name]
+    }
+
+def expanding_season_splits(years: np.ndarray, n_folds: int, min_train_seasons: int = 5):
+    """
+    Expanding-window splits grouped by season.
+
+    Each fold tests on one of the last n_folds seasons, early-stops on the
+    season before it and trains on every earlier season, so no fold sees
+    results from its own future. Yields (fold, train_mask, valid_mask, test_mask).
+    """
+    seasons = np.sort(np.unique(years))
+    
+    for fold, test_season in enumerate(seasons[-n_folds:]):
+        position = np.searchsorted(seasons, test_season)
+        if position - 1 < min_train_seasons:
+            continue
+        
+        valid_season = seasons[position - 1]
+        yield fold, years < valid_season, years == valid_season, years == test_season
+
+class TrainingOrchestrator:
+    """
+    Runs candidate model trainings concurrently in worker processes under
+    a global CPU budget, giving each job an explicit thread allocation
+    """
+    
+    def __init__(self, trainer: F1ModelTrainer, cpu_budget: Optional[int] = None,
+                 models_dir: str = "models/saved"):
+        self.trainer = trainer
+        self.cpu_budget = max(1, cpu_budget or os.cpu_count() or 1)
+        self.models_dir = models_dir
+        self.log_dir = os.path.join(models_dir, "logs")
+        self.oof_dir = os.path.join(models_dir, "oof")
+        
+    def allocate_threads(self, job_names: List[str]) -> Dict[str, int]:
+        """
+        Split the CPU budget across concurrently running jobs
+        """
+        concurrency = min(len(job_names), self.cpu_budget)
+        base, remainder = divmod(self.cpu_budget, concurrency)
+        
+        allocation = {}
+        for i, job_name in enumerate(job_names):
+            allocation[job_name] = base + (1 if i % concurrency < remainder else 0)
+        
+        return allocation
+        
+    def _execute(self, jobs: Dict[str, tuple], on_result=None) -> Dict[str, Dict[str, Any]]:
+        """
+        Run job_fn(**kwargs, n_threads=...) for each (job_fn, kwargs) in jobs
+        and return the results of the jobs that succeeded
+        """
+        allocation = self.allocate_threads(list(jobs))
+        concurrency = min(len(jobs), self.cpu_budget)
+        
+        logger.info(f"Running {len(jobs)} jobs with {concurrency} workers, threads: {allocation}")
+        
+        results = {}
+        
+        # Spawned workers avoid inheriting OpenMP state from the parent
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=concurrency, mp_context=context) as executor:
+            futures = {
+                executor.submit(job_fn, n_threads=allocation[job_name], **kwargs): job_name
+                for job_name, (job_fn, kwargs) in jobs.items()
+            }
+            
+            for future in as_completed(futures):
+                job_name = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Job {job_name} failed: {str(e)}")
+                    continue
+                
+                results[job_name] = result
+                if on_result is not None:
+                    on_result(job_name, result)
+                
+                logger.info(f"Job {job_name} finished in {result['metrics']['train_seconds']:.1f}s")
+        
+        return results
+        
+    def run(self, model_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Train the given models, saving each one as soon as its job finishes
+        """
+        training_data = self.trainer.training_data()
+        
+        jobs = {
+            model_name: (_run_training_job, {
+                'model_name': model_name,
+                'training_data': training_data,
+                'feature_columns': self.trainer.feature_columns,
+                'models_dir': self.models_dir,
+                'log_dir': self.log_dir,
+                'params': self.trainer.params
+            })
+            for model_name in model_names
+        }
+        
+        def collect(model_name, result):
+            self.trainer.models[model_name] = result['model']
+            if result['scaler'] is not None:
+                self.trainer.scalers[model_name] = result['scaler']
+            self.trainer.metrics[model_name] = result['metrics']
+        
+        start = time.perf_counter()
+        results = self._execute(jobs, on_result=collect)
+        wall_seconds = time.perf_counter() - start
+        
+        if not results:
+            raise RuntimeError("All training jobs failed")
+        
+        metrics = {name: result['metrics'] for name, result in results.items()}
+        
+        _atomic_write_json({
+            'cpu_budget': self.cpu_budget,
+            'thread_allocation': self.allocate_threads(model_names),
+            'wall_seconds': wall_seconds,
+            'sum_job_seconds': sum(m['train_seconds'] for m in metrics.values()),
+            'jobs': metrics
+        }, os.path.join(self.models_dir, "training_summary.json"))
+        
+        logger.info(f"All training jobs finished in {wall_seconds:.1f}s")
+        
+        return metrics
+        
+    def cross_validate(self, model_names: List[str], n_folds: int) -> Dict[str, Dict[str, Any]]:
+        """
+        Season-grouped expanding-window cross-validation with folds evaluated
+        in parallel. Out-of-fold predictions are cached for later stacking.
+        """
+        X, y = self.trainer.X, self.trainer.y
+        row_keys = self.trainer.row_keys
+        splits = list(expanding_season_splits(row_keys['year'].values, n_folds))
+        
+        if not splits:
+            raise ValueError(f"Not enough seasons for {n_folds} cross-validation folds")
+        
+        jobs = {}
+        for model_name in model_names:
+            for fold, train_mask, valid_mask, test_mask in splits:
+                jobs[f"{model_name}_fold{fold}"] = (_run_cv_fold, {
+                    'model_name': model_name,
+                    'fold': fold,
+                    'X': X,
+                    'y': y,
+                    'masks': (train_mask, valid_mask, test_mask),
+                    'log_dir': self.log_dir,
+                    'params': self.trainer.params
+                })
+        
+        start = time.perf_counter()
+        results = self._execute(jobs)
+        wall_seconds = time.perf_counter() - start
+        
+        test_masks = {fold: test_mask for fold, _, _, test_mask in splits}
+        os.makedirs(self.oof_dir, exist_ok=True)
+        summary = {}
+        
+        for model_name in model_names:
+            fold_results = sorted(
+                (r for r in results.values() if r['model_name'] == model_name),
+                key=lambda r: r['fold']
+            )
+            if not fold_results:
+                continue
+            
+            oof_frames = []
+            for result in fold_results:
+                frame = row_keys[test_masks[result['fold']]].copy()
+                frame['fold'] = result['fold']
+                frame['target_position'] = y[test_masks[result['fold']]]
+                frame['prediction'] = result['predictions']
+                oof_frames.append(frame)
+            
+            oof_file = os.path.join(self.oof_dir, f"{model_name}_oof.parquet")
+            pd.concat(oof_frames, ignore_index=True).to_parquet(f"{oof_file}.tmp", index=False)
+            os.replace(f"{oof_file}.tmp", oof_file)
+            
+            fold_maes = [r['metrics']['mae'] for r in fold_results]
+            summary[model_name] = {
+                'mean_mae': float(np.mean(fold_maes)),
+                'std_mae': float(np.std(fold_maes)),
+                'folds': [
+                    {'fold': r['fold'], 'season': int(row_keys['year'].values[test_masks[r['fold']]][0]), **r['metrics']}
+                    for r in fold_results
+                ]
+            }
+            
+            logger.info(f"{model_name} CV - MAE: {summary[model_name]['mean_mae']:.3f} "
+                        f"± {summary[model_name]['std_mae']:.3f} over {len(fold_results)} folds")
+        
+        _atomic_write_json({
+            'n_folds': len(splits),
+            'cpu_budget': self.cpu_budget,
+            'wall_seconds': wall_seconds,
+            'models': summary
+        }, os.path.join(self.models_dir, "cv_summary.json"))
+        
+        return summary
+
+def tune_models(orchestrator: TrainingOrchestrator, model_names: List[str], args) -> Dict[str, Any]:
+    """
+    Successive-halving hyperparameter search for each model, resumable
+    from its trial journal
+    """
+    training_data = orchestrator.trainer.training_data()
+    best_params = {}
+    
+    for model_name in model_names:
+        search = SuccessiveHalvingSearch(
+            model_name,
+            SEARCH_SPACES[model_name],
+            RESOURCE_PARAMS[model_name],
+            n_trials=args.trials,
+            eta=args.eta,
+            min_resource=args.min_resource,
+            max_resource=args.max_resource if model_name != 'random_forest' else args.max_trees,
+            seed=args.seed,
+            journal_dir=args.journal_dir
+        )
+        
+        def evaluate(jobs, on_result, model_name=model_name):
+            orchestrator._execute({
+                job_name: (_run_tuning_trial, {
+                    'model_name': model_name,
+                    'params': params,
+                    'training_data': training_data
+                })
+                for job_name, params in jobs.items()
+            }, on_result=on_result)
+        
+        best = search.run(evaluate)
+        best_params[model_name] = best['params']
+        
+        logger.info(f"{model_name} tuned params: {best['params']}")
+    
+    # Merge with earlier results so models can be tuned one at a time
+    best_params_file = os.path.join(args.journal_dir, "best_params.json")
+    if os.path.exists(best_params_file):
+        with open(best_params_file) as f:
+            best_params = {**json.load(f), **best_params}
+    
+    os.makedirs(args.journal_dir, exist_ok=True)
+    _atomic_write_json(best_params, best_params_file)
+    logger.info(f"Saved tuned parameters to {best_params_file}")
+    
+    return best_params
+
+def run_incremental_update(trainer: F1ModelTrainer, orchestrator: TrainingOrchestrator,
+                           model_names: List[str], args):
+    """
+    Incremental update with a full retrain of any model that drifted
+    """
+    report = trainer.incremental_update(
+        model_names,
+        race_ids=args.race_id,
+        models_dir=orchestrator.models_dir,
+        rounds=args.rounds,
+        extra_trees=args.extra_trees,
+        drift_window=args.drift_window,
+        drift_tolerance=args.drift_tolerance
+    )
+    
+    if report['drifted']:
+        logger.warning(f"Falling back to a full retrain for {report['drifted']}")
+        orchestrator.run(report['drifted'])
+    
+    # Republish position_predictor if its source model changed
+    predictor_dir = os.path.join(orchestrator.models_dir, "position_predictor")
+    if is_bundle(predictor_dir):
+        source_model = read_manifest(predictor_dir)['metrics'].get('model')
+        if source_model in trainer.models:
+            # The quantile heads are kept as they are
+            trainer.save_model_artifacts(source_model, orchestrator.models_dir, artifact_name="position_predictor",
+                                         quantile_heads=load_bundle(predictor_dir).quantile_heads)
+    
+    _atomic_write_json(report, os.path.join(orchestrator.models_dir, "incremental_report.json"))
+    logger.info("Incremental update complete!")
+
 def main():
     """
     Main training pipeline
     """
-    trainer = F1ModelTrainer()
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--data-path', type=str, default='data/', help='Directory with the CSV datasets')
+    common.add_argument('--rebuild-features', action='store_true', help='Ignore the cached feature frame and rebuild it')
+    common.add_argument('--models', type=str, default=','.join(MODEL_NAMES), help='Comma-separated models to train')
+    common.add_argument('--cpu-budget', type=int, default=None, help='Total CPU threads shared by training jobs (default: all cores)')
+    
+    parser = argparse.ArgumentParser(description='Train F1 prediction models')
+    subparsers = parser.add_subparsers(dest='command')
+    
+    train_parser = subparsers.add_parser('train', parents=[common], help='Train and save models (default)')
+    train_parser.add_argument('--cv-folds', type=int, default=0, help='Run season-grouped cross-validation over the last N seasons first')
+    train_parser.add_argument('--tuned-params', type=str, default=None, help='JSON file of tuned parameters (e.g. models/saved/tuning/best_params.json)')
+    train_parser.add_argument('--latency-budget-ms', type=float, default=None, help='Max single-row p99 latency for position_predictor')
+    train_parser.add_argument('--compact-forest', action='store_true', help='Build a compact serving model from the random forest')
+    train_parser.add_argument('--compact-tolerance', type=float, default=0.02, help='Allowed relative MAE increase for the compact forest')
+    
+    tune_parser = subparsers.add_parser('tune', parents=[common], help='Successive-halving hyperparameter search')
+    tune_parser.add_argument('--trials', type=int, default=27, help='Configurations sampled per model')
+    tune_parser.add_argument('--eta', type=int, default=3, help='Keep the best 1/eta trials at each rung')
+    tune_parser.add_argument('--min-resource', type=int, default=50, help='Boosting rounds / trees at the first rung')
+    tune_parser.add_argument('--max-resource', type=int, default=1000, help='Boosting rounds at the final rung')
+    tune_parser.add_argument('--max-trees', type=int, default=400, help='Random forest trees at the final rung')
+    tune_parser.add_argument('--seed', type=int, default=42, help='Seed for sampling configurations')
+    tune_parser.add_argument('--journal-dir', type=str, default='models/saved/tuning', help='Directory for trial journals')
+    
+    incremental_parser = subparsers.add_parser('incremental', parents=[common], help='Warm-start saved models on newly ingested races')
+    incremental_parser.add_argument('--race-id', type=int, nargs='*', default=None, help='Races to add (default: the latest race in the data)')
+    incremental_parser.add_argument('--rounds', type=int, default=20, help='Extra boosting rounds for LightGBM/XGBoost')
+    incremental_parser.add_argument('--extra-trees', type=int, default=20, help='Extra trees for the random forest')
+    incremental_parser.add_argument('--drift-window', type=int, default=10, help='Earlier races used for the drift check')
+    incremental_parser.add_argument('--drift-tolerance', type=float, default=0.05, help='Allowed relative MAE increase before a full retrain')
+    incremental_parser.add_argument('--tuned-params', type=str, default=None, help='JSON file of tuned parameters used for the models')
+    
+    # Plain `train_models.py [options]` keeps meaning `train`
+    argv = sys.argv[1:]
+    if not argv or argv[0] not in subparsers.choices:
+        argv = ['train'] + argv
+    args = parser.parse_args(argv)
+    
+    params = None
+    if getattr(args, 'tuned_params', None):
+        with open(args.tuned_params) as f:
+            params = json.load(f)
+    
+    trainer = F1ModelTrainer(args.data_path, params=params)
     
     try:
         # Load and prepare data
-        trainer.load_data()
-        trainer.engineer_features()
+        trainer.engineer_features(rebuild=args.rebuild_features)
         trainer.prepare_training_data()
         
-        # Train models
-        trainer.train_lightgbm()
-        trainer.train_xgboost()
-        trainer.train_random_forest()
+        model_names = [name.strip() for name in args.models.split(',') if name.strip()]
+        orchestrator = TrainingOrchestrator(trainer, cpu_budget=args.cpu_budget)
+        
+        if args.command == 'tune':
+            tune_models(orchestrator, model_names, args)
+            return
+        
+        if args.command == 'incremental':
+            run_incremental_update(trainer, orchestrator, model_names, args)
+            return
+        
+        if args.cv_folds > 0:
+            orchestrator.cross_validate(model_names, args.cv_folds)
+        
+        # Train models concurrently; each job saves its own artifacts
+        orchestrator.run(model_names)
+        
+        if args.compact_forest and 'random_forest' in trainer.models:
+            trainer.compact_random_forest(mae_tolerance=args.compact_tolerance)
+        
+        # Uncertainty for whichever model is published
+        trainer.train_quantile_heads()
         
-        # Save models
-        trainer.save_models()
+        # Benchmark candidates and publish the best one
+        trainer.save_position_predictor(latency_budget_ms=args.latency_budget_ms)
         
         logger.info("Training pipeline completed successfully!")
         
@@ -356,4 +1434,4 @@ def main():
         raise
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,103 @@
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Largest interpolation error allowed per channel, in the channel's own
+# units (FastF1 X/Y are tenths of a metre). Gear and brake tolerances
+# below one step keep every change of state.
+DEFAULT_TOLERANCES = {
+    'Speed': 3.0,
+    'Throttle': 5.0,
+    'Brake': 0.5,
+    'nGear': 0.5,
+    'X': 20.0,
+    'Y': 20.0
+}
+
+def adaptive_sample_indices(x: np.ndarray, values: np.ndarray, max_points: Optional[int] = None) -> np.ndarray:
+    """
+    Indices of a shape-preserving subset of samples.
+
+    A multi-channel Ramer-Douglas-Peucker: values is (n_samples, n_channels)
+    already divided by each channel's tolerance, and a sample is needed
+    when linear interpolation (over x) between the kept samples around it
+    misses any channel by more than 1. Instead of recursing segment by
+    segment, every round splits all violating segments at once at their
+    worst sample, so a lap costs a handful of vectorized passes. With
+    max_points, the worst violations are kept first until the budget is
+    spent.
+    """
+    n_samples = len(x)
+    if n_samples <= 2:
+        return np.arange(n_samples)
+
+    max_points = max(2, min(max_points or n_samples, n_samples))
+    kept = np.zeros(n_samples, dtype=bool)
+    kept[[0, -1]] = True
+    positions = np.arange(n_samples)
+
+    while kept.sum() < max_points:
+        kept_idx = np.flatnonzero(kept)
+
+        # Segment of every sample, as the kept samples bounding it
+        segment = np.minimum(np.searchsorted(kept_idx, positions, side='right') - 1, len(kept_idx) - 2)
+        left, right = kept_idx[segment], kept_idx[segment + 1]
+
+        span = x[right] - x[left]
+        t = np.divide(x - x[left], span, out=np.zeros(n_samples), where=span > 0)
+        interpolated = values[left] + t[:, None] * (values[right] - values[left])
+
+        error = np.abs(values - interpolated).max(axis=1)
+        error[kept] = 0
+
+        # Worst sample of each segment, if it breaks the tolerance
+        segment_max = np.maximum.reduceat(error, kept_idx[:-1])
+        candidates = np.flatnonzero((error > 1) & (error == segment_max[segment]))
+        if len(candidates) == 0:
+            break
+        _, first = np.unique(segment[candidates], return_index=True)
+        candidates = candidates[first]
+
+        budget = max_points - kept.sum()
+        if len(candidates) > budget:
+            candidates = candidates[np.argsort(error[candidates])[::-1][:budget]]
+
+        kept[candidates] = True
+
+    return np.flatnonzero(kept)
+
+def downsample_telemetry(telemetry: pd.DataFrame, tolerances: Optional[Dict[str, float]] = None,
+                         tolerance_scale: float = 1.0, max_points: Optional[int] = None) -> pd.DataFrame:
+    """
+    Keep the telemetry samples needed to redraw every channel within tolerance.
+
+    Samples are parameterized by Distance (Time when it is missing), so
+    braking zones and apexes keep dense points while straights collapse
+    to a few. Channels missing from the frame are ignored; with none of
+    them present, max_points samples are kept evenly spaced.
+    """
+    tolerances = tolerances or DEFAULT_TOLERANCES
+    channels = [name for name in tolerances if name in telemetry.columns]
+
+    if len(telemetry) <= 2:
+        return telemetry
+
+    if not channels:
+        if max_points is None or len(telemetry) <= max_points:
+            return telemetry
+        return telemetry.iloc[np.unique(np.linspace(0, len(telemetry) - 1, max(2, max_points)).round().astype(int))]
+
+    if 'Distance' in telemetry.columns:
+        x = telemetry['Distance'].to_numpy(dtype='float64')
+    else:
+        x = telemetry['Time'].dt.total_seconds().to_numpy()
+
+    values = np.column_stack([
+        telemetry[name].astype('float64').ffill().fillna(0).to_numpy() / (tolerances[name] * tolerance_scale)
+        for name in channels
+    ])
+
+    return telemetry.iloc[adaptive_sample_indices(x, values, max_points)]
@@ -53,6 +53,22 @@ class FeatureEngineer:
             # Return default feature vector
             return np.zeros(len(self.feature_names), dtype=np.float32)
     
+    def create_feature_matrix(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Create one feature row per driver from arrays of the base features,
+        in the same column order as create_feature_vector
+        """
+        n_rows = len(columns['driver_id'])
+        defaults = {'qualifying_position': 10, 'last_3_laps_mean': 90000}
+        
+        matrix = np.zeros((n_rows, len(self.feature_names)), dtype=np.float32)
+        for i, name in enumerate(self.feature_names[:8]):
+            matrix[:, i] = columns.get(name, defaults.get(name, 0))
+        
+        matrix[:, 8] = [self._calculate_driver_experience(int(d)) for d in columns['driver_id']]
+        matrix[:, 9] = [self._calculate_constructor_form(int(c)) for c in columns.get('constructor_id', np.zeros(n_rows))]
+        return matrix
+    
     def _calculate_driver_experience(self, driver_id: int) -> float:
         """
         Calculate driver experience score
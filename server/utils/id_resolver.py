@@ -0,0 +1,129 @@
+import os
+import re
+import logging
+import unicodedata
+import pandas as pd
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def normalize_name(name) -> str:
+    """
+    Lookup form of an event, circuit or place name: lowercase ASCII words
+    without a trailing "grand prix" ("São Paulo Grand Prix" -> "sao paulo")
+    """
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode('ascii')
+    text = re.sub(r'[^a-z0-9]+', ' ', text.lower()).strip()
+    return re.sub(r'\s*grand prix$', '', text)
+
+class IdResolver:
+    """
+    Resolve FastF1 events and drivers to the dataset's raceId and driverId.
+
+    Indexes are built once from races, circuits, drivers and results:
+    (year, round) and (year, name) map to raceId, where a name is the race
+    name, circuit name, reference, location or country; (code, season)
+    and (number, season) map to driverId using who actually entered that
+    season, since codes and numbers are reused across eras. Names shared
+    by two races of one season (e.g. a country hosting twice) are left
+    out rather than guessed.
+    """
+
+    def __init__(self, data_path: str = "data/"):
+        self.data_path = data_path
+        self.race_by_round: Dict[Tuple[int, int], int] = {}
+        self.race_by_name: Dict[Tuple[int, str], int] = {}
+        self.driver_by_code: Dict[Tuple[str, int], int] = {}
+        self.driver_by_number: Dict[Tuple[int, int], int] = {}
+        self.latest_by_code: Dict[str, int] = {}
+
+        self._build_race_index()
+        self._build_driver_index()
+
+        logger.info(f"ID resolver built: {len(self.race_by_round)} races, "
+                    f"{len(self.driver_by_code)} driver seasons")
+
+    def _read(self, filename: str, columns: Dict[str, str]) -> pd.DataFrame:
+        return pd.read_csv(os.path.join(self.data_path, filename), usecols=list(columns),
+                           dtype=columns, na_values=['\\N'], keep_default_na=False)
+
+    def _build_race_index(self):
+        races = self._read('races.csv', {'raceId': 'int32', 'year': 'int32', 'round': 'int32',
+                                         'circuitId': 'int32', 'name': 'string'})
+        circuits = self._read('circuits.csv', {'circuitId': 'int32', 'circuitRef': 'string', 'name': 'string',
+                                               'location': 'string', 'country': 'string'})
+        races = races.merge(circuits.rename(columns={'name': 'circuit_name'}), on='circuitId', how='left')
+
+        self.race_by_round = dict(zip(zip(races['year'].tolist(), races['round'].tolist()), races['raceId'].tolist()))
+
+        ambiguous = set()
+        for column in ('name', 'circuit_name', 'circuitRef', 'location', 'country'):
+            for year, value, race_id in zip(races['year'].tolist(), races[column].tolist(), races['raceId'].tolist()):
+                if pd.isna(value):
+                    continue
+                key = (year, normalize_name(value))
+                if self.race_by_name.setdefault(key, race_id) != race_id:
+                    ambiguous.add(key)
+
+        for key in ambiguous:
+            del self.race_by_name[key]
+
+    def _build_driver_index(self):
+        drivers = self._read('drivers.csv', {'driverId': 'int32', 'code': 'string'})
+        results = self._read('results.csv', {'raceId': 'int32', 'driverId': 'int32', 'number': 'Int32'})
+        races = self._read('races.csv', {'raceId': 'int32', 'year': 'int32'})
+
+        entries = results.merge(races, on='raceId').merge(drivers, on='driverId', how='left')
+        entries = entries.sort_values('raceId')
+
+        # Last entry wins, so a mid-season number or seat change resolves to the latest
+        for year, code, number, driver_id in zip(entries['year'].tolist(), entries['code'].tolist(),
+                                                 entries['number'].tolist(), entries['driverId'].tolist()):
+            if not pd.isna(code):
+                self.driver_by_code[(code, year)] = driver_id
+                self.latest_by_code[code] = driver_id
+            if not pd.isna(number):
+                self.driver_by_number[(int(number), year)] = driver_id
+
+        # Drivers yet to start a race (reserves, new signings) are known by code only
+        for code, driver_id in zip(drivers['code'].tolist(), drivers['driverId'].tolist()):
+            if not pd.isna(code) and code not in self.latest_by_code:
+                self.latest_by_code[code] = driver_id
+
+    def race_id(self, year: int, *names, round_number: Optional[int] = None) -> Optional[int]:
+        """
+        raceId of a season's race by round number, or else by the first of
+        names (event, circuit, location or country) that identifies one race
+        """
+        if round_number is not None and (year, int(round_number)) in self.race_by_round:
+            return self.race_by_round[(year, int(round_number))]
+
+        for name in names:
+            if name is None or pd.isna(name):
+                continue
+            race_id = self.race_by_name.get((year, normalize_name(name)))
+            if race_id is not None:
+                return race_id
+
+        return None
+
+    def driver_id(self, season: int, code: Optional[str] = None, number=None) -> Optional[int]:
+        """
+        driverId by three-letter code or car number within a season; a code
+        not seen that season falls back to its most recent holder
+        """
+        if code and (code, season) in self.driver_by_code:
+            return self.driver_by_code[(code, season)]
+
+        if number is not None and str(number).isdigit() and (int(number), season) in self.driver_by_number:
+            return self.driver_by_number[(int(number), season)]
+
+        return self.latest_by_code.get(code) if code else None
+
+@lru_cache(maxsize=None)
+def load_id_resolver(data_path: str = "data/") -> IdResolver:
+    """
+    Shared resolver per data directory, built on first use
+    """
+    return IdResolver(data_path)
@@ -0,0 +1,70 @@
+import logging
+import numpy as np
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Simulated races per call; enough for probabilities to about +/-0.5%
+DEFAULT_SIMULATIONS = 50000
+
+# Spread (in positions) of a predicted finishing position with no better estimate
+DEFAULT_SIGMA = 2.0
+
+# Races simulated per chunk, bounding memory to a few MB of scores
+CHUNK_SIMULATIONS = 65536
+
+def simulate_positions(predicted: np.ndarray, sigma: Optional[np.ndarray] = None,
+                       n_simulations: int = DEFAULT_SIMULATIONS, seed: Optional[int] = None) -> np.ndarray:
+    """
+    Probability of each driver finishing in each position, as a
+    (drivers, positions) matrix.
+
+    Every simulated race draws one Gaussian score per driver around their
+    predicted position (sigma its uncertainty) and orders the grid by
+    score, so each simulation is a complete finishing order. Sorting a
+    whole (simulations, drivers) matrix with one argsort and counting
+    (driver, position) pairs with one bincount keeps 50k races of a
+    20-car grid to a few tens of milliseconds. Because every row is a
+    permutation, each row and each column of the result sums to 1: no
+    two drivers can both be likely winners.
+    """
+    predicted = np.asarray(predicted, dtype=np.float32)
+    n_drivers = len(predicted)
+    if n_drivers == 0:
+        return np.zeros((0, 0))
+
+    sigma = np.full(n_drivers, DEFAULT_SIGMA, dtype=np.float32) if sigma is None \
+        else np.broadcast_to(np.asarray(sigma, dtype=np.float32), (n_drivers,))
+    # A zero spread would make ties resolve by grid order; keep every driver uncertain
+    sigma = np.maximum(sigma, 1e-3)
+
+    rng = np.random.default_rng(seed)
+    positions = np.arange(n_drivers)
+    counts = np.zeros(n_drivers * n_drivers, dtype=np.int64)
+
+    remaining = n_simulations
+    while remaining > 0:
+        chunk = min(remaining, CHUNK_SIMULATIONS)
+        scores = rng.standard_normal((chunk, n_drivers), dtype=np.float32)
+        scores *= sigma
+        scores += predicted
+
+        # order[s, k] is the driver finishing k-th in simulation s
+        order = np.argsort(scores, axis=1)
+        counts += np.bincount((order * n_drivers + positions).ravel(), minlength=n_drivers * n_drivers)
+        remaining -= chunk
+
+    return counts.reshape(n_drivers, n_drivers) / n_simulations
+
+def summarize_positions(probabilities: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Per-driver win, podium and points (top 10) probabilities and expected
+    finishing position of a position probability matrix
+    """
+    positions = np.arange(1, probabilities.shape[1] + 1)
+    return {
+        'win': probabilities[:, 0],
+        'podium': probabilities[:, :3].sum(axis=1),
+        'points': probabilities[:, :10].sum(axis=1),
+        'expected_position': probabilities @ positions
+    }
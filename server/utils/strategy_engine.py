@@ -0,0 +1,323 @@
+import logging
+import warnings
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Any, Optional
+
+from utils.time_parsing import parse_time_to_ms
+
+logger = logging.getLogger(__name__)
+
+# Pit lane time (ms) of a circuit without pit stop history
+DEFAULT_PIT_LOSS_MS = 23000.0
+
+# Stops slower than this multiple of the circuit median (repairs, red flags) are not pit loss
+OUTLIER_LOSS_FACTOR = 1.5
+
+# Lap time lost per lap of tyre age (ms) when a driver has too few clean laps to fit
+DEFAULT_DEGRADATION_MS = 50.0
+MAX_DEGRADATION_MS = 500.0
+MIN_DEGRADATION_LAPS = 4
+
+# Laps slower than this multiple of the driver's median (safety car, traffic) are not pace
+CLEAN_LAP_FACTOR = 1.07
+
+def pit_loss_table(pit_stops: pd.DataFrame, races: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pit loss distribution of each circuit from its pit stop history.
+
+    Loss is the time from pit entry to pit exit: pit_stops milliseconds,
+    or its duration string where milliseconds is missing. Stops far
+    slower than the circuit's median (repairs, red flags) are dropped
+    before taking the median and percentiles.
+    """
+    columns = ['loss_ms', 'loss_p10_ms', 'loss_p90_ms', 'stops']
+    if len(pit_stops) == 0 or 'milliseconds' not in pit_stops.columns or 'circuitId' not in races.columns:
+        return pd.DataFrame(columns=columns, index=pd.Index([], name='circuitId'))
+
+    duration = pit_stops['duration_ms'] if 'duration_ms' in pit_stops.columns \
+        else parse_time_to_ms(pit_stops['duration']) if 'duration' in pit_stops.columns else np.nan
+    stops = pd.DataFrame({
+        'raceId': pit_stops['raceId'].astype('int64'),
+        'loss': pd.to_numeric(pit_stops['milliseconds'], errors='coerce').fillna(duration)
+    }).merge(races[['raceId', 'circuitId']], on='raceId')
+
+    median = stops.groupby('circuitId')['loss'].transform('median')
+    stops = stops[stops['loss'] <= OUTLIER_LOSS_FACTOR * median]
+
+    grouped = stops.groupby('circuitId')
+    table = pd.DataFrame({
+        'loss_ms': grouped['loss'].median(),
+        'loss_p10_ms': grouped['loss'].quantile(0.1),
+        'loss_p90_ms': grouped['loss'].quantile(0.9),
+        'stops': grouped['loss'].size()
+    })
+    return table[columns]
+
+def _row_medians(values: np.ndarray) -> np.ndarray:
+    """
+    Median of each row ignoring NaN; NaN for rows without values
+    """
+    if values.shape[1] == 0:
+        return np.full(values.shape[0], np.nan)
+
+    # Drivers without (clean) laps give all-NaN rows; callers fall back for them
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanmedian(values, axis=1)
+
+def estimate_degradation(lap_times: np.ndarray, pits: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Pace and tyre state of each driver from their laps so far.
+
+    lap_times is (drivers, laps) in ms with NaN for laps not driven and
+    pits marks in-laps. Lap time is modelled as base + degradation * tyre
+    age within each stint; degradation is the least-squares slope of
+    clean laps against tyre age with a separate level per stint (so a
+    change of compound does not read as degradation), fitted for every
+    driver at once with bincount sums. Start laps, in- and out-laps and
+    laps well off the driver's median are left out.
+    """
+    n_drivers, n_laps = lap_times.shape
+    lap_numbers = np.arange(1, n_laps + 1)
+    driven = ~np.isnan(lap_times)
+
+    # Last pit lap strictly before each lap, and the tyre age and stint it gives
+    last_pit = np.maximum.accumulate(np.where(pits, lap_numbers, 0), axis=1)
+    pit_before = np.concatenate([np.zeros((n_drivers, 1), dtype=last_pit.dtype), last_pit[:, :-1]], axis=1)
+    age = (lap_numbers - pit_before).astype(float)
+    stint = np.concatenate([np.zeros((n_drivers, 1), dtype=np.int64),
+                            np.cumsum(pits, axis=1)[:, :-1]], axis=1)
+
+    median = _row_medians(lap_times)
+    out_lap = (pit_before > 0) & (age == 1)
+    clean = driven & (lap_numbers > 1) & ~pits & ~out_lap & (lap_times <= CLEAN_LAP_FACTOR * median[:, None])
+
+    drivers, laps = np.nonzero(clean)
+    x, y = age[drivers, laps], lap_times[drivers, laps]
+
+    # Demean within (driver, stint), then one slope per driver
+    groups = drivers * (n_laps + 1) + stint[drivers, laps]
+    n_groups = n_drivers * (n_laps + 1)
+    sizes = np.bincount(groups, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = np.bincount(groups, x, n_groups) / sizes
+        y_mean = np.bincount(groups, y, n_groups) / sizes
+        dx, dy = x - x_mean[groups], y - y_mean[groups]
+        slope = np.bincount(drivers, dx * dy, n_drivers) / np.bincount(drivers, dx * dx, n_drivers)
+
+    fitted = np.isfinite(slope) & (np.bincount(drivers, minlength=n_drivers) >= MIN_DEGRADATION_LAPS)
+    fallback = float(np.median(slope[fitted])) if fitted.any() else DEFAULT_DEGRADATION_MS
+    degradation = np.clip(np.where(fitted, slope, fallback), 0, MAX_DEGRADATION_MS)
+
+    # Fresh-tyre pace: clean laps with their tyre age taken out
+    base = _row_medians(np.where(clean, lap_times - degradation[:, None] * age, np.nan))
+    base = np.where(np.isnan(base), median, base)
+    base = np.where(np.isnan(base), np.nanmedian(base) if np.isfinite(base).any() else 0.0, base)
+
+    laps_done = np.where(driven.any(axis=1), n_laps - np.argmax(driven[:, ::-1], axis=1), 0)
+    tyre_age = np.where(laps_done > 0, age[np.arange(n_drivers), np.maximum(laps_done - 1, 0)], 0)
+
+    return {
+        'base_ms': base,
+        'degradation_ms': degradation,
+        'laps_done': laps_done,
+        'tyre_age': tyre_age,
+        'stops_made': pits.sum(axis=1),
+        'elapsed_ms': np.nansum(np.where(driven, lap_times, 0.0), axis=1)
+    }
+
+def _stint_cost(laps, start_age, base, degradation):
+    """
+    Time (ms) of a stint of laps on tyres already start_age laps old
+    """
+    return laps * base + degradation * (laps * start_age + laps * (laps + 1) / 2)
+
+def evaluate_strategies(state: Dict[str, np.ndarray], total_laps: int, pit_loss_ms: float) -> Dict[str, np.ndarray]:
+    """
+    Remaining race time (ms) of every driver under every plan.
+
+    With a lap's time linear in tyre age, a stint's time has a closed
+    form, so each plan costs a few array operations: no further stop
+    (drivers,), one stop at the end of each lap (drivers, laps) and two
+    stops at every pair of laps (drivers, laps, laps), all evaluated at
+    once by broadcasting. Index i of a laps axis is an in-lap of i + 1;
+    impossible plans (in the past, or not leaving a lap to drive) are inf.
+    A driver yet to stop must stop once, as the two-compound rule requires.
+    """
+    laps_done = state['laps_done'].astype(float)
+    age = state['tyre_age'].astype(float)
+    base, degradation = state['base_ms'], state['degradation_ms']
+    remaining = np.maximum(total_laps - laps_done, 0)
+
+    stop_laps = np.arange(1, total_laps + 1, dtype=float)
+    to_stop = stop_laps[None, :] - laps_done[:, None]              # laps before the stop
+    after = total_laps - stop_laps                                  # laps after it
+
+    d_base, d_degradation = base[:, None], degradation[:, None]
+    no_stop = _stint_cost(remaining, age, base, degradation)
+    no_stop = np.where((state['stops_made'] > 0) | (remaining == 0), no_stop, np.inf)
+
+    one_stop = (_stint_cost(to_stop, age[:, None], d_base, d_degradation)
+                + _stint_cost(after[None, :], 0, d_base, d_degradation) + pit_loss_ms)
+    one_stop = np.where((to_stop >= 1) & (after[None, :] >= 1), one_stop, np.inf)
+
+    # Two stops: first at the end of lap p (axis 1), second at the end of lap q (axis 2)
+    between = stop_laps[None, :] - stop_laps[:, None]
+    two_stop = (_stint_cost(to_stop, age[:, None], d_base, d_degradation)[:, :, None]
+                + _stint_cost(between[None], 0, base[:, None, None], degradation[:, None, None])
+                + _stint_cost(after[None, None, :], 0, base[:, None, None], degradation[:, None, None])
+                + 2 * pit_loss_ms)
+    valid = (to_stop[:, :, None] >= 1) & (between[None] >= 1) & (after[None, None, :] >= 1)
+    two_stop = np.where(valid, two_stop, np.inf)
+
+    return {'no_stop': no_stop, 'one_stop': one_stop, 'two_stop': two_stop}
+
+class StrategyEngine:
+    """
+    Pit strategy what-ifs for every driver of a live race.
+
+    Pit loss comes from the circuit's pit stop history and each driver's
+    pace and degradation from their laps so far. All plans of all drivers
+    are evaluated as one array computation (see evaluate_strategies), and
+    projected positions compare each plan of a driver against everyone
+    else following their own best plan.
+    """
+
+    def __init__(self, pit_stops: pd.DataFrame, races: pd.DataFrame, results: pd.DataFrame):
+        self.pit_losses = pit_loss_table(pit_stops, races)
+        self.circuits = dict(zip(races['raceId'], races['circuitId'])) \
+            if {'raceId', 'circuitId'} <= set(races.columns) else {}
+        self.race_laps = results.groupby('raceId')['laps'].max().to_dict() \
+            if {'raceId', 'laps'} <= set(results.columns) else {}
+
+        overall = self.pit_losses['loss_ms'].median() if len(self.pit_losses) else np.nan
+        self.default_loss_ms = float(overall) if pd.notna(overall) else DEFAULT_PIT_LOSS_MS
+        logger.info(f"Pit loss distributions for {len(self.pit_losses)} circuits")
+
+    def pit_loss(self, race_id: int) -> Dict[str, Any]:
+        """
+        Pit loss distribution (ms) at a race's circuit
+        """
+        circuit_id = self.circuits.get(race_id)
+        if circuit_id in self.pit_losses.index:
+            row = self.pit_losses.loc[circuit_id]
+            return {'circuitId': int(circuit_id), 'loss_ms': round(float(row['loss_ms']), 1),
+                    'loss_p10_ms': round(float(row['loss_p10_ms']), 1),
+                    'loss_p90_ms': round(float(row['loss_p90_ms']), 1), 'stops': int(row['stops'])}
+        return {'circuitId': None if circuit_id is None else int(circuit_id), 'loss_ms': self.default_loss_ms,
+                'loss_p10_ms': None, 'loss_p90_ms': None, 'stops': 0}
+
+    def total_laps(self, race_id: int) -> Optional[int]:
+        """
+        Scheduled race distance, from the race's results when known
+        """
+        laps = pd.to_numeric(pd.Series([self.race_laps.get(race_id)]), errors='coerce').iloc[0]
+        return int(laps) if pd.notna(laps) and laps > 0 else None
+
+    @staticmethod
+    def _race_matrices(lap_data: List[Dict[str, Any]], pit_data: List[Dict[str, Any]]) -> tuple:
+        """
+        Driver codes, (drivers, laps) lap times and in-lap flags of a live race
+        """
+        laps = pd.DataFrame(lap_data)
+        if len(laps) == 0:
+            return [], np.zeros((0, 0)), np.zeros((0, 0), dtype=bool)
+
+        laps = laps.set_index('lap').sort_index()
+        laps = laps.reindex(range(1, int(laps.index.max()) + 1))
+        drivers = list(laps.columns)
+        lap_times = laps.to_numpy(dtype=float).T
+
+        pits = np.zeros(lap_times.shape, dtype=bool)
+        rows = {driver: i for i, driver in enumerate(drivers)}
+        for stop in pit_data:
+            row = rows.get(stop['driver'])
+            if row is not None and 1 <= stop['lap'] <= lap_times.shape[1]:
+                pits[row, stop['lap'] - 1] = True
+        return drivers, lap_times, pits
+
+    def evaluate(self, race_id: int, lap_data: List[Dict[str, Any]], pit_data: List[Dict[str, Any]],
+                 total_laps: Optional[int] = None, driver: Optional[str] = None,
+                 pit_laps: Optional[List[int]] = None) -> Dict[str, Any]:
+        """
+        Best no-, one- and two-stop plans of every driver (or one driver)
+        of a race, with the time and projected position of stopping at the
+        end of each lap (or only the pit_laps asked about)
+        """
+        drivers, lap_times, pits = self._race_matrices(lap_data, pit_data)
+        current_lap = lap_times.shape[1]
+        total_laps = max(total_laps or self.total_laps(race_id) or current_lap, current_lap)
+        loss = self.pit_loss(race_id)
+
+        result = {'raceId': race_id, 'current_lap': current_lap, 'total_laps': total_laps, 'pit_loss': loss,
+                  'strategies': []}
+        if not drivers:
+            return result
+
+        state = estimate_degradation(lap_times, pits)
+        plans = evaluate_strategies(state, total_laps, loss['loss_ms'])
+
+        n_drivers, n_stop_laps = plans['one_stop'].shape
+        one_best = plans['one_stop'].argmin(axis=1) if n_stop_laps else np.zeros(n_drivers, dtype=np.int64)
+        two_flat = plans['two_stop'].reshape(n_drivers, -1)
+        two_best = two_flat.argmin(axis=1) if two_flat.shape[1] else np.zeros(n_drivers, dtype=np.int64)
+
+        rows = np.arange(n_drivers)
+        options = np.column_stack([
+            plans['no_stop'],
+            plans['one_stop'][rows, one_best] if n_stop_laps else np.full(n_drivers, np.inf),
+            two_flat[rows, two_best] if two_flat.shape[1] else np.full(n_drivers, np.inf)
+        ])
+        best_stops = options.argmin(axis=1)
+        best_remaining = options[rows, best_stops]
+
+        # Projected positions: a driver's plan against everyone else's best plan
+        best_total = state['elapsed_ms'] + best_remaining
+        field = np.sort(best_total)
+        one_total = state['elapsed_ms'][:, None] + plans['one_stop']
+        one_position = np.searchsorted(field, one_total) + 1 - (best_total[:, None] < one_total)
+        best_position = np.searchsorted(field, best_total) + 1
+
+        if pit_laps is not None:
+            lap_index = np.array([lap - 1 for lap in pit_laps if 1 <= lap <= n_stop_laps], dtype=np.int64)
+        else:
+            lap_index = np.arange(n_stop_laps)
+
+        def plan(stops: int, row: int) -> Dict[str, Any]:
+            remaining = options[row, stops]
+            if not np.isfinite(remaining):
+                return None
+            stop_laps = [] if stops == 0 else [int(one_best[row]) + 1] if stops == 1 \
+                else [int(i) + 1 for i in np.unravel_index(two_best[row], (n_stop_laps, n_stop_laps))]
+            return {'stops': stops, 'pit_laps': stop_laps, 'remaining_ms': round(float(remaining)),
+                    'delta_ms': round(float(remaining - best_remaining[row]))}
+
+        strategies = []
+        for row, code in enumerate(drivers):
+            if driver is not None and code != driver:
+                continue
+
+            finite = np.isfinite(plans['one_stop'][row, lap_index])
+            strategies.append({
+                'driver': code,
+                'laps_completed': int(state['laps_done'][row]),
+                'tyre_age': int(state['tyre_age'][row]),
+                'stops_made': int(state['stops_made'][row]),
+                'base_lap_ms': round(float(state['base_ms'][row])),
+                'degradation_ms_per_lap': round(float(state['degradation_ms'][row]), 1),
+                'best': {**plan(int(best_stops[row]), row), 'projected_position': int(best_position[row])}
+                if np.isfinite(best_remaining[row]) else None,
+                'plans': {str(stops): plan(stops, row) for stops in (0, 1, 2)},
+                'one_stop': [
+                    {
+                        'lap': int(i) + 1,
+                        'delta_ms': round(float(plans['one_stop'][row, i] - best_remaining[row])),
+                        'projected_position': int(one_position[row, i])
+                    }
+                    for i in lap_index[finite]
+                ]
+            })
+
+        result['strategies'] = strategies
+        return result
@@ -0,0 +1,159 @@
+import os
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+GROUP_KEYS = ['raceId', 'driverId']
+
+# Rows per CSV chunk / Parquet batch; memory is bounded by this plus one
+# accumulator row per (raceId, driverId)
+DEFAULT_CHUNK_ROWS = 100_000
+
+def find_input(data_path: str, stem: str) -> Optional[str]:
+    """
+    Path of a dataset as Parquet if present, else CSV, else None
+    """
+    for extension in ('.parquet', '.csv'):
+        path = os.path.join(data_path, f"{stem}{extension}")
+        if os.path.exists(path):
+            return path
+    return None
+
+def iter_chunks(path: str, dtypes: Dict[str, str], chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Yield a file's projected columns in bounded chunks.
+
+    CSV files are read with chunksize; Parquet files are read batch by
+    batch through their row groups, so neither is ever loaded whole.
+    """
+    columns = list(dtypes)
+
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas().astype(dtypes)
+        return
+
+    yield from pd.read_csv(path, usecols=columns, dtype=dtypes, na_values=['\\N'], chunksize=chunk_rows)
+
+class GroupedStats:
+    """
+    Streaming per-group count, mean, variance, min and sum of one column.
+
+    Each chunk is reduced to per-group partial statistics, which are
+    merged into the running ones with Chan et al.'s parallel form of
+    Welford's update: counts and sums add, and the sum of squared
+    deviations M2 gains n_i * (mean_i - mean)**2 per partial. Only one
+    row per group is kept between chunks.
+    """
+
+    def __init__(self, keys: List[str], value_column: str):
+        self.keys = keys
+        self.value_column = value_column
+        self.state = None
+        self.rows = 0
+
+    @staticmethod
+    def _combine(partials: pd.DataFrame) -> pd.DataFrame:
+        """
+        Merge partial statistics sharing an index into one row per group
+        """
+        grouped = partials.groupby(level=list(range(partials.index.nlevels)), sort=False)
+
+        count = grouped['count'].sum()
+        total = grouped['sum'].sum()
+        mean = total / count.where(count > 0)
+
+        # Chan's merge: within-partial M2 plus each partial's offset from the pooled mean
+        offset = partials['count'] * (partials['mean'] - mean.reindex(partials.index).values) ** 2
+        m2 = grouped['m2'].sum() + offset.fillna(0).groupby(level=list(range(partials.index.nlevels)),
+                                                             sort=False).sum()
+
+        return pd.DataFrame({
+            'count': count,
+            'sum': total,
+            'mean': mean,
+            'm2': m2,
+            'min': grouped['min'].min()
+        })
+
+    def update(self, chunk: pd.DataFrame):
+        """
+        Fold one chunk of rows into the running statistics
+        """
+        values = chunk[self.value_column].astype('float64')
+        grouped = values.groupby([chunk[key] for key in self.keys], sort=False)
+
+        mean = grouped.transform('mean')
+        partial = pd.DataFrame({
+            'count': grouped.count(),
+            'sum': grouped.sum(),
+            'mean': grouped.mean(),
+            'm2': ((values - mean) ** 2).groupby([chunk[key] for key in self.keys], sort=False).sum(),
+            'min': grouped.min()
+        })
+
+        self.rows += len(chunk)
+        self.state = partial if self.state is None else self._combine(pd.concat([self.state, partial]))
+
+    def result(self) -> pd.DataFrame:
+        """
+        Final statistics with sample (ddof=1) variance, one row per group
+        """
+        if self.state is None:
+            return pd.DataFrame(columns=self.keys + ['count', 'sum', 'mean', 'var', 'min'])
+
+        state = self.state
+        variance = state['m2'] / (state['count'] - 1).where(state['count'] > 1)
+
+        return pd.DataFrame({
+            'count': state['count'],
+            'sum': state['sum'],
+            'mean': state['mean'],
+            'var': variance,
+            'min': state['min']
+        }).reset_index().sort_values(self.keys, ignore_index=True)
+
+def _aggregate(path: str, dtypes: Dict[str, str], value_column: str, chunk_rows: int) -> pd.DataFrame:
+    stats = GroupedStats(GROUP_KEYS, value_column)
+
+    for chunk in iter_chunks(path, dtypes, chunk_rows):
+        stats.update(chunk)
+
+    logger.info(f"Aggregated {stats.rows} rows from {os.path.basename(path)}")
+    return stats.result()
+
+def aggregate_lap_times(path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> pd.DataFrame:
+    """
+    Per-(raceId, driverId) lap time features, streamed from lap_times
+    """
+    dtypes = {'raceId': 'int32', 'driverId': 'int32', 'milliseconds': 'float32'}
+    stats = _aggregate(path, dtypes, 'milliseconds', chunk_rows)
+
+    return pd.DataFrame({
+        'raceId': stats['raceId'].astype('int32'),
+        'driverId': stats['driverId'].astype('int32'),
+        'avg_lap_time': stats['mean'].astype('float32'),
+        'lap_time_std': np.sqrt(stats['var'].astype('float64')).astype('float32'),
+        'fastest_lap': stats['min'].astype('float32'),
+        'lap_count': stats['count'].astype('int32')
+    })
+
+def aggregate_pit_stops(path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> pd.DataFrame:
+    """
+    Per-(raceId, driverId) pit stop count and total time, streamed from pit_stops
+    """
+    dtypes = {'raceId': 'int32', 'driverId': 'int32', 'milliseconds': 'float32'}
+    stats = _aggregate(path, dtypes, 'milliseconds', chunk_rows)
+
+    return pd.DataFrame({
+        'raceId': stats['raceId'].astype('int32'),
+        'driverId': stats['driverId'].astype('int32'),
+        'pit_count': stats['count'].astype('int32'),
+        'total_pit_time': stats['sum'].astype('float32')
+    })
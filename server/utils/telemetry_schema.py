@@ -0,0 +1,182 @@
+import os
+import logging
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# Hive partition keys of the sample dataset (season=2024/raceId=1121/session=R/driverId=830)
+PARTITION_SCHEMA = pa.schema([
+    ('season', pa.int16()),
+    ('raceId', pa.int32()),
+    ('session', pa.string()),
+    ('driverId', pa.int32())
+])
+
+# The lap table is small, so it is partitioned down to the session only
+LAP_PARTITION_SCHEMA = pa.schema(list(PARTITION_SCHEMA)[:3])
+
+# One row per telemetry sample; channels are flat typed columns
+SAMPLE_SCHEMA = pa.schema(list(PARTITION_SCHEMA) + [
+    ('lap', pa.uint16()),
+    ('time_ms', pa.int32()),        # since the start of the lap
+    ('sector', pa.uint8()),         # 1-3; 0 where the lap has no sector timing
+    ('speed_kmh', pa.float32()),
+    ('track_pos_x', pa.float32()),
+    ('track_pos_y', pa.float32()),
+    ('throttle', pa.float32()),
+    ('brake', pa.bool_()),
+    ('gear', pa.uint8()),
+    ('rpm', pa.uint16()),
+    ('drs', pa.uint8())
+])
+
+# One row per lap; lap-level fields are stored once here, not per sample
+LAP_SCHEMA = pa.schema(list(PARTITION_SCHEMA) + [
+    ('lap', pa.uint16()),
+    ('lap_time_ms', pa.float32()),
+    ('sector_1_ms', pa.float32()),  # FastF1 Sector1Time..Sector3Time; null where not timed
+    ('sector_2_ms', pa.float32()),
+    ('sector_3_ms', pa.float32()),
+    ('samples', pa.uint16())
+])
+
+SECTOR_TIME_COLUMNS = ['sector_1_ms', 'sector_2_ms', 'sector_3_ms']
+
+# Low-cardinality columns get dictionary pages; monotonic integers are
+# delta-packed and float channels byte-stream-split ahead of zstd
+DICTIONARY_COLUMNS = ['lap', 'sector', 'gear', 'drs']
+COLUMN_ENCODINGS = {
+    'time_ms': 'DELTA_BINARY_PACKED',
+    'rpm': 'DELTA_BINARY_PACKED',
+    'speed_kmh': 'BYTE_STREAM_SPLIT',
+    'track_pos_x': 'BYTE_STREAM_SPLIT',
+    'track_pos_y': 'BYTE_STREAM_SPLIT',
+    'throttle': 'BYTE_STREAM_SPLIT'
+}
+
+SAMPLES_DIR = "samples"
+LAPS_DIR = "laps"
+
+def _cast(column, dtype: pa.DataType, fill=None) -> pa.Array:
+    """
+    Cast a column to a compact type, filling nulls first for integer targets
+    """
+    if fill is not None:
+        column = pc.fill_null(column, fill)
+    return pc.cast(column, dtype, safe=False)
+
+def normalize_telemetry(table: pa.Table, season: int, session: str) -> tuple:
+    """
+    Split a capture table into (samples, laps) tables of the flat schema.
+
+    The capture table has one row per sample with lap_time_ms and the
+    sector times repeated on every row and the car channels nested in an
+    additional_json struct. Channels become typed top-level columns and
+    lap-level fields move to one row per lap.
+    """
+    n_rows = table.num_rows
+    additional = table.column('additional_json').combine_chunks()
+
+    def channel(name):
+        return additional.field(name)
+
+    keys = {
+        'season': pa.array(np.full(n_rows, season, dtype=np.int16)),
+        'raceId': _cast(table.column('raceId'), pa.int32()),
+        'session': pa.array([session] * n_rows, type=pa.string()) if n_rows else pa.array([], pa.string()),
+        'driverId': _cast(table.column('driverId'), pa.int32()),
+        'lap': _cast(table.column('lap'), pa.uint16(), 0)
+    }
+
+    # Durations are int64 nanoseconds underneath
+    time_ns = pc.cast(table.column('timestamp'), pa.int64())
+
+    samples = pa.table({
+        **keys,
+        'time_ms': _cast(pc.divide(time_ns, 1_000_000), pa.int32(), 0),
+        'sector': _cast(table.column('sector'), pa.uint8(), 0),
+        'speed_kmh': _cast(table.column('speed_kmh'), pa.float32()),
+        'track_pos_x': _cast(table.column('track_pos_x'), pa.float32()),
+        'track_pos_y': _cast(table.column('track_pos_y'), pa.float32()),
+        'throttle': _cast(channel('throttle'), pa.float32()),
+        'brake': _cast(channel('brake'), pa.bool_(), False),
+        'gear': _cast(channel('gear'), pa.uint8(), 0),
+        'rpm': _cast(channel('rpm'), pa.uint16(), 0),
+        'drs': _cast(channel('drs'), pa.uint8(), 0)
+    }, schema=SAMPLE_SCHEMA)
+
+    lap_columns = ['lap_time_ms'] + SECTOR_TIME_COLUMNS
+    lap_rows = pa.table({
+        **keys,
+        **{name: _cast(table.column(name), pa.float32()) for name in lap_columns}
+    })
+    laps = lap_rows.group_by(list(keys)).aggregate(
+        [(name, 'max') for name in lap_columns] + [('lap', 'count')]
+    )
+    laps = pa.table({
+        **{name: laps.column(name) for name in keys},
+        **{name: laps.column(f"{name}_max") for name in lap_columns},
+        'samples': _cast(laps.column('lap_count'), pa.uint16())
+    }, schema=LAP_SCHEMA)
+
+    sort_keys = [(name, 'ascending') for name in ('driverId', 'lap')]
+    return samples.sort_by(sort_keys + [('time_ms', 'ascending')]), laps.sort_by(sort_keys)
+
+def parquet_write_options() -> ds.FileWriteOptions:
+    """
+    zstd with dictionary, delta and byte-stream-split encodings
+    """
+    return ds.ParquetFileFormat().make_write_options(
+        compression='zstd',
+        use_dictionary=DICTIONARY_COLUMNS,
+        column_encoding=COLUMN_ENCODINGS
+    )
+
+def write_telemetry_dataset(samples: pa.Table, laps: pa.Table, root: str, basename: str = "part",
+                            replace: bool = True) -> List[str]:
+    """
+    Write samples and laps as hive-partitioned Parquet under root.
+
+    With replace, the partitions being written are cleared first (a full
+    recapture); otherwise files are added next to the existing ones,
+    which is how live updates append. Returns the written file paths,
+    relative to root.
+    """
+    written = []
+
+    def record(written_file):
+        written.append(os.path.relpath(written_file.path, root))
+
+    behavior = 'delete_matching' if replace else 'overwrite_or_ignore'
+
+    for table, subdir, partition_schema, options in (
+        (samples, SAMPLES_DIR, PARTITION_SCHEMA, parquet_write_options()),
+        (laps, LAPS_DIR, LAP_PARTITION_SCHEMA, ds.ParquetFileFormat().make_write_options(compression='zstd'))
+    ):
+        if table.num_rows == 0:
+            continue
+
+        ds.write_dataset(
+            table,
+            os.path.join(root, subdir),
+            format='parquet',
+            partitioning=ds.partitioning(partition_schema, flavor='hive'),
+            file_options=options,
+            basename_template=f"{basename}-{{i}}.parquet",
+            existing_data_behavior=behavior,
+            file_visitor=record
+        )
+
+    return written
+
+def telemetry_dataset(root: str, laps: bool = False) -> ds.Dataset:
+    """
+    The sample (or lap) dataset under root, with typed partition keys
+    """
+    subdir, partition_schema = (LAPS_DIR, LAP_PARTITION_SCHEMA) if laps else (SAMPLES_DIR, PARTITION_SCHEMA)
+    return ds.dataset(os.path.join(root, subdir), format='parquet',
+                      partitioning=ds.partitioning(partition_schema, flavor='hive'))
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Ergast marks missing values with a literal \N
+NULL_MARKERS = ['\\N', '', 'nan', 'NaN', 'None']
+
+def parse_time_to_ms(values) -> pd.Series:
+    """
+    Parse Ergast time strings into milliseconds.
+
+    Handles "ss.sss", "m:ss.sss" and "h:mm:ss.sss" times, "+gap" deltas
+    such as "+5.478" or "+1:02.345", and \\N nulls. Parsing is vectorized:
+    strings are split on ':' once and the parts combined with array
+    arithmetic, so no Python code runs per value. Unparseable entries
+    (e.g. "+1 Lap") become NaN.
+    """
+    series = pd.Series(values)
+
+    if pd.api.types.is_numeric_dtype(series):
+        # Already numeric seconds
+        return series.astype('float64') * 1000
+
+    text = series.astype('string').str.strip()
+    text = text.mask(text.isin(NULL_MARKERS))
+    text = text.str.lstrip('+')
+
+    parts = text.str.split(':', expand=True)
+    n_parts = text.str.count(':').fillna(0).to_numpy(dtype=np.int64) + 1
+
+    # Parse every split column at once; missing parts become NaN
+    columns = [
+        pd.to_numeric(parts[col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        for col in parts.columns
+    ]
+    if len(columns) == 0:
+        return pd.Series(np.nan, index=series.index, dtype='float64')
+
+    matrix = np.column_stack(columns)
+    rows = np.arange(len(matrix))
+
+    # Parts are left-aligned, so pick seconds/minutes/hours from the right
+    width = matrix.shape[1]
+    seconds = matrix[rows, np.clip(n_parts - 1, 0, width - 1)]
+    minutes = np.where(n_parts >= 2, matrix[rows, np.clip(n_parts - 2, 0, width - 1)], 0.0)
+    hours = np.where(n_parts >= 3, matrix[rows, np.clip(n_parts - 3, 0, width - 1)], 0.0)
+
+    milliseconds = ((hours * 60 + minutes) * 60 + seconds) * 1000
+    milliseconds[n_parts > 3] = np.nan
+
+    return pd.Series(milliseconds, index=series.index, dtype='float64')
+
+def add_time_columns(df: pd.DataFrame, columns, suffix: str = '_ms') -> pd.DataFrame:
+    """
+    Add parsed millisecond columns for each time string column present
+    """
+    for col in columns:
+        if col in df.columns:
+            df[f"{col}{suffix}"] = parse_time_to_ms(df[col])
+
+    return df
@@ -99,13 +99,63 @@ export const apiService = {
     return response.data.confidence_data;
   },
 
+  // Pit strategy what-ifs of a live race, e.g. { driver: 'VER', pit_laps: [22, 28] }
+  async getRaceStrategy(raceId: number, options: {
+    driver?: string;
+    pit_laps?: number[];
+    total_laps?: number;
+  } = {}) {
+    const { pit_laps, ...rest } = options;
+    const response = await apiClient.get(`/races/${raceId}/strategy`, {
+      params: { ...rest, pit_laps: pit_laps?.join(',') },
+    });
+    return response.data;
+  },
+
   // Telemetry data
-  async getTelemetryData(sessionId: string, driverId?: number) {
-    const url = `/telemetry/${sessionId}${driverId ? `?driver_id=${driverId}` : ''}`;
-    const response = await apiClient.get(url);
+  async getTelemetryData(sessionId: string, driverId?: number, filters: {
+    lap_min?: number;
+    lap_max?: number;
+    sector?: number;
+    start_ms?: number;
+    end_ms?: number;
+    columns?: string[];
+    limit?: number;
+  } = {}) {
+    const { columns, ...rest } = filters;
+    const response = await apiClient.get(`/telemetry/${sessionId}`, {
+      params: { driver_id: driverId, ...rest, columns: columns?.join(',') },
+    });
     return response.data.telemetry;
   },
 
+  // Live race deltas over Server-Sent Events; EventSource resumes from the
+  // last event id on reconnect. Returns a function that closes the stream.
+  subscribeToRace(raceId: number, handlers: {
+    onReset?: (data: { raceId: number; lap: number }) => void;
+    onLap?: (data: { lap: number; driver: string; lap_time_ms: number }) => void;
+    onPit?: (data: Record<string, any>) => void;
+    onPrediction?: (data: { lap: number; predictions: Array<Record<string, any>> }) => void;
+    onError?: (event: Event) => void;
+  }) {
+    const source = new EventSource(`${API_BASE_URL}/races/${raceId}/live`);
+    const listen = (name: string, handler?: (data: any) => void) => {
+      if (handler) {
+        source.addEventListener(name, (event) => handler(JSON.parse((event as MessageEvent).data)));
+      }
+    };
+
+    listen('reset', handlers.onReset);
+    listen('lap', handlers.onLap);
+    listen('pit', handlers.onPit);
+    listen('prediction', handlers.onPrediction);
+    if (handlers.onError) {
+      source.onerror = handlers.onError;
+    }
+
+    return () => source.close();
+  },
+
   // Make prediction
   async predict(request: {
     raceId: number;
@@ -4,9 +4,10 @@ import { Wrench, Clock, TrendingDown } from 'lucide-react';
 interface PitTimelineProps {
   data: any[];
   currentLap: number;
+  strategies?: any[];
 }
 
-const PitTimeline: React.FC<PitTimelineProps> = ({ data, currentLap }) => {
+const PitTimeline: React.FC<PitTimelineProps> = ({ data, currentLap, strategies = [] }) => {
   // Generate mock pit stop data
   const pitStops = React.useMemo(() => {
     if (!data.length) {
@@ -123,6 +124,25 @@ const PitTimeline: React.FC<PitTimelineProps> = ({ data, currentLap }) => {
         </div>
       )}
 
+      {/* Best remaining strategy per driver, from the live strategy engine */}
+      {strategies.length > 0 && (
+        <div className="mt-6 pt-4 border-t border-gray-700/50">
+          <h3 className="text-sm font-semibold text-gray-300 mb-3">Strategy Outlook</h3>
+          <div className="space-y-2">
+            {strategies.filter(s => s.best).map(s => (
+              <div key={s.driver} className="flex items-center justify-between bg-gray-900/30 rounded-lg px-3 py-2 text-sm">
+                <span className="font-bold text-white w-12">{s.driver}</span>
+                <span className="text-gray-400">
+                  {s.best.stops === 0 ? 'No stop' : `${s.best.stops} stop · lap ${s.best.pit_laps.join(', ')}`}
+                </span>
+                <span className="text-gray-400">{(s.degradation_ms_per_lap / 1000).toFixed(2)}s/lap</span>
+                <span className="text-white font-medium">P{s.best.projected_position}</span>
+              </div>
+            ))}
+          </div>
+        </div>
+      )}
+
       {/* Pit Stop Statistics */}
       <div className="mt-6 pt-4 border-t border-gray-700/50">
         <div className="grid grid-cols-3 gap-4 text-center">
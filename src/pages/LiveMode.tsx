@@ -4,6 +4,7 @@ import LapChart from '../components/LapChart';
 import PitTimeline from '../components/PitTimeline';
 import ConfidenceStream from '../components/ConfidenceStream';
 import { mockApiService } from '../api/mockApi';
+import { apiService } from '../api/apiClient';
 
 interface LiveModeProps {
   race: any;
@@ -15,6 +16,8 @@ const LiveMode: React.FC<LiveModeProps> = ({ race }) => {
   const [lapData, setLapData] = useState<any[]>([]);
   const [pitData, setPitData] = useState<any[]>([]);
   const [confidenceData, setConfidenceData] = useState<any[]>([]);
+  const [streaming, setStreaming] = useState(false);
+  const [strategies, setStrategies] = useState<any[]>([]);
 
   useEffect(() => {
     const loadLiveData = async () => {
@@ -38,10 +41,48 @@ const LiveMode: React.FC<LiveModeProps> = ({ race }) => {
     loadLiveData();
   }, [race]);
 
+  // Apply live deltas pushed by the server instead of re-fetching whole payloads
+  useEffect(() => {
+    if (!race) return;
+
+    const upsertLap = (rows: any[], lap: number, values: Record<string, number>) => {
+      const index = rows.findIndex(row => row.lap === lap);
+      if (index === -1) {
+        return [...rows, { lap, ...values }].sort((a, b) => a.lap - b.lap);
+      }
+      const next = [...rows];
+      next[index] = { ...next[index], ...values };
+      return next;
+    };
+
+    const close = apiService.subscribeToRace(race.raceId, {
+      onReset: () => {
+        setStreaming(true);
+        setIsLive(true);
+        setLapData([]);
+        setPitData([]);
+        setConfidenceData([]);
+        setCurrentLap(1);
+      },
+      onLap: ({ lap, driver, lap_time_ms }) => {
+        setLapData(prev => upsertLap(prev, lap, { [driver]: lap_time_ms }));
+        setCurrentLap(prev => Math.max(prev, lap));
+      },
+      onPit: (pit) => setPitData(prev => [...prev, pit]),
+      onPrediction: ({ lap, predictions }) => {
+        const points = Object.fromEntries(predictions.map(p => [`${p.driver}_confidence`, p.confidence]));
+        setConfidenceData(prev => upsertLap(prev, lap, points));
+      },
+    });
+
+    return close;
+  }, [race]);
+
   useEffect(() => {
     let interval: NodeJS.Timeout;
     
-    if (isLive) {
+    // Without a live stream, play back the loaded laps
+    if (isLive && !streaming) {
       interval = setInterval(() => {
         setCurrentLap(prev => {
           const maxLap = Math.max(...lapData.map(d => d.lap || 1));
@@ -53,7 +94,16 @@ const LiveMode: React.FC<LiveModeProps> = ({ race }) => {
     return () => {
       if (interval) clearInterval(interval);
     };
-  }, [isLive, lapData]);
+  }, [isLive, streaming, lapData]);
+
+  // Re-evaluate pit strategies once per lap while the race streams
+  useEffect(() => {
+    if (!race || !streaming) return;
+
+    apiService.getRaceStrategy(race.raceId)
+      .then(result => setStrategies(result.strategies))
+      .catch(error => console.error('Error loading strategy:', error));
+  }, [race, streaming, currentLap]);
 
   const handlePlayPause = () => {
     setIsLive(!isLive);
@@ -136,7 +186,7 @@ const LiveMode: React.FC<LiveModeProps> = ({ race }) => {
 
         {/* Pit Timeline */}
         <div>
-          <PitTimeline data={pitData} currentLap={currentLap} />
+          <PitTimeline data={pitData} currentLap={currentLap} strategies={strategies} />
         </div>
       </div>
     </div>